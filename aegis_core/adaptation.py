@@ -0,0 +1,143 @@
+import threading
+import numpy as np
+import pandas as pd
+
+from .analyzers import ScadaAnalyzer, PmuAnalyzer
+
+# Most recent readings (all locations together) kept for refits.
+RECENT_READINGS = 20_000
+# Loop ticks between background refits.
+REFIT_TICKS = 3_600
+# A refit waits until at least this many recent readings are held.
+MIN_REFIT_READINGS = 2_000
+# A refit is postponed while more than this fraction of the recent readings raised an alert.
+MAX_REFIT_ALERT_RATE = 0.02
+# Epochs of a background autoencoder refit; far fewer than a full training run.
+REFIT_PMU_EPOCHS = 5
+
+class RecentReadings:
+    """Ring buffer of the last `capacity` readings (one float row each), their locations and alert flags."""
+    def __init__(self, capacity, n_columns):
+        self.rows = np.zeros((capacity, n_columns))
+        self.locations = np.empty(capacity, dtype=object)
+        self.alerts = np.zeros(capacity, dtype=bool)
+        self.total = 0  # Readings ever appended
+
+    def __len__(self):
+        return min(self.total, len(self.rows))
+
+    def append(self, rows, locations, alerts):
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.rows.shape[1])
+        n = len(rows)
+        keep = slice(max(n - len(self.rows), 0), n)  # Only the last `capacity` of a huge block can survive
+        slots = np.arange(self.total + keep.start, self.total + n) % len(self.rows)
+        self.rows[slots] = rows[keep]
+        self.locations[slots] = np.asarray(locations, dtype=object)[keep]
+        self.alerts[slots] = np.asarray(alerts, dtype=bool)[keep]
+        self.total += n
+
+    def latest(self, n):
+        """The last `n` readings (at most len(self)), oldest first, as copies: (rows, locations, alerts)."""
+        n = min(n, len(self))
+        slots = np.arange(self.total - n, self.total) % len(self.rows)
+        return self.rows[slots], self.locations[slots], self.alerts[slots]
+
+class OnlineAdapter:
+    """
+    Keeps the analyzers in step with slow drift (e.g. seasonal load) while the
+    live loop runs. The loop reports every reading with observe(), and every
+    `refit_interval` ticks both models are refitted from scratch, scaler and
+    model together, on a background thread on the recent readings. Like the
+    original training data these include the occasional anomaly rather than
+    only what the current models already pass; a refit is postponed while
+    more than `max_alert_rate` of them raised an alert, so an attack is not
+    learned as the new normal.
+    Nothing the loop is scoring with is ever modified: poll(), called by the
+    loop between ticks, returns fresh (scada, pmu) analyzers whenever a refit
+    is ready, and the loop swaps them in whole, so no tick waits for a refit.
+    `prepare_swap(scada, pmu)` (an executor's prepare_swap) also runs on the
+    refit thread; its result is `swap_message` for the loop's executor.swap().
+    """
+    def __init__(self, scada_analyzer, pmu_analyzer, refit_interval=REFIT_TICKS, capacity=RECENT_READINGS,
+                 min_refit_readings=MIN_REFIT_READINGS, max_alert_rate=MAX_REFIT_ALERT_RATE,
+                 pmu_epochs=REFIT_PMU_EPOCHS, prepare_swap=None, update_callback=None):
+        self.scada_analyzer = scada_analyzer
+        self.pmu_analyzer = pmu_analyzer
+        self.refit_interval = refit_interval
+        self.min_refit_readings = min_refit_readings
+        self.max_alert_rate = max_alert_rate
+        self.pmu_epochs = pmu_epochs
+        self.prepare_swap = prepare_swap
+        self.swap_message = None  # prepare_swap()'s result for the analyzers poll() last returned
+        self.update_callback = update_callback or (lambda msg: None)
+        self.features = scada_analyzer.features + pmu_analyzer.features
+        self.recent = RecentReadings(capacity, len(self.features))
+        self.ticks = 0
+        self._last_refit = 0
+        self._refit_thread = None
+        self._refitted = None  # (scada, pmu, swap message, n_readings) handed over by the refit thread
+        self.stats = {'readings': 0, 'alerts': 0, 'refits': 0, 'postponed_refits': 0, 'failed_refits': 0}
+
+    def observe(self, locations, scada_points, pmu_points, alerts):
+        """
+        Records one tick's readings (lists of dicts or columnar dicts of arrays);
+        `alerts[i]` says whether reading i raised an alert.
+        """
+        scada_features = self.scada_analyzer.features; pmu_features = self.pmu_analyzer.features
+        if isinstance(scada_points, dict):
+            rows = np.column_stack([scada_points[f] for f in scada_features] + [pmu_points[f] for f in pmu_features])
+        else:
+            rows = [[s[f] for f in scada_features] + [p[f] for f in pmu_features] for s, p in zip(scada_points, pmu_points)]
+        alerts = np.asarray(alerts, dtype=bool)
+        self.recent.append(rows, locations, alerts)
+        self.stats['readings'] += len(rows); self.stats['alerts'] += int(alerts.sum())
+
+    def poll(self):
+        """Called by the loop once per tick. Returns replacement (scada, pmu) analyzers, or None."""
+        self.ticks += 1
+        refitted = self._refitted
+        if refitted is not None:
+            self._refitted = None
+            self.scada_analyzer, self.pmu_analyzer, self.swap_message, n_readings = refitted
+            self.stats['refits'] += 1
+            self.update_callback(f"Adapted models: refitted on {n_readings} recent readings.")
+            return self.scada_analyzer, self.pmu_analyzer
+        if (self.ticks - self._last_refit >= self.refit_interval and len(self.recent) >= self.min_refit_readings
+                and not self.refitting):
+            self._start_refit()
+        return None
+
+    @property
+    def refitting(self):
+        return self._refit_thread is not None and self._refit_thread.is_alive()
+
+    def _start_refit(self):
+        self._last_refit = self.ticks
+        rows, locations, alerts = self.recent.latest(len(self.recent))
+        if alerts.mean() > self.max_alert_rate:
+            self.stats['postponed_refits'] += 1
+            self.update_callback(f"Refit postponed: {alerts.mean():.1%} of the recent readings raised an alert.")
+            return
+        frame = pd.DataFrame(rows, columns=self.features)
+        frame['location'] = locations
+        self._refit_thread = threading.Thread(target=self._refit, args=(frame,), name="aegis-refit", daemon=True)
+        self._refit_thread.start()
+
+    def _refit(self, frame):
+        try:
+            scada = ScadaAnalyzer()
+            scada.train(frame)
+            pmu = PmuAnalyzer(self.pmu_analyzer.timesteps, self.pmu_analyzer.n_features, self.pmu_analyzer.backend)
+            pmu.train_stream(lambda: [frame], epochs=self.pmu_epochs)
+            scada.validate(); pmu.validate()
+            message = self.prepare_swap(scada, pmu) if self.prepare_swap is not None else None
+        except Exception as e:
+            self.stats['failed_refits'] += 1
+            self.update_callback(f"Background refit failed, keeping the current models: {e}")
+            return
+        self._refitted = (scada, pmu, message, len(frame))
+
+    def join(self, timeout=None):
+        """Waits for a running background refit to finish."""
+        if self._refit_thread is not None:
+            self._refit_thread.join(timeout)
@@ -1,34 +1,94 @@
 # FILE: aegis_core/analyzers.py
+# scikit-learn and TensorFlow are imported inside the methods that need them,
+# so importing this module (and the UI) stays fast.
 import pandas as pd
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Reshape
-from tensorflow.keras.losses import MeanSquaredError
 import numpy as np
+import copy
 import joblib
 import os
 
+from .numpy_inference import NumpyAutoencoder
+from .forest_inference import FlatIsolationForest
+from .training import ReservoirSampler, iter_window_blocks, window_view
+
+# Upper bound on the rows the Isolation Forest is fitted on when training from a stream.
+SCADA_MAX_TRAINING_SAMPLES = 100_000
+# Batches up to this size are scored by the flat NumPy forest; above it scikit-learn's
+# compiled per-tree traversal wins and its fixed per-call overhead no longer matters.
+FLAT_FOREST_MAX_ROWS = 4096
+
 class ScadaAnalyzer:
     """Analyzes SCADA data using an Isolation Forest model."""
     def __init__(self):
-        self.model = IsolationForest(n_estimators=100, contamination='auto', random_state=42)
-        self.scaler = StandardScaler()
+        self.model = None; self.scaler = None  # Created on train() or load_model()
+        self.engine = None  # FlatIsolationForest copy of `model` used for low-latency scoring
         self.features = ['voltage', 'current', 'frequency', 'breaker_status']
 
-    def train(self, historical_data: pd.DataFrame):
+    def _set_model(self, model):
+        self.model = model
+        self.engine = FlatIsolationForest.from_sklearn(model)
+
+    def train(self, historical_data: pd.DataFrame, max_samples=None):
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+        model = IsolationForest(n_estimators=100, contamination='auto', random_state=42)
+        self.scaler = StandardScaler()
         X_train = historical_data[self.features]
+        if max_samples is not None and len(X_train) > max_samples:
+            X_train = X_train.sample(n=max_samples, random_state=42)
         X_train_scaled = self.scaler.fit_transform(X_train)
-        self.model.fit(X_train_scaled)
+        self._set_model(model.fit(X_train_scaled))
+
+    def train_stream(self, chunks, max_samples=SCADA_MAX_TRAINING_SAMPLES):
+        """
+        Trains from an iterable of telemetry DataFrame chunks.
+        The scaler sees every row; the forest is fitted on a bounded uniform subsample.
+        """
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler()
+        reservoir = ReservoirSampler(max_samples, seed=42)
+        for chunk in chunks:
+            X = chunk[self.features].to_numpy(dtype=np.float64)
+            scaler.partial_fit(X)
+            reservoir.add(X)
+        if reservoir.seen == 0:
+            raise ValueError("No telemetry rows to train the SCADA model on.")
+        self.scaler = scaler
+        model = IsolationForest(n_estimators=100, contamination='auto', random_state=42)
+        self._set_model(model.fit(scaler.transform(reservoir.sample())))
+
+    def _as_matrix(self, readings):
+        """Coerces a block of readings into a contiguous (n, n_features) float array."""
+        if isinstance(readings, np.ndarray):
+            X = readings
+        elif isinstance(readings, (pd.DataFrame, dict)):
+            X = np.column_stack([np.asarray(readings[f], dtype=np.float64) for f in self.features])
+        else:
+            X = np.array([[r[f] for f in self.features] for r in readings], dtype=np.float64)
+        return np.ascontiguousarray(np.atleast_2d(X), dtype=np.float64)
+
+    def analyze_batch(self, readings):
+        """
+        Scores many SCADA readings with a single forest traversal.
+        Accepts an (n, 4) array in `self.features` order, a columnar block
+        (DataFrame or dict of arrays) or a list of reading dicts.
+        """
+        X = self._as_matrix(readings)
+        X_scaled = (X - self.scaler.mean_) / self.scaler.scale_
+        # Both scorers give identical scores; pick whichever is faster for this batch size.
+        scorer = self.engine if len(X_scaled) <= FLAT_FOREST_MAX_ROWS else self.model
+        anomaly_scores = scorer.score_samples(X_scaled)
+        # predict() is just score_samples() compared against offset_, so reuse the scores.
+        is_anomaly = anomaly_scores < self.model.offset_
+        confidence = 1 - (np.clip(anomaly_scores, -1, 0) + 1)
+        return {'is_anomaly': is_anomaly, 'confidence': confidence}
 
     def analyze(self, data_point: dict):
-        df = pd.DataFrame([data_point])
-        X_live = df[self.features]
-        X_live_scaled = self.scaler.transform(X_live)
-        anomaly_score = self.model.score_samples(X_live_scaled)[0]
-        normalized_score = 1 - (np.clip(anomaly_score, -1, 0) + 1)
-        is_anomaly = self.model.predict(X_live_scaled)[0] == -1
-        return {'is_anomaly': is_anomaly, 'confidence': normalized_score}
+        """Scores one reading on the single-row fast path."""
+        x = (np.array([data_point[f] for f in self.features], dtype=np.float64) - self.scaler.mean_) / self.scaler.scale_
+        score = self.engine.score_row(x)
+        return {'is_anomaly': score < self.model.offset_, 'confidence': float(1 - (np.clip(score, -1, 0) + 1))}
 
     def save_model(self, model_path, scaler_path):
         """Saves the trained model and scaler to disk."""
@@ -37,19 +97,51 @@ class ScadaAnalyzer:
 
     def load_model(self, model_path, scaler_path):
         """Loads the model and scaler from disk."""
-        self.model = joblib.load(model_path)
+        self._set_model(joblib.load(model_path))
         self.scaler = joblib.load(scaler_path)
 
+    def training_config(self):
+        """Everything besides the data that determines the trained model; part of the model cache key."""
+        return {'analyzer': 'scada', 'model': 'IsolationForest', 'n_estimators': 100, 'contamination': 'auto',
+                'random_state': 42, 'features': self.features}
+
+    def validate(self):
+        """Raises ValueError unless a usable model and scaler are loaded."""
+        n = len(self.features)
+        if not (hasattr(self.model, 'score_samples') and hasattr(self.model, 'offset_')):
+            raise ValueError(f"SCADA model is not a fitted Isolation Forest: {type(self.model).__name__}")
+        if getattr(self.model, 'n_features_in_', n) != n:
+            raise ValueError(f"SCADA model expects {self.model.n_features_in_} features, not {n}.")
+        if np.shape(getattr(self.scaler, 'mean_', None)) != (n,) or np.shape(getattr(self.scaler, 'scale_', None)) != (n,):
+            raise ValueError("SCADA scaler is not fitted on the SCADA features.")
+
 class PmuAnalyzer:
-    """Analyzes PMU data using an LSTM Autoencoder model."""
-    def __init__(self, timesteps=10, n_features=2):
+    """
+    Analyzes PMU data using an LSTM Autoencoder model.
+    Inference runs on `backend`: 'numpy' (TensorFlow-free forward pass) or 'keras'.
+    """
+    BACKENDS = ('numpy', 'keras')
+
+    def __init__(self, timesteps=10, n_features=2, backend='numpy'):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown PMU inference backend: {backend}")
         self.timesteps = timesteps; self.n_features = n_features
         self.features = ['phase_angle_A', 'magnitude_A']
-        self.scaler = StandardScaler(); self.model = self._build_model()
+        self.backend = backend
+        self.scaler = None  # Fitted on train() or restored by load_model()
+        self.model = None   # Keras model, built on demand for training
+        self.engine = None  # Object whose predict() is used for scoring
         self.reconstruction_threshold = 0.0
 
+    def _set_keras_model(self, model):
+        self.model = model
+        self.engine = model if self.backend == 'keras' else NumpyAutoencoder.from_keras(model)
+
     def _build_model(self):
         """Builds the LSTM Autoencoder model."""
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Reshape
+        from tensorflow.keras.losses import MeanSquaredError
         model = Sequential([
             LSTM(32, activation='relu', input_shape=(self.timesteps, self.n_features), return_sequences=True),
             LSTM(16, activation='relu', return_sequences=False),
@@ -59,28 +151,71 @@ class PmuAnalyzer:
         model.compile(optimizer='adam', loss=MeanSquaredError())
         return model
 
-    def train(self, historical_data: pd.DataFrame):
-        scaled_data = self.scaler.fit_transform(historical_data[self.features])
-        X_train = []
-        for i in range(len(scaled_data) - self.timesteps):
-            X_train.append(scaled_data[i:i+self.timesteps])
-        X_train = np.array(X_train)
-        self.model.fit(X_train, X_train, epochs=20, batch_size=32, verbose=0)
-        reconstructions = self.model.predict(X_train, verbose=0)
-        train_loss = np.mean(np.mean(np.abs(reconstructions - X_train), axis=1), axis=1)
-        self.reconstruction_threshold = np.max(train_loss) * 1.2
+    def _fit_windows(self, window_blocks, epochs, batch_size):
+        """Fits the autoencoder and its threshold; `window_blocks()` yields blocks of windows and is called once per pass."""
+        if self.model is None:
+            self.model = self._build_model()
+        for _ in range(epochs):
+            for X_train in window_blocks():
+                self.model.fit(X_train, X_train, epochs=1, batch_size=batch_size, verbose=0)
+        max_loss = 0.0
+        for X_train in window_blocks():
+            reconstructions = self.model.predict(X_train, verbose=0)
+            train_loss = np.mean(np.abs(reconstructions - X_train), axis=(1, 2))
+            max_loss = max(max_loss, float(np.max(train_loss)))
+        self.reconstruction_threshold = max_loss * 1.2
+        self._set_keras_model(self.model)
+
+    def train(self, historical_data: pd.DataFrame, epochs=20, batch_size=32):
+        from sklearn.preprocessing import StandardScaler
+        self.scaler = StandardScaler().fit(historical_data[self.features].to_numpy(dtype=np.float64))
+        # Overlapping windows as a strided view over the scaled samples, not a list of copies.
+        X_train = window_view(self.transform(historical_data[self.features]).astype(np.float32), self.timesteps)
+        self._fit_windows(lambda: [X_train], epochs, batch_size)
+
+    def train_stream(self, chunk_source, epochs=20, batch_size=32, group_by='location'):
+        """
+        Trains from recorded telemetry too large for memory.
+        `chunk_source()` must return a fresh iterable of DataFrame chunks; it is
+        called once to fit the scaler incrementally and once per epoch after that.
+        """
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler()
+        for chunk in chunk_source():
+            scaler.partial_fit(chunk[self.features].to_numpy(dtype=np.float64))
+        if not hasattr(scaler, 'mean_'):
+            raise ValueError("No telemetry rows to train the PMU model on.")
+        self.scaler = scaler
+        self._fit_windows(lambda: iter_window_blocks(chunk_source(), self.transform, self.features, self.timesteps, group_by), epochs, batch_size)
         
-    def analyze(self, data_sequence: list):
-        if len(data_sequence) != self.timesteps: return {'is_anomaly': False, 'confidence': 0.0}
-        df = pd.DataFrame(data_sequence)
-        scaled_sequence = self.scaler.transform(df[self.features])
-        sequence_reshaped = np.array([scaled_sequence])
-        reconstruction = self.model.predict(sequence_reshaped, verbose=0)
-        reconstruction_error = np.mean(np.abs(reconstruction - sequence_reshaped))
+    def transform(self, samples):
+        """Scales raw (n, n_features) PMU samples with the fitted scaler statistics."""
+        samples = np.asarray(samples, dtype=np.float64)
+        return (samples - self.scaler.mean_) / self.scaler.scale_
+
+    def analyze_windows(self, windows):
+        """Scores a batch of scaled windows, shape (k, timesteps, n_features), in one forward pass."""
+        windows = np.asarray(windows, dtype=np.float32)
+        if len(windows) == 0:
+            return {'is_anomaly': np.zeros(0, dtype=bool), 'confidence': np.zeros(0)}
+        reconstruction = self.engine.predict(windows, verbose=0)
+        reconstruction_error = np.mean(np.abs(reconstruction - windows), axis=(1, 2))
         is_anomaly = reconstruction_error > self.reconstruction_threshold
-        confidence = min(reconstruction_error / (self.reconstruction_threshold * 2), 1.0)
+        confidence = np.minimum(reconstruction_error / (self.reconstruction_threshold * 2), 1.0)
         return {'is_anomaly': is_anomaly, 'confidence': confidence}
 
+    def analyze(self, data_sequence: list):
+        if len(data_sequence) != self.timesteps: return {'is_anomaly': False, 'confidence': 0.0}
+        samples = [[point[f] for f in self.features] for point in data_sequence]
+        result = self.analyze_windows(self.transform(samples)[np.newaxis])
+        return {'is_anomaly': bool(result['is_anomaly'][0]), 'confidence': float(result['confidence'][0])}
+
+    def inference_copy(self):
+        """A copy that shares the scaler and engine but not the Keras model, e.g. to ship to a worker process."""
+        clone = copy.copy(self)
+        clone.model = None
+        return clone
+
     def save_model(self, model_path, scaler_path, threshold_path):
         """Saves the trained Keras model, scaler, and threshold."""
         self.model.save(model_path)
@@ -89,9 +224,32 @@ class PmuAnalyzer:
 
     def load_model(self, model_path, scaler_path, threshold_path):
         """Loads the Keras model, scaler, and threshold."""
-        # --- THIS IS THE FINAL FIX ---
-        # We tell Keras what 'mse' means when loading the model.
-        custom_objects = {'mse': MeanSquaredError()}
-        self.model = load_model(model_path, custom_objects=custom_objects)
+        if self.backend == 'numpy':
+            # Scoring only needs the weights, so skip Keras entirely.
+            self.model = None
+            self.engine = NumpyAutoencoder.from_h5(model_path)
+        else:
+            from tensorflow.keras.models import load_model
+            from tensorflow.keras.losses import MeanSquaredError
+            # --- THIS IS THE FINAL FIX ---
+            # We tell Keras what 'mse' means when loading the model.
+            custom_objects = {'mse': MeanSquaredError()}
+            self._set_keras_model(load_model(model_path, custom_objects=custom_objects))
         self.scaler = joblib.load(scaler_path)
         self.reconstruction_threshold = joblib.load(threshold_path)
+
+    def training_config(self, epochs=20, batch_size=32):
+        """Everything besides the data that determines the trained model; part of the model cache key."""
+        return {'analyzer': 'pmu', 'architecture': 'lstm32-lstm16-dense16', 'timesteps': self.timesteps,
+                'n_features': self.n_features, 'features': self.features, 'epochs': epochs, 'batch_size': batch_size}
+
+    def validate(self):
+        """Raises ValueError unless a usable model, scaler and threshold are loaded."""
+        threshold = self.reconstruction_threshold
+        if not isinstance(threshold, (float, int, np.floating)) or not np.isfinite(threshold) or threshold <= 0:
+            raise ValueError(f"PMU reconstruction threshold is invalid: {threshold!r}")
+        if np.shape(getattr(self.scaler, 'mean_', None)) != (self.n_features,):
+            raise ValueError("PMU scaler is not fitted on the PMU features.")
+        probe = np.zeros((1, self.timesteps, self.n_features), dtype=np.float32)
+        if np.shape(self.engine.predict(probe, verbose=0)) != probe.shape:
+            raise ValueError("PMU model does not reconstruct windows of the configured shape.")
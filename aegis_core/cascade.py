@@ -0,0 +1,114 @@
+import numpy as np
+
+# How each location's PMU verdict of a tick was reached (the 'stage' array of PMU results).
+PMU_NOT_READY = 0  # Window still filling; no verdict
+PMU_SKIPPED = 1    # The first stage found nothing suspicious; autoencoder not run
+PMU_SCORED = 2     # Scored by the autoencoder (every ready window when there is no gate)
+PMU_SAMPLED = 3    # Scored by the autoencoder only because the sampling schedule was due
+
+# First-stage bounds, in standard deviations of a location's own EWMA statistics.
+GATE_THRESHOLD = 3.0
+# Half-life, in samples, of the per-location EWMA mean and variance.
+GATE_HALF_LIFE = 50
+# Samples a bound violation keeps its location suspicious. The autoencoder seldom
+# flags a window for one outlier several samples back, so this is below the window length.
+GATE_HOLD = 3
+# A window is scored at least once every this many samples of its location, suspicious or not.
+GATE_SAMPLE_INTERVAL = 20
+
+class PmuGate:
+    """
+    First stage of the PMU detection cascade. Every sample is checked against
+    EWMA bounds kept per location on the scaled phase angle and magnitude
+    (seeded at the training distribution, i.e. plain z-scores, and following
+    only in-bounds samples so an anomaly cannot widen its own bounds). A
+    sample outside the bounds keeps its location suspicious for the next
+    `hold` samples; a SCADA anomaly makes only its own tick suspicious. Only
+    suspicious windows, plus one per location every `sample_interval`
+    samples, go on to the autoencoder.
+    """
+    def __init__(self, n_features=2, hold=GATE_HOLD, threshold=GATE_THRESHOLD, half_life=GATE_HALF_LIFE,
+                 sample_interval=GATE_SAMPLE_INTERVAL, capacity=64):
+        self.hold = hold
+        self.threshold = threshold
+        self.alpha = 1.0 - 0.5 ** (1.0 / half_life)
+        self.sample_interval = sample_interval
+        self.mean = np.zeros((capacity, n_features))
+        self.var = np.ones((capacity, n_features))
+        self.hold_left = np.zeros(capacity, dtype=np.intp)     # Samples until the last flagged one leaves the window
+        self.since_scored = np.zeros(capacity, dtype=np.intp)  # Samples since the autoencoder last scored the location
+        self.slots = {}
+
+    def _slots(self, locations):
+        slots = np.empty(len(locations), dtype=np.intp)
+        for i, location in enumerate(locations):
+            slot = self.slots.get(location)
+            if slot is None:
+                slot = self.slots[location] = len(self.slots)
+                if slot == len(self.mean):
+                    self._grow()
+            slots[i] = slot
+        return slots
+
+    def _grow(self):
+        capacity = len(self.mean) * 2
+        self.mean = np.concatenate((self.mean, np.zeros_like(self.mean)))
+        self.var = np.concatenate((self.var, np.ones_like(self.var)))
+        self.hold_left = np.resize(self.hold_left, capacity); self.hold_left[capacity // 2:] = 0
+        self.since_scored = np.resize(self.since_scored, capacity); self.since_scored[capacity // 2:] = 0
+
+    def select(self, locations, samples, ready_rows, scada_anomaly=None):
+        """
+        Screens one tick's scaled samples (one per location) and returns the
+        stage (PMU_SCORED, PMU_SAMPLED or PMU_SKIPPED) of each ready row.
+        """
+        slots = self._slots(locations)
+        mean = self.mean[slots]; var = self.var[slots]
+        outside = (np.abs(samples - mean) > self.threshold * np.sqrt(var)).any(axis=1)
+        inside = ~outside
+        delta = samples[inside] - mean[inside]
+        self.mean[slots[inside]] = mean[inside] + self.alpha * delta
+        self.var[slots[inside]] = (1.0 - self.alpha) * (var[inside] + self.alpha * delta ** 2)
+        hold_left = np.where(outside, self.hold, np.maximum(self.hold_left[slots] - 1, 0))
+        self.hold_left[slots] = hold_left
+        self.since_scored[slots] += 1
+
+        ready_slots = slots[ready_rows]
+        suspicious = hold_left[ready_rows] > 0
+        if scada_anomaly is not None:
+            suspicious |= np.asarray(scada_anomaly, dtype=bool)[ready_rows]
+        due = ~suspicious & (self.since_scored[ready_slots] >= self.sample_interval)
+        self.since_scored[ready_slots[suspicious | due]] = 0
+        return np.where(suspicious, PMU_SCORED, np.where(due, PMU_SAMPLED, PMU_SKIPPED)).astype(np.int8)
+
+class CascadeCounters:
+    """
+    Running account of what the cascade saved and what it cost: ready PMU
+    windows skipped, and true anomalies (the simulator's `is_true_anomaly`)
+    whose window was skipped rather than scored.
+    """
+    def __init__(self):
+        self.windows = self.skipped = self.sampled = 0
+        self.true_anomalies = self.missed = 0
+
+    def record(self, stage, is_true_anomaly):
+        stage = np.asarray(stage)
+        ready = stage != PMU_NOT_READY
+        skipped = stage == PMU_SKIPPED
+        truth = np.asarray(is_true_anomaly, dtype=bool) & ready
+        self.windows += int(ready.sum()); self.skipped += int(skipped.sum())
+        self.sampled += int((stage == PMU_SAMPLED).sum())
+        self.true_anomalies += int(truth.sum()); self.missed += int((truth & skipped).sum())
+
+    def snapshot(self):
+        return {
+            'windows': self.windows, 'skipped': self.skipped, 'sampled': self.sampled,
+            'true_anomalies': self.true_anomalies, 'missed': self.missed,
+            'skip_rate': self.skipped / self.windows if self.windows else 0.0,
+            'miss_rate': self.missed / self.true_anomalies if self.true_anomalies else 0.0,
+        }
+
+    def describe(self):
+        stats = self.snapshot()
+        return (f"Cascade: autoencoder skipped on {stats['skip_rate']:.1%} of {stats['windows']} PMU windows, "
+                f"{stats['missed']} of {stats['true_anomalies']} true anomalies missed ({stats['miss_rate']:.1%}).")
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import threading
+from collections import deque
+
+# --- Subscriber protocol ---
+# Newline-delimited JSON over TCP. On connect a subscriber receives one
+# {"type": "snapshot"} with the latest status of every location, the recent
+# alerts and log lines, then one {"type": "delta"} per publish interval with
+# only what changed since the previous one. Every message carries `seq`; a
+# delta applies on top of the message whose seq is one lower. A subscriber
+# too slow to keep up is skipped and sent a fresh snapshot once it catches up.
+# Subscribers may send {"type": "control", "action": "start" | "stop", "high_anomaly_mode": bool}.
+DEFAULT_DAEMON_PORT = 8765
+PUBLISH_INTERVAL = 0.1
+RECENT_ALERTS = 100
+RECENT_LOG_LINES = 100
+# Bytes a subscriber may have queued before it counts as lagging.
+MAX_SUBSCRIBER_BACKLOG = 1 << 20
+
+def encode_message(message):
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+def _status_dict(status):
+    return status.to_dict() if hasattr(status, 'to_dict') else dict(status)
+
+class StateBroadcaster:
+    """
+    Collects engine output for subscribers. publish() is the engine's
+    update_callback: it only records the latest status per location (and
+    queues new alerts and log lines) under a lock. take_delta() and
+    snapshot(), called by the publishing loop, turn that into messages.
+    """
+    def __init__(self, recent_alerts=RECENT_ALERTS, recent_log_lines=RECENT_LOG_LINES):
+        self._lock = threading.Lock()
+        self._changed = {}
+        self._alerts = []
+        self._log_lines = []
+        # What subscribers have been sent so far (touched only by the publishing loop).
+        self.seq = 0
+        self.states = {}
+        self.recent_alerts = deque(maxlen=recent_alerts)
+        self.recent_log = deque(maxlen=recent_log_lines)
+        self.engine = {'running': False, 'high_anomaly_mode': False}
+
+    def publish(self, message):
+        with self._lock:
+            if isinstance(message, str):
+                self._log_lines.append(message)
+            else:
+                self._changed[message['location']] = message
+                if message['is_new_alert']:
+                    self._alerts.append(message)
+
+    def take_delta(self):
+        """The next delta message, or None if nothing happened since the last one."""
+        with self._lock:
+            changed, self._changed = self._changed, {}
+            alerts, self._alerts = self._alerts, []
+            log_lines, self._log_lines = self._log_lines, []
+        if not (changed or alerts or log_lines):
+            return None
+        states = {location: _status_dict(status) for location, status in changed.items()}
+        alerts = [_status_dict(alert) for alert in alerts]
+        self.seq += 1
+        self.states.update(states)
+        self.recent_alerts.extend(alerts)
+        self.recent_log.extend(log_lines)
+        return {'type': 'delta', 'seq': self.seq, 'states': states, 'alerts': alerts, 'log': log_lines, 'engine': dict(self.engine)}
+
+    def snapshot(self):
+        return {'type': 'snapshot', 'seq': self.seq, 'states': dict(self.states), 'alerts': list(self.recent_alerts),
+                'log': list(self.recent_log), 'engine': dict(self.engine)}
+
+class EngineDaemon:
+    """
+    Runs one AegisCore headless and fans its verdicts out to any number of
+    subscribers (e.g. operator consoles), so the models are loaded and
+    inference runs once however many consoles are watching. The engine runs
+    on its own thread; the asyncio loop only serves subscribers and encodes
+    each delta once for all of them.
+    """
+    def __init__(self, core, host='127.0.0.1', port=DEFAULT_DAEMON_PORT, publish_interval=PUBLISH_INTERVAL):
+        self.core = core
+        self.host = host; self.port = port
+        self.publish_interval = publish_interval
+        self.broadcaster = StateBroadcaster()
+        self._forward = core.update_callback
+        core.update_callback = self._engine_callback
+        self._subscribers = {}  # writer -> True while it needs a snapshot before more deltas
+        self._handlers = set()
+        self._server = None
+        self._publisher = None
+        self._engine_thread = None
+        self._stop_event = threading.Event()
+        self.stats = {'subscribers': 0, 'deltas': 0, 'snapshots': 0, 'lag_resyncs': 0}
+
+    def _engine_callback(self, message):
+        self.broadcaster.publish(message)
+        self._forward(message)
+
+    # --- Engine control ---
+    def start_engine(self, high_anomaly_mode=None):
+        """Starts the simulation loop on a background thread unless it is already running."""
+        if self._engine_thread is not None and self._engine_thread.is_alive():
+            return False
+        if high_anomaly_mode is not None:
+            self.core.high_anomaly_mode = bool(high_anomaly_mode)
+        self._stop_event = threading.Event()
+        self.broadcaster.engine = {'running': True, 'high_anomaly_mode': self.core.high_anomaly_mode}
+        self._engine_thread = threading.Thread(target=self._run_engine, args=(self._stop_event,), name="aegis-engine", daemon=True)
+        self._engine_thread.start()
+        return True
+
+    def _run_engine(self, stop_event):
+        try:
+            for status in self.core.run_simulation_generator(stop_event):
+                self.broadcaster.publish(status)
+        except Exception as e:
+            self.broadcaster.publish(f"Backend Error: {e}")
+        finally:
+            self.broadcaster.engine = {'running': False, 'high_anomaly_mode': self.core.high_anomaly_mode}
+
+    def stop_engine(self, timeout=None):
+        self._stop_event.set()
+        if self._engine_thread is not None:
+            self._engine_thread.join(timeout)
+
+    # --- Serving ---
+    async def start(self):
+        """Starts listening and publishing; returns the bound port."""
+        self._server = await asyncio.start_server(self._handle_subscriber, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._publisher = asyncio.create_task(self._publish_loop())
+        return self.port
+
+    async def _handle_subscriber(self, reader, writer):
+        self._handlers.add(asyncio.current_task())
+        self.stats['subscribers'] += 1
+        self._subscribers[writer] = True  # The next publish sends it a snapshot.
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if message.get('type') == 'control':
+                    await self._control(message)
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            self._subscribers.pop(writer, None)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def _control(self, message):
+        action = message.get('action')
+        if action == 'start':
+            self.start_engine(message.get('high_anomaly_mode'))
+        elif action == 'stop':
+            # Joining the engine thread blocks, so leave the event loop free meanwhile.
+            await asyncio.get_running_loop().run_in_executor(None, self.stop_engine)
+
+    async def _publish_loop(self):
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            self.publish()
+
+    def publish(self):
+        """Sends the pending delta to every subscriber that is keeping up, and snapshots to those that need one."""
+        delta = self.broadcaster.take_delta()
+        data = encode_message(delta) if delta is not None else None
+        snapshot = None
+        for writer, needs_snapshot in list(self._subscribers.items()):
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BACKLOG:
+                if not needs_snapshot:
+                    self.stats['lag_resyncs'] += 1
+                self._subscribers[writer] = True  # Skipped deltas are replaced by a snapshot later.
+            elif needs_snapshot:
+                if snapshot is None:
+                    snapshot = encode_message(self.broadcaster.snapshot())
+                writer.write(snapshot)
+                self._subscribers[writer] = False
+                self.stats['snapshots'] += 1
+            elif data is not None:
+                writer.write(data)
+                self.stats['deltas'] += 1
+
+    async def serve_forever(self, high_anomaly_mode=None):
+        await self.start()
+        self.start_engine(high_anomaly_mode)
+        await self._server.serve_forever()
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.stop_engine, 10)
+        if self._publisher is not None:
+            self._publisher.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        handlers = list(self._handlers)
+        for handler in handlers:
+            handler.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
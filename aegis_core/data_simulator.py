@@ -1,16 +1,32 @@
 import numpy as np
+import pandas as pd
 import time
-import random
+
+# Anomaly process parameters shared by the scalar and batch generators.
+NORMAL_MODE_ANOMALY_RATE = 0.05
+STORM_START_PROBABILITY = 0.25
+STORM_MIN_TICKS, STORM_MAX_TICKS = 5, 10
+
+BASE_LOCATIONS = [
+    'Substation A-1', 'Downtown Sector', 'Industrial Park', 
+    'North Residential Grid', 'Airport Feeder Line', 'Hydro Dam Output'
+]
+
+def location_names(n_locations):
+    """The first `n_locations` location names: the built-in six, then numbered feeders."""
+    if n_locations <= len(BASE_LOCATIONS):
+        return BASE_LOCATIONS[:n_locations]
+    return BASE_LOCATIONS + [f"Feeder {i:05d}" for i in range(len(BASE_LOCATIONS), n_locations)]
 
 class DataSimulator:
     """A class to simulate multiple, synchronized data streams from a smart grid."""
-    def __init__(self, high_anomaly_mode=False):
-        self.timestamp = int(time.time())
-        self.locations = [
-            'Substation A-1', 'Downtown Sector', 'Industrial Park', 
-            'North Residential Grid', 'Airport Feeder Line', 'Hydro Dam Output'
-        ]
+    def __init__(self, high_anomaly_mode=False, seed=None, n_locations=None, start_timestamp=None):
+        # The clock feeds the SCADA current, so fully reproducible data needs a fixed start_timestamp as well as a seed.
+        self.timestamp = int(time.time()) if start_timestamp is None else int(start_timestamp)
+        self.locations = list(BASE_LOCATIONS) if n_locations is None else self.location_names(n_locations)
         self.high_anomaly_mode = high_anomaly_mode
+        # A single generator drives every random draw, so a seed makes runs reproducible.
+        self.rng = np.random.default_rng(seed)
         
         # --- NEW: State variables for sustained anomalies ---
         self.in_anomaly_storm = False
@@ -22,25 +38,25 @@ class DataSimulator:
     def _generate_scada_point(self, is_anomaly=False):
         base_voltage = 230.0; base_current = 50.0; base_frequency = 50.0
         if not is_anomaly:
-            voltage = base_voltage + np.random.normal(0, 2)
-            current = base_current + np.random.normal(0, 5) * (1 + np.sin(self.timestamp / 60))
-            frequency = base_frequency + np.random.normal(0, 0.02)
+            voltage = base_voltage + self.rng.normal(0, 2)
+            current = base_current + self.rng.normal(0, 5) * (1 + np.sin(self.timestamp / 60))
+            frequency = base_frequency + self.rng.normal(0, 0.02)
             breaker_status = 1
         else:
-            voltage = base_voltage + np.random.uniform(15, 20)
-            current = base_current - np.random.uniform(25, 30)
-            frequency = base_frequency + np.random.uniform(0.8, 1.2)
+            voltage = base_voltage + self.rng.uniform(15, 20)
+            current = base_current - self.rng.uniform(25, 30)
+            frequency = base_frequency + self.rng.uniform(0.8, 1.2)
             breaker_status = 1
         return {'voltage': round(voltage, 2), 'current': round(current, 2), 'frequency': round(frequency, 3), 'breaker_status': breaker_status}
 
     def _generate_pmu_point(self, is_anomaly=False):
         base_phase_angle = 15.0
         if not is_anomaly:
-            phase_angle_A = base_phase_angle + np.random.normal(0, 0.1)
-            magnitude_A = 1.0 + np.random.normal(0, 0.005)
+            phase_angle_A = base_phase_angle + self.rng.normal(0, 0.1)
+            magnitude_A = 1.0 + self.rng.normal(0, 0.005)
         else:
-            phase_angle_A = base_phase_angle + np.random.uniform(1, 2)
-            magnitude_A = 1.0 - np.random.uniform(0.05, 0.1)
+            phase_angle_A = base_phase_angle + self.rng.uniform(1, 2)
+            magnitude_A = 1.0 - self.rng.uniform(0.05, 0.1)
         return {'phase_angle_A': round(phase_angle_A, 4), 'magnitude_A': round(magnitude_A, 4)}
 
     def get_data_point(self):
@@ -55,19 +71,19 @@ class DataSimulator:
                 self.storm_counter -= 1
                 if self.storm_counter <= 0:
                     self.in_anomaly_storm = False # End of the storm
-            elif random.random() < 0.25: # 25% chance to start a new storm
+            elif self.rng.random() < STORM_START_PROBABILITY: # 25% chance to start a new storm
                 self.in_anomaly_storm = True
-                self.storm_counter = random.randint(5, 10) # Storm will last 5-10 seconds
+                self.storm_counter = int(self.rng.integers(STORM_MIN_TICKS, STORM_MAX_TICKS + 1)) # Storm will last 5-10 seconds
                 is_anomaly_event = True
         else:
             # Original logic for normal mode
-            if random.random() < 0.05:
+            if self.rng.random() < NORMAL_MODE_ANOMALY_RATE:
                 is_anomaly_event = True
         
         scada_data = self._generate_scada_point(is_anomaly_event)
         pmu_data = self._generate_pmu_point(is_anomaly_event)
 
-        location = random.choice(self.locations)
+        location = self.locations[self.rng.integers(len(self.locations))]
 
         return {
             'timestamp': self.timestamp,
@@ -76,3 +92,94 @@ class DataSimulator:
             'scada': scada_data,
             'pmu': pmu_data
         }
+
+    # --- Vectorized batch generation ---
+
+    def location_names(self, n_locations=None):
+        """
+        The first `n_locations` location names, padded with numbered feeders
+        beyond the built-in six. None means this simulator's own locations.
+        """
+        if n_locations is None:
+            return list(self.locations)
+        return location_names(n_locations)
+
+    def _storm_mask(self, n):
+        """
+        Runs the anomaly-storm state machine for `n` ticks at once.
+        The process alternates geometric runs of normal ticks (each tick starts a
+        storm with STORM_START_PROBABILITY) with storms of 1 + randint(5, 10)
+        ticks, continuing any storm left open by a previous call.
+        """
+        mask = np.zeros(n, dtype=bool)
+        carried = min(self.storm_counter, n) if self.in_anomaly_storm else 0
+        mask[:carried] = True
+        remaining = self.storm_counter - carried if self.in_anomaly_storm else 0
+        position = carried
+        mean_cycle = 1 / STORM_START_PROBABILITY + (STORM_MIN_TICKS + STORM_MAX_TICKS) / 2
+        while position < n:
+            n_cycles = int((n - position) / mean_cycle * 1.2) + 8
+            gaps = self.rng.geometric(STORM_START_PROBABILITY, n_cycles) - 1
+            storms = 1 + self.rng.integers(STORM_MIN_TICKS, STORM_MAX_TICKS + 1, n_cycles)
+            starts = position + np.cumsum(gaps) + np.concatenate(([0], np.cumsum(storms)[:-1]))
+            ends = starts + storms
+            inside = starts < n
+            starts, ends = starts[inside], ends[inside]
+            # Mark storm ticks with a +1/-1 difference array and a running sum.
+            edges = np.bincount(starts, minlength=n + 1) - np.bincount(np.minimum(ends, n), minlength=n + 1)
+            mask |= np.cumsum(edges[:n]) > 0
+            if len(starts) < n_cycles:
+                remaining = max(int(ends[-1]) - n, 0) if len(ends) else 0
+                break
+            position = int(ends[-1])
+            remaining = max(position - n, 0)
+        self.in_anomaly_storm = remaining > 0
+        self.storm_counter = remaining
+        return mask
+
+    def generate_batch(self, n, n_locations=None, as_frame=False):
+        """
+        Generates `n` synchronized SCADA/PMU readings with vectorized draws.
+        Returns a dict of columnar NumPy arrays (or a DataFrame with a
+        categorical `location` column when `as_frame` is True). Anomaly
+        labels follow the same storm state machine as get_data_point().
+        """
+        rng = self.rng
+        timestamps = self.timestamp + np.arange(1, n + 1, dtype=np.int64)
+        self.timestamp += n
+        if self.high_anomaly_mode:
+            is_anomaly = self._storm_mask(n)
+        else:
+            is_anomaly = rng.random(n) < NORMAL_MODE_ANOMALY_RATE
+        anomalous = np.flatnonzero(is_anomaly); k = len(anomalous)
+
+        voltage = 230.0 + rng.normal(0, 2, n)
+        current = 50.0 + rng.normal(0, 5, n) * (1 + np.sin(timestamps / 60))
+        frequency = 50.0 + rng.normal(0, 0.02, n)
+        phase_angle_A = 15.0 + rng.normal(0, 0.1, n)
+        magnitude_A = 1.0 + rng.normal(0, 0.005, n)
+        voltage[anomalous] = 230.0 + rng.uniform(15, 20, k)
+        current[anomalous] = 50.0 - rng.uniform(25, 30, k)
+        frequency[anomalous] = 50.0 + rng.uniform(0.8, 1.2, k)
+        phase_angle_A[anomalous] = 15.0 + rng.uniform(1, 2, k)
+        magnitude_A[anomalous] = 1.0 - rng.uniform(0.05, 0.1, k)
+
+        names = self.location_names(n_locations)
+        location_id = rng.integers(len(names), size=n, dtype=np.int32)
+        batch = {
+            'timestamp': timestamps,
+            'is_true_anomaly': is_anomaly,
+            'location_id': location_id,
+            'voltage': np.round(voltage, 2, out=voltage),
+            'current': np.round(current, 2, out=current),
+            'frequency': np.round(frequency, 3, out=frequency),
+            'breaker_status': np.ones(n, dtype=np.int8),
+            'phase_angle_A': np.round(phase_angle_A, 4, out=phase_angle_A),
+            'magnitude_A': np.round(magnitude_A, 4, out=magnitude_A),
+        }
+        if as_frame:
+            frame = pd.DataFrame(batch)
+            frame.insert(2, 'location', pd.Categorical.from_codes(location_id, categories=names))
+            return frame
+        batch['location'] = np.array(names, dtype=object)[location_id]
+        return batch
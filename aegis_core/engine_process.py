@@ -0,0 +1,206 @@
+import multiprocessing
+import threading
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+from .fusion_center import AlertRecord
+from .journal import FLAG_ALERT, FLAG_NEW_ALERT, FLAG_PMU_ANOMALY, FLAG_SCADA_ANOMALY, JOURNAL_DTYPE, verdict_row
+
+# Verdict records cross the process boundary in the journal's fixed-size layout.
+VERDICT_DTYPE = JOURNAL_DTYPE
+RING_RECORDS = 65_536
+RING_HEADER_BYTES = 64  # uint64 write count, uint64 capacity, padding
+
+class VerdictRing:
+    """
+    Single-producer ring buffer of VERDICT_DTYPE records in shared memory.
+    The producer writes a record, then advances the shared write count; a
+    reader copies everything between its own position and that count. A
+    reader that falls more than `capacity` records behind loses the oldest
+    ones (counted in `lost`); records overwritten while being copied are
+    detected by re-reading the count afterwards and dropped the same way.
+    Platform limitation: there is no memory fence between the record store
+    and the count store (Python has none to offer), so a reader must see the
+    two in program order. x86-64 guarantees that; on weakly ordered CPUs
+    such as ARM a reader could copy a record before it is fully visible.
+    """
+    def __init__(self, capacity=RING_RECORDS, name=None):
+        self.owner = name is None
+        size = RING_HEADER_BYTES + capacity * VERDICT_DTYPE.itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        if not self.owner:
+            # Only the creating process may unlink the block; keep this one's tracker from doing it at exit.
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        self._header = np.ndarray((2,), dtype='<u8', buffer=self.shm.buf)
+        if self.owner:
+            self._header[:] = (0, capacity)
+        self.capacity = int(self._header[1])
+        self.records = np.ndarray((self.capacity,), dtype=VERDICT_DTYPE, buffer=self.shm.buf, offset=RING_HEADER_BYTES)
+        self.written = int(self._header[0])  # Producer side
+        self.read_count = self.written       # Reader side
+        self.lost = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, row):
+        self.records[self.written % self.capacity] = row
+        self.written += 1
+        self._header[0] = self.written
+
+    def write_count(self):
+        return int(self._header[0])
+
+    def read(self, end=None):
+        """Copies out the records written since the last read, up to write count `end` (default: now)."""
+        end = self.write_count() if end is None else end
+        start = max(self.read_count, end - self.capacity)
+        records = self.records[np.arange(start, end) % self.capacity]
+        # The producer may already be storing record `write_count()`, over the slot of record
+        # `write_count() - capacity`, so that one is as unsafe as the ones before it.
+        overwritten = self.write_count() + 1 - self.capacity - start
+        if overwritten > 0:
+            records = records[overwritten:]
+        self.lost += (end - self.read_count) - len(records)
+        self.read_count = end
+        return records
+
+    def close(self):
+        self._header = None; self.records = None  # Views must be released before the block.
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def _engine_main(conn, ring_name, journal, core_options):
+    """Child process entry point: one AegisCore driven by commands from the parent."""
+    from .main import AegisCore, JOURNAL_DIR  # The ML stack is only ever imported in the engine process.
+    ring = VerdictRing(name=ring_name)
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    def update_callback(message):
+        if isinstance(message, str):
+            send(('log', message))
+
+    location_ids = {}
+
+    def run(stop_event):
+        try:
+            for status in core.run_simulation_generator(stop_event):
+                location_id = location_ids.get(status.location)
+                if location_id is None:
+                    # Sent before the first record that uses it, so the reader always knows the name.
+                    location_id = location_ids[status.location] = len(location_ids)
+                    send(('location', location_id, status.location))
+                # The same wall-clock tick time the journal stamps this verdict with.
+                ring.write(verdict_row(core.tick_time, location_id, status))
+        except Exception as e:
+            send(('log', f"Backend Error: {e}"))
+
+    if journal:
+        core_options = dict(core_options, journal_path=JOURNAL_DIR)
+    core = AegisCore(update_callback=update_callback, **core_options)
+    core.load_models_async()
+    stop_event = threading.Event(); simulation = None
+    while True:
+        command = conn.recv()
+        if command[0] == 'start' and (simulation is None or not simulation.is_alive()):
+            core.high_anomaly_mode = command[1]
+            stop_event = threading.Event()
+            simulation = threading.Thread(target=run, args=(stop_event,), name="aegis-simulation", daemon=True)
+            simulation.start()
+        elif command[0] in ('stop', 'exit'):
+            stop_event.set()
+            if simulation is not None:
+                simulation.join()
+            if command[0] == 'exit':
+                break
+    ring.close()
+    conn.close()
+
+class EngineProcess:
+    """
+    Runs AegisCore in a separate (spawned) process, so inference never holds
+    the UI's GIL. Verdicts come back through a shared-memory VerdictRing with
+    no pickling; only control commands, log lines and new location names go
+    over a pipe. start_simulation()/stop_simulation() mirror the in-process
+    controls, and poll() returns what the UI should show. With `journal` the
+    engine journals its verdicts to the default journal directory.
+    """
+    def __init__(self, capacity=RING_RECORDS, journal=False, **core_options):
+        self.capacity = capacity
+        self.journal = journal
+        self.core_options = core_options
+        self.location_names = {}
+        self.ring = None
+        self._process = None
+        self._conn = None
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        self.ring = VerdictRing(self.capacity)
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_engine_main, args=(child_conn, self.ring.name, self.journal, self.core_options), name="aegis-engine", daemon=True)
+        self._process.start()
+        child_conn.close()
+        return self
+
+    def start_simulation(self, high_anomaly_mode=False):
+        self._conn.send(('start', bool(high_anomaly_mode)))
+
+    def stop_simulation(self):
+        self._conn.send(('stop',))
+
+    def poll(self):
+        """
+        Returns (log_lines, records) received since the last call. Of the
+        verdicts, only new alerts and the latest per location become
+        AlertRecords (oldest first); the rest are superseded anyway.
+        """
+        end = self.ring.write_count()  # Before draining the pipe: every name these records use is in it by now.
+        log_lines = []
+        while self._conn.poll():
+            message = self._conn.recv()
+            if message[0] == 'log':
+                log_lines.append(message[1])
+            else:
+                self.location_names[message[1]] = message[2]
+        rows = self.ring.read(end)
+        if not len(rows):
+            return log_lines, []
+        flags = rows['flags']
+        keep = (flags & FLAG_NEW_ALERT) != 0
+        # The last row of each location: first occurrence in the reversed array.
+        _, last_from_end = np.unique(rows['location_id'][::-1], return_index=True)
+        keep[len(rows) - 1 - last_from_end] = True
+        records = [
+            AlertRecord(self.location_names[location_id], bool(f & FLAG_ALERT), round(confidence, 2), reason_code,
+                        bool(f & FLAG_SCADA_ANOMALY), bool(f & FLAG_PMU_ANOMALY), bool(f & FLAG_NEW_ALERT))
+            for location_id, f, reason_code, confidence in zip(rows['location_id'][keep].tolist(), flags[keep].tolist(),
+                                                               rows['reason_code'][keep].tolist(), rows['combined_confidence'][keep].tolist())
+        ]
+        return log_lines, records
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def close(self, timeout=10):
+        if self._process is not None:
+            try:
+                self._conn.send(('exit',))
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._conn.close()
+            self._process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,237 @@
+import multiprocessing
+import signal
+import time
+from multiprocessing.reduction import ForkingPickler
+import zlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from .cascade import PMU_SCORED, PMU_SKIPPED, PmuGate
+from .window_store import PmuWindowStore
+
+def score_pmu(pmu_analyzer, pmu_windows, locations, pmu_points, gate=None, scada_anomaly=None):
+    """
+    Pushes a tick's PMU samples into their location windows and scores all
+    ready windows in one batch. Returns {'is_anomaly', 'confidence', 'stage'}
+    arrays aligned with `locations`; a location whose window is not yet full,
+    or whose window the `gate` (a PmuGate) skipped, scores as not anomalous
+    with confidence 0. 'stage' says which of those happened (see cascade.py).
+    """
+    features = pmu_analyzer.features
+    if isinstance(pmu_points, dict):
+        samples = pmu_analyzer.transform(np.column_stack([pmu_points[f] for f in features]))
+    else:
+        samples = pmu_analyzer.transform([[point[f] for f in features] for point in pmu_points])
+    pmu_windows.push_many(locations, samples)
+    ready_locations, windows = pmu_windows.pop_ready()
+    n = len(locations)
+    results = {'is_anomaly': np.zeros(n, dtype=bool), 'confidence': np.zeros(n), 'stage': np.zeros(n, dtype=np.int8)}
+    row_of = {location: i for i, location in enumerate(locations)}
+    rows = np.array([row_of[location] for location in ready_locations], dtype=np.intp)
+    if gate is not None:
+        stage = gate.select(locations, samples, rows, scada_anomaly)
+        results['stage'][rows] = stage
+        scored = stage != PMU_SKIPPED
+        rows = rows[scored]; windows = windows[scored]
+    else:
+        results['stage'][rows] = PMU_SCORED
+    if len(rows):
+        scores = pmu_analyzer.analyze_windows(windows)
+        results['is_anomaly'][rows] = scores['is_anomaly']
+        results['confidence'][rows] = scores['confidence']
+    return results
+
+def take_points(points, indices):
+    """The readings at `indices` of a list of reading dicts or a columnar dict of arrays."""
+    if isinstance(points, dict):
+        indices = np.asarray(indices, dtype=np.intp)
+        return {column: values[indices] for column, values in points.items()}
+    return [points[i] for i in indices]
+
+def _make_gate(pmu_analyzer, gate_options):
+    return None if gate_options is None else PmuGate(pmu_analyzer.n_features, **gate_options)
+
+class SerialExecutor:
+    """
+    Runs the SCADA and PMU analyzers back-to-back on the calling thread.
+    Every executor takes one tick's points (a list of locations plus SCADA and
+    PMU readings as parallel lists of dicts or as columnar dicts of arrays) and returns (scada_results, pmu_results): dicts of
+    'is_anomaly' and 'confidence' arrays aligned with the input order. `timings` holds the (scada_ns, pmu_ns) of the last call
+    when `timed` is set. Given `gate` (PmuGate keyword arguments), PMU windows
+    go through the detection cascade and only suspicious or sampled ones are
+    scored by the autoencoder.
+    """
+    name = 'serial'
+
+    def __init__(self, scada_analyzer, pmu_analyzer, gate=None):
+        self.scada_analyzer = scada_analyzer
+        self.pmu_analyzer = pmu_analyzer
+        self.pmu_windows = PmuWindowStore(pmu_analyzer.timesteps, pmu_analyzer.n_features)
+        self.gate = _make_gate(pmu_analyzer, gate)
+        self.timed = False
+        self.timings = (0, 0)
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+    def prepare_swap(self, scada_analyzer, pmu_analyzer):
+        """Work for swap() that can be done ahead, off the loop thread; its result is swap()'s `message`."""
+        return None
+
+    def swap(self, scada_analyzer, pmu_analyzer, message=None):
+        """
+        Installs new analyzers for the next analyze() call. PMU windows are
+        kept, so samples scaled with the previous scaler age out over one window.
+        """
+        self.scada_analyzer = scada_analyzer
+        self.pmu_analyzer = pmu_analyzer
+
+    def _run_scada(self, scada_points):
+        started = time.perf_counter_ns() if self.timed else 0
+        results = self.scada_analyzer.analyze_batch(scada_points)
+        return results, (time.perf_counter_ns() - started if self.timed else 0)
+
+    def _run_pmu(self, locations, pmu_points, scada_anomaly=None):
+        started = time.perf_counter_ns() if self.timed else 0
+        results = score_pmu(self.pmu_analyzer, self.pmu_windows, locations, pmu_points, self.gate, scada_anomaly)
+        return results, (time.perf_counter_ns() - started if self.timed else 0)
+
+    def analyze(self, locations, scada_points, pmu_points):
+        scada_results, scada_ns = self._run_scada(scada_points)
+        pmu_results, pmu_ns = self._run_pmu(locations, pmu_points, scada_results['is_anomaly'])
+        self.timings = (scada_ns, pmu_ns)
+        return scada_results, pmu_results
+
+class ThreadedExecutor(SerialExecutor):
+    """
+    Runs SCADA scoring on a worker thread while PMU scoring runs on the calling
+    thread. Both spend most of their time in native code that releases the GIL,
+    so a tick costs roughly the slower analyzer rather than the sum of both.
+    With a gate the PMU stage needs the SCADA verdict first, so it runs serially.
+    """
+    name = 'thread'
+
+    def start(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aegis-scada")
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def analyze(self, locations, scada_points, pmu_points):
+        if self.gate is not None:
+            return SerialExecutor.analyze(self, locations, scada_points, pmu_points)
+        scada_future = self._pool.submit(self._run_scada, scada_points)
+        pmu_results, pmu_ns = self._run_pmu(locations, pmu_points)
+        scada_results, scada_ns = scada_future.result()
+        self.timings = (scada_ns, pmu_ns)
+        return scada_results, pmu_results
+
+def shard_of(location, n_shards):
+    """Stable location -> shard assignment (identical in every process, unlike hash())."""
+    return zlib.crc32(str(location).encode('utf-8')) % n_shards
+
+# First element of the message that replaces a worker's analyzers.
+SWAP_MESSAGE = 'swap'
+
+def _shard_worker(conn, scada_analyzer, pmu_analyzer, gate):
+    """Process entry point: owns the windows (and gate state) of one location shard and scores its points."""
+    # Ctrl-C reaches the whole process group; the parent stops the workers through close() instead.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    executor = SerialExecutor(scada_analyzer, pmu_analyzer, gate)
+    executor.timed = True
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        if message[0] == SWAP_MESSAGE:
+            executor.swap(*message[1:])
+            continue
+        locations, scada_points, pmu_points = message
+        results = executor.analyze(locations, scada_points, pmu_points)
+        conn.send(results + (executor.timings,))
+    conn.close()
+
+class ProcessShardExecutor:
+    """
+    Shards locations across worker processes. Each worker holds its own copy
+    of the analyzers and the PMU windows of its locations, so ticks carrying
+    many locations are scored on all cores at once. Results are scattered back
+    into input order, so fusion sees the same order as the serial executor.
+    Requires the picklable NumPy PMU backend.
+    """
+    name = 'process'
+
+    def __init__(self, scada_analyzer, pmu_analyzer, n_workers=None, gate=None):
+        if pmu_analyzer.backend != 'numpy':
+            raise ValueError("The process executor needs the 'numpy' PMU backend.")
+        self.scada_analyzer = scada_analyzer
+        self.pmu_analyzer = pmu_analyzer
+        self.gate_options = gate
+        self.n_workers = n_workers or max(1, min(multiprocessing.cpu_count(), 8))
+        self.timed = False
+        self.timings = (0, 0)
+        self._workers = []
+
+    def start(self):
+        # 'spawn' avoids forking a process that already runs the model-loader and UI threads.
+        context = multiprocessing.get_context('spawn')
+        pmu_analyzer = self.pmu_analyzer.inference_copy()
+        for _ in range(self.n_workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_shard_worker, args=(child_conn, self.scada_analyzer, pmu_analyzer, self.gate_options), daemon=True)
+            process.start()
+            child_conn.close()
+            self._workers.append((process, parent_conn))
+
+    def close(self):
+        for process, conn in self._workers:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process, conn in self._workers:
+            process.join(timeout=5)
+            conn.close()
+        self._workers = []
+
+    def prepare_swap(self, scada_analyzer, pmu_analyzer):
+        """The pickled swap message: serializing whole models is the slow part, so it is done ahead."""
+        return ForkingPickler.dumps((SWAP_MESSAGE, scada_analyzer, pmu_analyzer.inference_copy()))
+
+    def swap(self, scada_analyzer, pmu_analyzer, message=None):
+        """Ships new analyzers (pickled by prepare_swap) to every worker; each installs them before its next tick."""
+        self.scada_analyzer = scada_analyzer
+        self.pmu_analyzer = pmu_analyzer
+        if message is None:
+            message = self.prepare_swap(scada_analyzer, pmu_analyzer)
+        for _, conn in self._workers:
+            conn.send_bytes(message)  # Received by the worker's conn.recv() like any other message
+
+    def analyze(self, locations, scada_points, pmu_points):
+        shards = {}
+        for i, location in enumerate(locations):
+            shards.setdefault(shard_of(location, self.n_workers), []).append(i)
+        for shard, indices in shards.items():
+            self._workers[shard][1].send(([locations[i] for i in indices], take_points(scada_points, indices), take_points(pmu_points, indices)))
+        n = len(locations)
+        scada_results = {'is_anomaly': np.zeros(n, dtype=bool), 'confidence': np.zeros(n)}
+        pmu_results = {'is_anomaly': np.zeros(n, dtype=bool), 'confidence': np.zeros(n), 'stage': np.zeros(n, dtype=np.int8)}
+        scada_ns = pmu_ns = 0
+        for shard in sorted(shards):
+            shard_scada, shard_pmu, (shard_scada_ns, shard_pmu_ns) = self._workers[shard][1].recv()
+            for results, shard_results in ((scada_results, shard_scada), (pmu_results, shard_pmu)):
+                for key in results:
+                    results[key][shards[shard]] = shard_results[key]
+            scada_ns = max(scada_ns, shard_scada_ns); pmu_ns = max(pmu_ns, shard_pmu_ns)
+        self.timings = (scada_ns, pmu_ns)
+        return scada_results, pmu_results
+
+EXECUTORS = {'serial': SerialExecutor, 'thread': ThreadedExecutor, 'process': ProcessShardExecutor}
+
+def make_executor(kind, scada_analyzer, pmu_analyzer, **options):
+    if kind not in EXECUTORS:
+        raise ValueError(f"Unknown analyzer executor: {kind}")
+    return EXECUTORS[kind](scada_analyzer, pmu_analyzer, **options)
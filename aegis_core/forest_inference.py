@@ -0,0 +1,119 @@
+from collections import deque
+import numpy as np
+
+# Rows traversed together in score_samples(); keeps the (rows, trees) node arrays cache-resident.
+SCORE_CHUNK_ROWS = 256
+
+def _average_path_length(n):
+    """
+    Average path length of an unsuccessful BST search over `n` samples (the
+    Isolation Forest normaliser), elementwise over an array of sample counts.
+    """
+    n = np.asarray(n)
+    length = np.zeros(n.shape)
+    grown = n > 2
+    length[n == 2] = 1.0
+    length[grown] = 2.0 * (np.log(n[grown] - 1.0) + np.euler_gamma) - 2.0 * (n[grown] - 1.0) / n[grown]
+    return length
+
+class FlatIsolationForest:
+    """
+    A fitted scikit-learn IsolationForest flattened into packed node arrays.
+    Every tree is renumbered so a node's right child directly follows its left
+    child, which turns one traversal step for all trees at once into
+    `node = left[node] + (x[feature[node]] > threshold[node])`. Leaves point
+    at themselves, so a fixed number of steps (the forest depth) lands every
+    tree on its leaf, where `leaf_depth` holds the path-length-corrected depth.
+    Scores match IsolationForest.score_samples() exactly for finite inputs.
+    Only public fitted attributes are read (estimators_, estimators_features_,
+    max_samples_, offset_ and the trees' structure); node depths and path
+    length corrections are recomputed the way scikit-learn derives them.
+    """
+    def __init__(self, feature, threshold, left, leaf_depth, roots, max_depth, denominator, offset):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.leaf_depth = leaf_depth
+        self.roots = roots
+        self.max_depth = max_depth
+        self.denominator = denominator
+        self.offset = offset
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        features, thresholds, lefts, depths, roots = [], [], [], [], []
+        base = 0
+        for estimator, tree_features in zip(forest.estimators_, forest.estimators_features_):
+            tree = estimator.tree_
+            # Breadth-first renumbering that gives both children of a node consecutive ids.
+            order = [0]; new_id = np.zeros(tree.node_count, dtype=np.intp)
+            node_depth = np.ones(tree.node_count)  # The root is at depth 1, as in Tree.compute_node_depths()
+            queue = deque([0])
+            while queue:
+                node = queue.popleft()
+                if tree.children_left[node] != -1:
+                    children = (tree.children_left[node], tree.children_right[node])
+                    new_id[children[0]] = len(order); new_id[children[1]] = len(order) + 1
+                    node_depth[list(children)] = node_depth[node] + 1
+                    order.extend(children); queue.extend(children)
+            order = np.asarray(order)
+            is_leaf = tree.children_left[order] == -1
+            feature = tree.feature[order]
+            if len(tree_features) != forest.n_features_in_:
+                feature = np.asarray(tree_features)[np.maximum(feature, 0)]
+            features.append(np.where(is_leaf, 0, feature))
+            # x > inf is never true, so a leaf's "next node" is always itself.
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+            lefts.append(base + np.where(is_leaf, np.arange(len(order)), new_id[np.maximum(tree.children_left[order], 0)]))
+            # Same expression (and so the same rounding) as scikit-learn's per-tree depth.
+            depths.append((node_depth + _average_path_length(tree.n_node_samples) - 1.0)[order])
+            roots.append(base)
+            base += len(order)
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            leaf_depth=np.concatenate(depths).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max(estimator.tree_.max_depth for estimator in forest.estimators_),
+            denominator=len(forest.estimators_) * _average_path_length([forest.max_samples_])[0],
+            offset=float(forest.offset_),
+        )
+
+    def _scores(self, depths):
+        # Summed tree by tree (cumsum is sequential), in scikit-learn's order, for bit-identical scores.
+        total = np.cumsum(depths, axis=-1)[..., -1]
+        if self.denominator == 0:
+            # A forest fitted on a single sample: scikit-learn defines the normalised depth as 1.
+            return np.full_like(total, -0.5)
+        return -(2 ** (-(total / self.denominator)))
+
+    def score_row(self, x):
+        """score_samples() of a single row of length n_features."""
+        # Inputs are compared at float32 precision, as scikit-learn's trees do.
+        x = np.asarray(x, dtype=np.float32).astype(np.float64)
+        nodes = self.roots
+        feature, threshold, left = self.feature, self.threshold, self.left
+        for _ in range(self.max_depth):
+            nodes = left[nodes] + (x.take(feature[nodes]) > threshold[nodes])
+        # Scored as a one-row batch: NumPy's scalar and array power can round differently.
+        return float(self._scores(self.leaf_depth[nodes][np.newaxis])[0])
+
+    def score_samples(self, X):
+        """score_samples() of an (n, n_features) block, all trees advanced together level by level."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32)).astype(np.float64)
+        scores = np.empty(len(X))
+        n_features = X.shape[1]
+        for start in range(0, len(X), SCORE_CHUNK_ROWS):
+            block = X[start:start + SCORE_CHUNK_ROWS]
+            flat = block.ravel()
+            row_offsets = (np.arange(len(block)) * n_features)[:, None]
+            nodes = np.broadcast_to(self.roots, (len(block), len(self.roots)))
+            for _ in range(self.max_depth):
+                nodes = self.left[nodes] + (flat[row_offsets + self.feature[nodes]] > self.threshold[nodes])
+            scores[start:start + SCORE_CHUNK_ROWS] = self._scores(self.leaf_depth[nodes])
+        return scores
+
+    def predict_anomaly(self, X):
+        """Boolean form of IsolationForest.predict(): True where the score falls below `offset_`."""
+        return self.score_samples(X) < self.offset
@@ -1,19 +1,143 @@
-# FILE: aegis_core/fusion_center.py
+import numpy as np
+
+# Reason texts indexed by reason code (scada_anomaly + 2 * pmu_anomaly).
+REASONS = (
+    "System nominal.",
+    "Anomaly detected in SCADA data.",
+    "Anomaly detected in PMU data stream.",
+    "Coordinated anomaly detected in both SCADA and PMU data streams.",
+)
+
+# Ticks with at most this many rows are fused row by row in fuse_records().
+SMALL_TICK_ROWS = 128
+
+class AlertRecord:
+    """
+    One fused verdict. A slotted record instead of a dict, with the reason
+    stored as a code into REASONS. Fields can still be read as
+    `record['field']` or `record.get('field')`, as the UI and CLI do.
+    """
+    __slots__ = ('location', 'aegis_alert', 'combined_confidence', 'reason_code', 'scada_anomaly', 'pmu_anomaly', 'is_new_alert')
+
+    def __init__(self, location, aegis_alert, combined_confidence, reason_code, scada_anomaly, pmu_anomaly, is_new_alert=False):
+        self.location = location
+        self.aegis_alert = aegis_alert
+        self.combined_confidence = combined_confidence
+        self.reason_code = reason_code
+        self.scada_anomaly = scada_anomaly
+        self.pmu_anomaly = pmu_anomaly
+        self.is_new_alert = is_new_alert
+
+    @property
+    def reason(self):
+        return REASONS[self.reason_code]
+
+    def __getitem__(self, key):
+        if key != 'reason' and key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        record = {key: getattr(self, key) for key in self.__slots__}
+        record['reason'] = self.reason
+        return record
+
+    def __repr__(self):
+        return f"AlertRecord({', '.join(f'{key}={getattr(self, key)!r}' for key in self.__slots__)})"
+
 class FusionCenter:
+    """
+    Fuses SCADA and PMU verdicts into Aegis alerts and tracks, per location,
+    whether each alert is a new one (the location was not alerting on its
+    previous verdict). Location None is one shared stream.
+    """
     def __init__(self, scada_weight=0.6, pmu_weight=0.4):
         self.scada_weight = scada_weight
         self.pmu_weight = pmu_weight
         self.alert_threshold = 0.7
-    def fuse(self, scada_result: dict, pmu_result: dict):
-        combined_confidence = (scada_result['confidence'] * self.scada_weight + pmu_result['confidence'] * self.pmu_weight)
-        if scada_result['is_anomaly'] and pmu_result['is_anomaly']:
+        self._alerting = {}  # location -> whether its last fused verdict was an alert
+
+    def reset_edges(self):
+        """Forgets every location's alert state, so the next alert anywhere counts as new."""
+        self._alerting.clear()
+
+    def fuse(self, scada_result, pmu_result, location=None):
+        """Fuses one pair of analyzer verdicts (mappings with 'is_anomaly' and 'confidence') into an AlertRecord."""
+        return self._fuse_one(bool(scada_result['is_anomaly']), scada_result['confidence'], bool(pmu_result['is_anomaly']), pmu_result['confidence'], location)
+
+    def _fuse_one(self, scada_anomaly, scada_confidence, pmu_anomaly, pmu_confidence, location):
+        combined_confidence = scada_confidence * self.scada_weight + pmu_confidence * self.pmu_weight
+        if scada_anomaly and pmu_anomaly:
             combined_confidence = min(combined_confidence * 1.5, 1.0)
-            reason = "Coordinated anomaly detected in both SCADA and PMU data streams."
-        elif scada_result['is_anomaly']:
-            reason = "Anomaly detected in SCADA data."
-        elif pmu_result['is_anomaly']:
-            reason = "Anomaly detected in PMU data stream."
-        else:
-            reason = "System nominal."
         is_aegis_alert = combined_confidence > self.alert_threshold
-        return {'aegis_alert': is_aegis_alert, 'combined_confidence': round(combined_confidence, 2), 'reason': reason, 'scada_anomaly': scada_result['is_anomaly'], 'pmu_anomaly': pmu_result['is_anomaly']}
\ No newline at end of file
+        is_new_alert = is_aegis_alert and not self._alerting.get(location, False)
+        self._alerting[location] = is_aegis_alert
+        return AlertRecord(location, is_aegis_alert, round(combined_confidence, 2), scada_anomaly + 2 * pmu_anomaly, scada_anomaly, pmu_anomaly, is_new_alert)
+
+    def fuse_batch(self, scada_results, pmu_results, locations=None):
+        """
+        Vectorized fuse() over arrays of analyzer flags and confidences, in time
+        order; returns a dict of arrays. Edges are tracked per entry of
+        `locations` (one shared stream when None) and carry over between calls.
+        """
+        scada_anomaly = np.asarray(scada_results['is_anomaly'], dtype=bool)
+        pmu_anomaly = np.asarray(pmu_results['is_anomaly'], dtype=bool)
+        combined_confidence = np.asarray(scada_results['confidence']) * self.scada_weight + np.asarray(pmu_results['confidence']) * self.pmu_weight
+        both = scada_anomaly & pmu_anomaly
+        combined_confidence = np.where(both, np.minimum(combined_confidence * 1.5, 1.0), combined_confidence)
+        alert = combined_confidence > self.alert_threshold
+        return {
+            'aegis_alert': alert,
+            'combined_confidence': np.round(combined_confidence, 2),
+            'reason_code': scada_anomaly.astype(np.int8) + 2 * pmu_anomaly.astype(np.int8),
+            'scada_anomaly': scada_anomaly,
+            'pmu_anomaly': pmu_anomaly,
+            'is_new_alert': self._new_alerts(alert, locations),
+        }
+
+    def _new_alerts(self, alert, locations):
+        n = len(alert)
+        if not n:
+            return np.zeros(0, dtype=bool)
+        if locations is None:
+            previous = np.concatenate(([self._alerting.get(None, False)], alert[:-1]))
+            self._alerting[None] = bool(alert[-1])
+            return alert & ~previous
+        # Stable-sort rows by location so each location's verdicts are contiguous and in time order.
+        keys, group = np.unique(np.asarray(locations), return_inverse=True)
+        order = np.argsort(group, kind='stable')
+        group = group[order]; sorted_alert = alert[order]
+        first = np.ones(n, dtype=bool); first[1:] = group[1:] != group[:-1]
+        last = np.ones(n, dtype=bool); last[:-1] = first[1:]
+        previous = np.empty(n, dtype=bool); previous[1:] = sorted_alert[:-1]
+        previous[first] = [self._alerting.get(key, False) for key in keys[group[first]].tolist()]
+        self._alerting.update(zip(keys[group[last]].tolist(), sorted_alert[last].tolist()))
+        is_new = np.empty(n, dtype=bool)
+        is_new[order] = sorted_alert & ~previous
+        return is_new
+
+    def fuse_records(self, scada_results, pmu_results, locations, with_flags=False):
+        """
+        Fuses one tick's columnar analyzer results into AlertRecords, one per
+        location. Small ticks are fused row by row: below about a hundred rows the
+        fixed cost of the vectorized path outweighs its per-row savings.
+        With `with_flags`, returns (records, aegis_alert, is_new_alert), the
+        last two as boolean arrays, e.g. for counting without visiting records.
+        """
+        if len(locations) > SMALL_TICK_ROWS:
+            fused = self.fuse_batch(scada_results, pmu_results, locations)
+            columns = [fused[key].tolist() for key in ('aegis_alert', 'combined_confidence', 'reason_code', 'scada_anomaly', 'pmu_anomaly', 'is_new_alert')]
+            records = [AlertRecord(location, *fields) for location, *fields in zip(locations, *columns)]
+            return (records, fused['aegis_alert'], fused['is_new_alert']) if with_flags else records
+        columns = (scada_results['is_anomaly'].tolist(), scada_results['confidence'].tolist(), pmu_results['is_anomaly'].tolist(), pmu_results['confidence'].tolist(), locations)
+        records = [self._fuse_one(*fields) for fields in zip(*columns)]
+        if not with_flags:
+            return records
+        return (records, np.array([record.aegis_alert for record in records], dtype=bool),
+                np.array([record.is_new_alert for record in records], dtype=bool))
@@ -0,0 +1,275 @@
+import asyncio
+import struct
+import numpy as np
+
+from .data_simulator import DataSimulator, location_names as numbered_location_names
+
+# --- Wire format ---
+# A packet is a fixed header followed by `count` fixed-size little-endian frames.
+# Over TCP packets are sent back-to-back on the stream; over UDP each datagram is one packet.
+PACKET_MAGIC = b'AG'
+PROTOCOL_VERSION = 1
+PACKET_HEADER = struct.Struct('<2sBBI')  # magic, version, reserved, frame count
+
+# One synchronized SCADA + PMU reading of one location.
+FRAME_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('location_id', '<u4'),
+    ('flags', '<u1'),
+    ('breaker_status', '<u1'),
+    ('reserved', '<u2'),
+    ('voltage', '<f4'),
+    ('current', '<f4'),
+    ('frequency', '<f4'),
+    ('phase_angle_A', '<f4'),
+    ('magnitude_A', '<f4'),
+])
+MEASUREMENTS = ('voltage', 'current', 'frequency', 'breaker_status', 'phase_angle_A', 'magnitude_A')
+
+# Frame flags. Labels are only sent by the simulator, never by field devices.
+FLAG_LABELLED = 0x1
+FLAG_TRUE_ANOMALY = 0x2
+
+MAX_FRAMES_PER_PACKET = 65_535
+# Keeps a datagram (header + frames) under the 65,507-byte UDP payload limit.
+MAX_FRAMES_PER_DATAGRAM = (65_507 - PACKET_HEADER.size) // FRAME_DTYPE.itemsize
+
+DEFAULT_MAX_BATCH = 4096
+DEFAULT_MAX_DELAY = 0.05
+
+def frames_from_batch(batch, location_offset=0):
+    """Packs a DataSimulator.generate_batch() dict into a frame array; location ids are shifted by `location_offset`."""
+    frames = np.zeros(len(batch['timestamp']), dtype=FRAME_DTYPE)
+    frames['timestamp'] = batch['timestamp']
+    frames['location_id'] = np.asarray(batch['location_id']) + location_offset
+    frames['flags'] = FLAG_LABELLED | np.where(batch['is_true_anomaly'], FLAG_TRUE_ANOMALY, 0)
+    for name in MEASUREMENTS:
+        frames[name] = batch[name]
+    return frames
+
+def encode_packet(frames):
+    """Serializes a frame array (at most MAX_FRAMES_PER_PACKET frames) into one packet."""
+    frames = np.ascontiguousarray(frames, dtype=FRAME_DTYPE)
+    if len(frames) > MAX_FRAMES_PER_PACKET:
+        raise ValueError(f"A packet holds at most {MAX_FRAMES_PER_PACKET} frames, got {len(frames)}.")
+    return PACKET_HEADER.pack(PACKET_MAGIC, PROTOCOL_VERSION, 0, len(frames)) + frames.tobytes()
+
+def parse_header(buffer):
+    """Validates a packet header and returns its frame count."""
+    magic, version, _, count = PACKET_HEADER.unpack_from(buffer)
+    if magic != PACKET_MAGIC:
+        raise ValueError(f"Bad packet magic: {magic!r}")
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported protocol version: {version}")
+    if count > MAX_FRAMES_PER_PACKET:
+        raise ValueError(f"Packet announces {count} frames, more than {MAX_FRAMES_PER_PACKET}.")
+    return count
+
+def decode_packet(buffer):
+    """
+    Decodes one complete packet. The returned frame array is a read-only view
+    of `buffer` (no copy), so the buffer must not be reused while it is alive.
+    """
+    view = memoryview(buffer)
+    if len(view) < PACKET_HEADER.size:
+        raise ValueError("Truncated packet header.")
+    count = parse_header(view)
+    if len(view) != PACKET_HEADER.size + count * FRAME_DTYPE.itemsize:
+        raise ValueError(f"Packet length {len(view)} does not match its {count} frames.")
+    return np.frombuffer(view, dtype=FRAME_DTYPE, count=count, offset=PACKET_HEADER.size)
+
+class FrameIngestServer:
+    """
+    Accepts binary frame packets from many feeds over TCP and UDP on one
+    asyncio loop (no thread per feed) and hands them out in batches.
+    Decoded packets wait in a bounded queue: TCP feeds are back-pressured
+    when it is full, UDP packets are dropped and counted.
+    """
+    def __init__(self, max_pending_packets=1024, location_names=None):
+        self._queue = asyncio.Queue(max_pending_packets)
+        self._servers = []
+        self._transports = []
+        self._handlers = set()
+        self._location_names = np.array(location_names if location_names is not None else [], dtype=object)
+        self.closed = False
+        self.stats = {'connections': 0, 'packets': 0, 'frames': 0, 'bad_packets': 0, 'dropped_packets': 0}
+
+    async def start_tcp(self, host='127.0.0.1', port=0):
+        """Listens for TCP feeds; returns the bound port (useful with port 0)."""
+        server = await asyncio.start_server(self._handle_stream, host, port)
+        self._servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    async def start_udp(self, host='127.0.0.1', port=0):
+        """Listens for UDP feeds; returns the bound port."""
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(lambda: _DatagramFeed(self), local_addr=(host, port))
+        self._transports.append(transport)
+        return transport.get_extra_info('sockname')[1]
+
+    def _accept(self, frames):
+        self.stats['packets'] += 1
+        self.stats['frames'] += len(frames)
+
+    async def _handle_stream(self, reader, writer):
+        self.stats['connections'] += 1
+        self._handlers.add(asyncio.current_task())
+        try:
+            while True:
+                count = parse_header(await reader.readexactly(PACKET_HEADER.size))
+                payload = await reader.readexactly(count * FRAME_DTYPE.itemsize)
+                frames = np.frombuffer(payload, dtype=FRAME_DTYPE)
+                self._accept(frames)
+                await self._queue.put(frames)
+        except asyncio.IncompleteReadError:
+            pass  # The feed disconnected.
+        except asyncio.CancelledError:
+            pass  # Server shutdown; ending quietly keeps asyncio from logging the cancelled handler.
+        except ValueError:
+            # A bad header means the stream is out of sync; drop the connection.
+            self.stats['bad_packets'] += 1
+        finally:
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def _datagram_received(self, data):
+        try:
+            frames = decode_packet(data)
+        except ValueError:
+            self.stats['bad_packets'] += 1
+            return
+        try:
+            self._queue.put_nowait(frames)
+        except asyncio.QueueFull:
+            self.stats['dropped_packets'] += 1
+            return
+        self._accept(frames)
+
+    async def next_batch(self, max_frames=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY):
+        """
+        Waits for at least one packet, then keeps collecting for up to
+        `max_delay` seconds or `max_frames` frames. Returns one frame array,
+        or None once the server is closed.
+        """
+        first = await self._queue.get()
+        if first is None:
+            return None
+        parts = [first]; n = len(first)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_delay
+        while n < max_frames:
+            try:
+                frames = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    frames = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if frames is None:
+                self._queue.put_nowait(None)  # Leave the close marker for the next call.
+                break
+            parts.append(frames); n += len(frames)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def location_names(self, location_ids):
+        """Maps frame location ids to names, numbering unknown ids like DataSimulator does."""
+        location_ids = np.asarray(location_ids)
+        if len(location_ids) and location_ids.max() >= len(self._location_names):
+            known = list(self._location_names)
+            extra = numbered_location_names(int(location_ids.max()) + 1)[len(known):]
+            self._location_names = np.array(known + extra, dtype=object)
+        return self._location_names[location_ids]
+
+    def columns(self, frames):
+        """Column views of a frame batch in the layout the analyzers and TelemetryReplay expect."""
+        columns = {name: frames[name] for name in ('timestamp', 'location_id') + MEASUREMENTS}
+        columns['location'] = self.location_names(frames['location_id'])
+        if len(frames) and np.all(frames['flags'] & FLAG_LABELLED):
+            columns['is_true_anomaly'] = (frames['flags'] & FLAG_TRUE_ANOMALY) != 0
+        return columns
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        for transport in self._transports:
+            transport.close()
+        # Stop the per-connection readers too; closing the listener leaves them running.
+        handlers = list(self._handlers)
+        for handler in handlers:
+            handler.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        # Wake up a pending next_batch(); pending packets are discarded on close.
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                break
+            except asyncio.QueueFull:
+                self._queue.get_nowait()
+
+class _DatagramFeed(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        self.server._datagram_received(data)
+
+class SimulatorPublisher:
+    """
+    Stand-in for a field device: streams DataSimulator readings to an ingest
+    server as binary frames, `frames_per_tick` readings `rate_hz` times a
+    second (None = as fast as possible). Feeds given different
+    `location_offset`s report distinct locations.
+    """
+    TRANSPORTS = ('tcp', 'udp')
+
+    def __init__(self, host='127.0.0.1', port=0, transport='tcp', rate_hz=1.0, frames_per_tick=1, n_locations=None, location_offset=0, seed=None, high_anomaly_mode=False):
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"Unknown publisher transport: {transport}")
+        self.host = host; self.port = port; self.transport = transport
+        self.rate_hz = rate_hz
+        self.frames_per_tick = frames_per_tick
+        self.n_locations = n_locations
+        self.location_offset = location_offset
+        self.simulator = DataSimulator(high_anomaly_mode=high_anomaly_mode, seed=seed, n_locations=n_locations)
+        self.frames_sent = 0
+
+    def _packets(self):
+        frames = frames_from_batch(self.simulator.generate_batch(self.frames_per_tick), self.location_offset)
+        step = MAX_FRAMES_PER_DATAGRAM if self.transport == 'udp' else MAX_FRAMES_PER_PACKET
+        return [encode_packet(frames[start:start + step]) for start in range(0, len(frames), step)]
+
+    async def run(self, n_ticks=None):
+        """Publishes `n_ticks` ticks (forever if None, until cancelled)."""
+        loop = asyncio.get_running_loop()
+        if self.transport == 'tcp':
+            _, writer = await asyncio.open_connection(self.host, self.port)
+            send = writer.write
+        else:
+            transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=(self.host, self.port))
+            send = transport.sendto
+        period = 1.0 / self.rate_hz if self.rate_hz else 0.0
+        next_deadline = loop.time()
+        tick = 0
+        try:
+            while n_ticks is None or tick < n_ticks:
+                for packet in self._packets():
+                    send(packet)
+                if self.transport == 'tcp':
+                    await writer.drain()
+                self.frames_sent += self.frames_per_tick
+                tick += 1
+                # Absolute deadlines, as in TickPacer, so send time does not accumulate as lag.
+                next_deadline = max(next_deadline + period, loop.time()) if period else loop.time()
+                await asyncio.sleep(next_deadline - loop.time() if period else 0)
+        finally:
+            if self.transport == 'tcp':
+                writer.close()
+            else:
+                transport.close()
@@ -0,0 +1,91 @@
+import time
+import numpy as np
+
+# Log-spaced histogram bucket edges in microseconds (1 us .. ~17 s, four buckets per doubling).
+HISTOGRAM_EDGES_US = np.round(2.0 ** (np.arange(0, 24.25, 0.25)), 2)
+
+class LatencyRecorder:
+    """
+    Keeps the last `capacity` latency samples (in ns) of one stage in a ring.
+    Recording is a single list store; percentiles and the histogram are only
+    computed when a summary is requested.
+    """
+    __slots__ = ('samples', 'capacity', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self, capacity=4096):
+        self.samples = [0] * capacity
+        self.capacity = capacity
+        self.count = 0; self.total_ns = 0; self.max_ns = 0
+
+    def record(self, elapsed_ns):
+        self.samples[self.count % self.capacity] = elapsed_ns
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def recent(self):
+        """The samples currently in the ring, in microseconds."""
+        return np.asarray(self.samples[:min(self.count, self.capacity)], dtype=np.float64) / 1e3
+
+    def summary(self, histogram=False):
+        recent = self.recent()
+        if not len(recent):
+            return {'count': 0}
+        p50, p90, p99 = np.percentile(recent, [50, 90, 99])
+        summary = {
+            'count': self.count,
+            'mean_us': round(self.total_ns / self.count / 1e3, 2),
+            'p50_us': round(float(p50), 2), 'p90_us': round(float(p90), 2), 'p99_us': round(float(p99), 2),
+            'max_us': round(self.max_ns / 1e3, 2),
+        }
+        if histogram:
+            counts, _ = np.histogram(recent, bins=HISTOGRAM_EDGES_US)
+            nonzero = np.flatnonzero(counts)
+            summary['histogram'] = {f"<{HISTOGRAM_EDGES_US[i + 1]:g}us": int(counts[i]) for i in nonzero}
+        return summary
+
+class LoopStats:
+    """Per-stage latency recorders and counters for the AegisCore monitoring loop."""
+    STAGES = ('simulate', 'scada', 'pmu', 'analyze', 'fusion', 'tick')
+
+    def __init__(self, capacity=4096):
+        self.stages = {stage: LatencyRecorder(capacity) for stage in self.STAGES}
+        self.counters = {'ticks': 0, 'alerts': 0, 'new_alerts': 0}
+        self.started = time.perf_counter()
+
+    def record_tick(self, t0, t1, t2, t3, analyzer_timings, aegis_alert, is_new_alert):
+        """
+        Records one tick from the perf_counter_ns() stamps taken around its
+        simulate / analyze / fusion stages, and the boolean `aegis_alert` and
+        `is_new_alert` arrays of its fused verdicts (see fuse_records(with_flags=True)).
+        `analyzer_timings` is the executor's (scada_ns, pmu_ns); with a
+        concurrent executor they overlap inside 'analyze'.
+        """
+        stages = self.stages
+        stages['simulate'].record(t1 - t0)
+        stages['scada'].record(analyzer_timings[0])
+        stages['pmu'].record(analyzer_timings[1])
+        stages['analyze'].record(t2 - t1)
+        stages['fusion'].record(t3 - t2)
+        stages['tick'].record(t3 - t0)
+        counters = self.counters
+        counters['ticks'] += 1
+        counters['alerts'] += int(np.count_nonzero(aegis_alert))
+        counters['new_alerts'] += int(np.count_nonzero(aegis_alert & is_new_alert))
+
+    def snapshot(self, histogram=False):
+        return {
+            'uptime_s': round(time.perf_counter() - self.started, 2),
+            'counters': dict(self.counters),
+            'stages': {stage: recorder.summary(histogram) for stage, recorder in self.stages.items()},
+        }
+
+    def describe(self):
+        """One-line summary suitable for update_callback."""
+        parts = [f"{self.counters['ticks']} ticks, {self.counters['alerts']} alerts"]
+        for stage in self.STAGES:
+            summary = self.stages[stage].summary()
+            if summary['count']:
+                parts.append(f"{stage} p50 {summary['p50_us']:.0f}us p99 {summary['p99_us']:.0f}us")
+        return "Stats: " + " | ".join(parts)
@@ -0,0 +1,366 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import numpy as np
+import pandas as pd
+try:
+    import fcntl
+except ImportError:  # Not on Windows: writers are not locked out there.
+    fcntl = None
+
+from .fusion_center import REASONS
+
+# --- On-disk layout ---
+# A journal is a directory of fixed-capacity segment files plus two sidecars:
+#   segment-NNNNNN.jnl  header + `capacity` fixed-size verdict records, memory-mapped
+#   alerts.idx          header + (location_id, time bucket, position) of every alert record
+#   writer.lock         flock()ed by the one writer that may have the journal open
+#   locations.json      location names, indexed by location_id; rewritten by a flush that adds names
+# Records are only ever appended. A segment header's `count` is advanced only after
+# its records and the location names they refer to are synced, so a crash loses at
+# most the records since the last flush.
+SEGMENT_MAGIC = b'AGJ1'
+SEGMENT_HEADER = struct.Struct('<4sHHIQ')  # magic, version, record size, capacity, committed count
+SEGMENT_HEADER_BYTES = 64  # Header space reserved before the first record
+INDEX_MAGIC = b'AGI1'
+INDEX_HEADER = struct.Struct('<4s4xQ')  # magic, records covered by the index
+JOURNAL_VERSION = 1
+INDEX_FILE = 'alerts.idx'
+LOCATIONS_FILE = 'locations.json'
+LOCK_FILE = 'writer.lock'
+
+# One fused verdict per tick and location.
+JOURNAL_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('location_id', '<u4'),
+    ('flags', '<u1'),
+    ('reason_code', '<u1'),
+    ('reserved', '<u2'),
+    ('combined_confidence', '<f4'),
+    ('padding', '<u4'),
+])
+INDEX_DTYPE = np.dtype([('location_id', '<u4'), ('bucket', '<u4'), ('position', '<u8')])
+
+# Record flags.
+FLAG_ALERT = 0x1
+FLAG_NEW_ALERT = 0x2
+FLAG_SCADA_ANOMALY = 0x4
+FLAG_PMU_ANOMALY = 0x8
+
+SEGMENT_RECORDS = 1 << 20  # 24 MiB segments
+BUCKET_SECONDS = 3600
+FLUSH_INTERVAL = 1.0
+
+def verdict_row(timestamp, location_id, record):
+    """The JOURNAL_DTYPE row of one fused AlertRecord."""
+    flags = (record.aegis_alert * FLAG_ALERT | record.is_new_alert * FLAG_NEW_ALERT
+             | record.scada_anomaly * FLAG_SCADA_ANOMALY | record.pmu_anomaly * FLAG_PMU_ANOMALY)
+    return (timestamp, location_id, flags, record.reason_code, 0, record.combined_confidence, 0)
+
+class JournalBusyError(RuntimeError):
+    """Another process (or another AlertJournal) already writes to the journal."""
+
+def _segment_path(path, number):
+    return os.path.join(path, f"segment-{number:06d}.jnl")
+
+class _Segment:
+    """One memory-mapped segment file; `records` is a view of its record area (writable unless `read_only`)."""
+    def __init__(self, path, capacity=None, read_only=False):
+        create = not read_only and not os.path.exists(path)
+        with open(path, 'rb' if read_only else 'w+b' if create else 'r+b') as f:
+            if create:
+                f.truncate(SEGMENT_HEADER_BYTES + capacity * JOURNAL_DTYPE.itemsize)
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if read_only else mmap.mmap(f.fileno(), 0)
+        if create:
+            SEGMENT_HEADER.pack_into(self.mm, 0, SEGMENT_MAGIC, JOURNAL_VERSION, JOURNAL_DTYPE.itemsize, capacity, 0)
+            self.count = 0
+        else:
+            magic, version, record_size, capacity, self.count = SEGMENT_HEADER.unpack_from(self.mm, 0)
+            if magic != SEGMENT_MAGIC or version != JOURNAL_VERSION or record_size != JOURNAL_DTYPE.itemsize:
+                self.mm.close()
+                raise ValueError(f"Not a version {JOURNAL_VERSION} journal segment: {path}")
+        self.capacity = capacity
+        self.records = np.frombuffer(self.mm, dtype=JOURNAL_DTYPE, count=capacity, offset=SEGMENT_HEADER_BYTES)
+
+    def commit(self, count):
+        """Syncs the records, then advances the header count past them."""
+        self.mm.flush()
+        SEGMENT_HEADER.pack_into(self.mm, 0, SEGMENT_MAGIC, JOURNAL_VERSION, JOURNAL_DTYPE.itemsize, self.capacity, count)
+        self.mm.flush(0, min(mmap.PAGESIZE, len(self.mm)))
+        self.count = count
+
+    def close(self):
+        self.records = None  # The array must be released before its mapping.
+        self.mm.close()
+
+class AlertJournal:
+    """
+    Persistent, append-only journal of every fused verdict.
+    append() is a single record write into a memory-mapped segment, so it is
+    cheap enough to call on every tick; a background thread syncs the new
+    records every `flush_interval` seconds and indexes the alerts among them
+    by (location, hour bucket). query() looks only at the buckets it needs.
+    A writer holds an exclusive lock on the journal (JournalBusyError if
+    another writer has it). With `read_only`, the journal is opened for
+    queries only: it sees the records committed when it was opened, and
+    never writes, creates or locks anything, so it can run beside a writer.
+    """
+    def __init__(self, path, segment_records=SEGMENT_RECORDS, flush_interval=FLUSH_INTERVAL, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self._lock_file = None
+        if not read_only:
+            os.makedirs(path, exist_ok=True)
+            self._acquire_writer_lock()
+        self.flush_interval = 0 if read_only else flush_interval
+        self._lock = threading.Lock()  # Serializes flushes and guards the index
+        self._open_locations()
+        self._open_segments(segment_records)
+        self._open_index()
+        self._stop = threading.Event()
+        self._flusher = None
+        if self.flush_interval:
+            self._flusher = threading.Thread(target=self._flush_loop, name="aegis-journal", daemon=True)
+            self._flusher.start()
+
+    # --- Opening and recovery ---
+    def _acquire_writer_lock(self):
+        if fcntl is None:
+            return
+        self._lock_file = open(os.path.join(self.path, LOCK_FILE), 'a')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close(); self._lock_file = None
+            raise JournalBusyError(f"The journal at {self.path} is already open for writing elsewhere.") from None
+
+    def _open_locations(self):
+        self._locations_path = os.path.join(self.path, LOCATIONS_FILE)
+        self.location_names = []
+        if os.path.exists(self._locations_path):
+            with open(self._locations_path, 'r', encoding='utf-8') as f:
+                self.location_names = json.load(f)
+        self._location_ids = {name: i for i, name in enumerate(self.location_names)}
+        self._saved_locations = len(self.location_names)  # Names already in the sidecar
+
+    def _open_segments(self, segment_records):
+        if self.read_only and not os.path.isdir(self.path):
+            numbers = []
+        else:
+            numbers = sorted(int(name[8:14]) for name in os.listdir(self.path) if name.startswith('segment-') and name.endswith('.jnl'))
+        if numbers != list(range(len(numbers))):
+            raise ValueError(f"Journal segments are missing from {self.path}.")
+        self._segments = [_Segment(_segment_path(self.path, number), read_only=self.read_only) for number in numbers]
+        self.segment_records = self._segments[0].capacity if self._segments else segment_records
+        if not self._segments:
+            if self.read_only:
+                self.count = self.committed = self._base = 0
+                self._current = None
+                return
+            self._segments.append(_Segment(_segment_path(self.path, 0), self.segment_records))
+        # Only committed records survive a reopen; anything after them was never synced. Segments fill
+        # in order, so they end in the last segment with any: a writer may have rolled past it unflushed.
+        last = max((number for number, segment in enumerate(self._segments) if segment.count), default=0)
+        if not self.read_only:
+            for number in range(len(self._segments) - 1, last, -1):
+                self._segments.pop().close()
+                os.remove(_segment_path(self.path, number))
+        self.count = self.committed = last * self.segment_records + self._segments[last].count
+        self._current = self._segments[last].records
+        self._base = last * self.segment_records
+
+    def _open_index(self):
+        self._index_path = os.path.join(self.path, INDEX_FILE)
+        self._index = {}  # location_id -> {hour bucket: positions of its alert records, ascending}
+        entries = np.zeros(0, dtype=INDEX_DTYPE); indexed = 0
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'rb') as f:
+                header = f.read(INDEX_HEADER.size)
+                if len(header) == INDEX_HEADER.size and INDEX_HEADER.unpack(header)[0] == INDEX_MAGIC:
+                    indexed = INDEX_HEADER.unpack(header)[1]
+                    entries = np.fromfile(f, dtype=INDEX_DTYPE)
+        indexed = min(indexed, self.committed)
+        entries = entries[entries['position'] < indexed]
+        # Rewrite the sidecar from what is trusted, then index whatever committed records it missed
+        # (in memory only when read-only; the sidecar belongs to the writer).
+        if not self.read_only:
+            with open(self._index_path, 'wb') as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, indexed))
+                entries.tofile(f)
+        self._add_to_index(entries)
+        self.indexed = indexed
+        self._index_records(self.committed)
+
+    # --- Writing ---
+    def location_id(self, location):
+        location_id = self._location_ids.get(location)
+        if location_id is None:
+            location_id = self._location_ids[location] = len(self.location_names)
+            self.location_names.append(location)  # Saved by the next flush, ahead of the records using it
+        return location_id
+
+    def _save_locations(self):
+        names = list(self.location_names)
+        if len(names) == self._saved_locations:
+            return
+        tmp_path = self._locations_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(names, f)
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp_path, self._locations_path)
+        self._saved_locations = len(names)
+
+    def append(self, timestamp, record):
+        """Appends one fused AlertRecord stamped `timestamp` (epoch seconds)."""
+        if self.read_only:
+            raise ValueError(f"The journal at {self.path} is open read-only.")
+        offset = self.count - self._base
+        if offset == self.segment_records:
+            self._roll()
+            offset = 0
+        self._current[offset] = verdict_row(timestamp, self.location_id(record.location), record)
+        self.count += 1
+
+    def _roll(self):
+        segment = _Segment(_segment_path(self.path, len(self._segments)), self.segment_records)
+        self._segments.append(segment)
+        self._base += self.segment_records
+        self._current = segment.records
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Syncs every record appended so far (batched: one msync per touched segment) and indexes its alerts."""
+        if self.read_only:
+            return
+        with self._lock:
+            count = self.count
+            if count == self.committed:
+                return
+            # Every name the records up to `count` refer to is on disk before they are committed.
+            self._save_locations()
+            first = self.committed // self.segment_records
+            last = (count - 1) // self.segment_records
+            for number in range(first, last + 1):
+                self._segments[number].commit(min(count - number * self.segment_records, self.segment_records))
+            self.committed = count
+            self._index_records(count)
+
+    def _records_between(self, start, stop):
+        """Records [start, stop) as one array (a copy) plus their positions."""
+        if stop <= start:
+            return np.zeros(0, dtype=JOURNAL_DTYPE), np.zeros(0, dtype=np.uint64)
+        parts = []
+        for number in range(start // self.segment_records, (stop - 1) // self.segment_records + 1):
+            base = number * self.segment_records
+            parts.append(self._segments[number].records[max(start - base, 0):min(stop - base, self.segment_records)])
+        return np.concatenate(parts), np.arange(start, stop, dtype=np.uint64)
+
+    def _index_records(self, stop):
+        """Indexes the alerts among records [self.indexed, stop) and appends them to the sidecar (unless read-only)."""
+        records, positions = self._records_between(self.indexed, stop)
+        alerts = (records['flags'] & FLAG_ALERT) != 0
+        entries = np.zeros(int(alerts.sum()), dtype=INDEX_DTYPE)
+        entries['location_id'] = records['location_id'][alerts]
+        entries['bucket'] = records['timestamp'][alerts] // BUCKET_SECONDS
+        entries['position'] = positions[alerts]
+        if not self.read_only:
+            self._append_to_sidecar(entries, stop)
+        self._add_to_index(entries)
+        self.indexed = stop
+
+    def _append_to_sidecar(self, entries, stop):
+        """Appends index entries to alerts.idx, then marks it as covering the records before `stop`."""
+        with open(self._index_path, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            entries.tofile(f)
+            f.flush(); os.fsync(f.fileno())
+            # The covered-records count goes last, so it never vouches for entries that were not written.
+            f.seek(0)
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, stop))
+            f.flush(); os.fsync(f.fileno())
+
+    def _add_to_index(self, entries):
+        for location_id, bucket, position in zip(entries['location_id'].tolist(), entries['bucket'].tolist(), entries['position'].tolist()):
+            self._index.setdefault(location_id, {}).setdefault(bucket, []).append(position)
+
+    # --- Reading ---
+    def query(self, location=None, start=None, end=None):
+        """
+        Alerts at `location` (all locations if None) with start <= timestamp < end
+        (epoch seconds, open-ended if None), oldest first, as a DataFrame.
+        Only the matching (location, hour) index buckets are read, plus records
+        appended since the last flush.
+        """
+        with self._lock:
+            if location is None:
+                location_ids = set(range(len(self.location_names)))
+            else:
+                location_ids = {self._location_ids[location]} if location in self._location_ids else set()
+            positions = []
+            for location_id in location_ids:
+                positions.extend(self._bucket_positions(self._index.get(location_id, {}), start, end))
+            records = self._records_at(np.sort(np.asarray(positions, dtype=np.int64)))
+            tail, _ = self._records_between(self.indexed, self.count)
+            tail = tail[(tail['flags'] & FLAG_ALERT) != 0]
+        records = np.concatenate([records, tail[np.isin(tail['location_id'], list(location_ids))]])
+        keep = np.ones(len(records), dtype=bool)
+        if start is not None:
+            keep &= records['timestamp'] >= start
+        if end is not None:
+            keep &= records['timestamp'] < end
+        return self._frame(records[keep])
+
+    def _bucket_positions(self, buckets, start, end):
+        first = -1 if start is None else int(start) // BUCKET_SECONDS
+        last = None if end is None else int(end) // BUCKET_SECONDS
+        if last is not None and first >= 0 and last - first < len(buckets):
+            # A short window: look its hours up directly instead of walking the location's history.
+            wanted = (buckets.get(bucket, ()) for bucket in range(first, last + 1))
+        else:
+            wanted = (positions for bucket, positions in buckets.items() if bucket >= first and (last is None or bucket <= last))
+        return [position for positions in wanted for position in positions]
+
+    def _records_at(self, positions):
+        segments = positions // self.segment_records
+        parts = [self._segments[number].records[positions[segments == number] - number * self.segment_records]
+                 for number in np.unique(segments).tolist()]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=JOURNAL_DTYPE)
+
+    def records(self, start=0, stop=None):
+        """Raw verdict records [start, stop) in append order (a copy)."""
+        return self._records_between(start, self.count if stop is None else min(stop, self.count))[0]
+
+    def _frame(self, records):
+        """Alert records in the replay alert-table format."""
+        flags = records['flags']
+        return pd.DataFrame({
+            'timestamp': records['timestamp'],
+            'location': np.array(self.location_names, dtype=object)[records['location_id']] if len(records) else np.array([], dtype=object),
+            'combined_confidence': records['combined_confidence'].astype(np.float64).round(2),
+            'reason': np.array(REASONS, dtype=object)[records['reason_code']],
+            'scada_anomaly': (flags & FLAG_SCADA_ANOMALY) != 0,
+            'pmu_anomaly': (flags & FLAG_PMU_ANOMALY) != 0,
+            'is_new_alert': (flags & FLAG_NEW_ALERT) != 0,
+        })
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        self._current = None
+        for segment in self._segments:
+            segment.close()
+        self._segments = []
+        if self._lock_file is not None:
+            self._lock_file.close()  # Releases the writer lock
+            self._lock_file = None
@@ -0,0 +1,167 @@
+import json
+import time
+import numpy as np
+
+from .data_simulator import STORM_MIN_TICKS, STORM_MAX_TICKS, location_names
+
+# Fleet size of the load generator when none is given.
+FLEET_LOCATIONS = 1_000
+# Per-location chance, each tick, that a calm location starts a storm (normal / high anomaly mode).
+FLEET_STORM_PROBABILITY = 0.001
+FLEET_HIGH_STORM_PROBABILITY = 0.02
+# Streams a scripted attack can perturb.
+ATTACK_STREAMS = ('scada', 'pmu')
+
+def load_scenario(path):
+    """Reads a scenario file (JSON with an "attacks" list, see ScriptedAttack) and checks its entries."""
+    with open(path) as f:
+        scenario = json.load(f)
+    attacks = scenario.get('attacks') if isinstance(scenario, dict) else None
+    if not isinstance(attacks, list):
+        raise ValueError(f"Scenario {path} has no \"attacks\" list.")
+    return [ScriptedAttack.from_dict(attack) for attack in attacks]
+
+class ScriptedAttack:
+    """
+    One coordinated attack of a scenario: from tick `start` (counted from the
+    generator's first tick) for `duration` ticks, the target locations report
+    anomalous readings on `streams`. Targets are given by `locations` (names)
+    or drawn from the fleet with the generator's seed: `count` locations or a
+    `fraction` of the fleet. With `stagger`, each target joins at a random
+    tick in [start, start + stagger).
+    """
+    def __init__(self, start, duration, locations=None, count=None, fraction=None, streams=ATTACK_STREAMS, stagger=0, name=None):
+        if start < 0 or duration <= 0 or stagger < 0:
+            raise ValueError(f"Attack {name or ''} needs start >= 0, duration > 0 and stagger >= 0.")
+        if sum(target is not None for target in (locations, count, fraction)) != 1:
+            raise ValueError(f"Attack {name or ''} needs exactly one of locations, count or fraction.")
+        if not streams or set(streams) - set(ATTACK_STREAMS):
+            raise ValueError(f"Attack {name or ''} streams must be among {ATTACK_STREAMS}.")
+        self.start = int(start); self.duration = int(duration); self.stagger = int(stagger)
+        self.locations = locations; self.count = count; self.fraction = fraction
+        self.streams = tuple(streams)
+        self.name = name
+
+    @classmethod
+    def from_dict(cls, attack):
+        try:
+            return cls(**attack)
+        except TypeError as e:
+            raise ValueError(f"Invalid scenario attack {attack!r}: {e}") from None
+
+    def resolve(self, names, rng):
+        """The (location ids, start ticks) of this attack in a fleet with location `names`."""
+        if self.locations is not None:
+            index = {name: i for i, name in enumerate(names)}
+            unknown = [location for location in self.locations if location not in index]
+            if unknown:
+                raise ValueError(f"Attack {self.name or ''} targets unknown locations: {unknown[:5]}")
+            ids = np.array([index[location] for location in self.locations], dtype=np.intp)
+        else:
+            count = self.count if self.count is not None else int(round(self.fraction * len(names)))
+            ids = np.sort(rng.choice(len(names), size=min(count, len(names)), replace=False))
+        starts = self.start + (rng.integers(0, self.stagger, len(ids)) if self.stagger else np.zeros(len(ids), dtype=np.int64))
+        return ids, starts
+
+def _flat(parts, dtype):
+    return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+class GridLoadGenerator:
+    """
+    Fleet-scale telemetry for load testing: thousands of substations/PMUs,
+    each with its own state (voltage offset, load-cycle phase, phase-angle
+    offset and storm process), advanced together once per tick with
+    vectorized draws. Storms start independently per location; scripted
+    attacks (see load_scenario) force coordinated anomalies on top. A seed
+    makes the whole run reproducible.
+    next_tick() returns one tick's frames in DataSimulator.generate_batch()
+    format: `frames_per_tick` reporting locations (all of them when None),
+    each with the tick's timestamp.
+    """
+    def __init__(self, n_locations=FLEET_LOCATIONS, seed=None, start_timestamp=None, frames_per_tick=None,
+                 storm_probability=FLEET_STORM_PROBABILITY, attacks=()):
+        self.rng = np.random.default_rng(seed)
+        self.names = np.array(location_names(n_locations), dtype=object)
+        self.n_locations = n_locations
+        self.frames_per_tick = n_locations if frames_per_tick is None else min(frames_per_tick, n_locations)
+        self.storm_probability = storm_probability
+        self.timestamp = int(time.time()) if start_timestamp is None else int(start_timestamp)
+        self.tick = 0
+        # Per-location operating points, kept within the spread the models were trained on.
+        rng = self.rng
+        self.voltage_offset = rng.normal(0, 0.5, n_locations)
+        self.load_phase = rng.uniform(0, 2 * np.pi, n_locations)
+        self.phase_offset = rng.normal(0, 0.02, n_locations)
+        self.storm_left = np.zeros(n_locations, dtype=np.int32)
+        # Scripted attacks as flat per-target arrays: location, first and end tick, streams hit.
+        targets = [(attack, *attack.resolve(self.names, rng)) for attack in attacks]
+        self._attack_ids = _flat([ids for _, ids, _ in targets], np.intp)
+        self._attack_first = _flat([starts for _, _, starts in targets], np.int64)
+        self._attack_end = self._attack_first + _flat([np.full(len(ids), attack.duration) for attack, ids, _ in targets], np.int64)
+        self._attack_scada = _flat([np.full(len(ids), 'scada' in attack.streams) for attack, ids, _ in targets], bool)
+        self._attack_pmu = _flat([np.full(len(ids), 'pmu' in attack.streams) for attack, ids, _ in targets], bool)
+
+    def _storms(self):
+        """Advances every location's storm process one tick; returns the mask of locations in a storm."""
+        calm = self.storm_left == 0
+        starting = calm & (self.rng.random(self.n_locations) < self.storm_probability)
+        # A storm lasts its starting tick plus randint(STORM_MIN_TICKS, STORM_MAX_TICKS), as in DataSimulator.
+        self.storm_left[starting] = self.rng.integers(STORM_MIN_TICKS, STORM_MAX_TICKS + 1, int(starting.sum())) + 1
+        storming = self.storm_left > 0
+        self.storm_left[storming] -= 1
+        return storming
+
+    def _attacks(self):
+        """The (scada, pmu) masks of locations under a scripted attack this tick."""
+        scada = np.zeros(self.n_locations, dtype=bool); pmu = np.zeros(self.n_locations, dtype=bool)
+        active = (self._attack_first <= self.tick) & (self.tick < self._attack_end)
+        if active.any():
+            ids = self._attack_ids[active]
+            scada[ids[self._attack_scada[active]]] = True
+            pmu[ids[self._attack_pmu[active]]] = True
+        return scada, pmu
+
+    def next_tick(self):
+        self.timestamp += 1
+        storming = self._storms()
+        attacked_scada, attacked_pmu = self._attacks()
+        self.tick += 1
+        rng = self.rng
+        n = self.frames_per_tick
+        rows = np.arange(n) if n == self.n_locations else np.sort(rng.choice(self.n_locations, size=n, replace=False))
+        scada_anomaly = (storming | attacked_scada)[rows]
+        pmu_anomaly = (storming | attacked_pmu)[rows]
+
+        voltage = 230.0 + self.voltage_offset[rows] + rng.normal(0, 2, n)
+        # The load cycle runs on the tick count, not the clock, so the seed alone fixes every reading.
+        current = 50.0 + rng.normal(0, 5, n) * (1 + np.sin(self.tick / 60 + self.load_phase[rows]))
+        frequency = 50.0 + rng.normal(0, 0.02, n)
+        phase_angle_A = 15.0 + self.phase_offset[rows] + rng.normal(0, 0.1, n)
+        magnitude_A = 1.0 + rng.normal(0, 0.005, n)
+        s = np.flatnonzero(scada_anomaly); k = len(s)
+        voltage[s] = 230.0 + rng.uniform(15, 20, k)
+        current[s] = 50.0 - rng.uniform(25, 30, k)
+        frequency[s] = 50.0 + rng.uniform(0.8, 1.2, k)
+        p = np.flatnonzero(pmu_anomaly); k = len(p)
+        phase_angle_A[p] = 15.0 + rng.uniform(1, 2, k)
+        magnitude_A[p] = 1.0 - rng.uniform(0.05, 0.1, k)
+        return {
+            'timestamp': np.full(n, self.timestamp, dtype=np.int64),
+            'is_true_anomaly': scada_anomaly | pmu_anomaly,
+            'location_id': rows.astype(np.int32),
+            'voltage': np.round(voltage, 2, out=voltage),
+            'current': np.round(current, 2, out=current),
+            'frequency': np.round(frequency, 3, out=frequency),
+            'breaker_status': np.ones(n, dtype=np.int8),
+            'phase_angle_A': np.round(phase_angle_A, 4, out=phase_angle_A),
+            'magnitude_A': np.round(magnitude_A, 4, out=magnitude_A),
+            'location': self.names[rows],
+        }
+
+    def ticks(self, n_ticks=None):
+        """Yields next_tick() `n_ticks` times (forever if None), counting from wherever the generator is."""
+        if n_ticks is None:
+            while True:
+                yield self.next_tick()
+        for _ in range(n_ticks):
+            yield self.next_tick()
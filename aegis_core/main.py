@@ -1,12 +1,27 @@
 import os
 import time
-import pandas as pd
-from collections import deque
+import json
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Use relative imports within the package
 from .data_simulator import DataSimulator
+from .load_generator import FLEET_HIGH_STORM_PROBABILITY, FLEET_LOCATIONS, FLEET_STORM_PROBABILITY, GridLoadGenerator, load_scenario
 from .analyzers import ScadaAnalyzer, PmuAnalyzer
 from .fusion_center import FusionCenter
+from .adaptation import OnlineAdapter
+from .cascade import GATE_SAMPLE_INTERVAL, CascadeCounters
+from .journal import AlertJournal, JournalBusyError
+from .daemon import DEFAULT_DAEMON_PORT, EngineDaemon
+from .executors import make_executor, score_pmu
+from .pacing import TickPacer
+from .instrumentation import LoopStats
+from .telemetry import DEFAULT_CHUNKSIZE, iter_telemetry_chunks
+from .replay import REPLAY_BATCH_SIZE, TelemetryReplay
+from .model_registry import ADOPTED_DATA, ModelRegistry, training_key
+from .ingest import DEFAULT_MAX_BATCH, DEFAULT_MAX_DELAY, FrameIngestServer, SimulatorPublisher
 
 # Define file paths relative to this file's location
 CORE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -19,80 +34,463 @@ PMU_MODEL_PATH = os.path.join(MODEL_DIR, 'pmu_model.h5')
 PMU_SCALER_PATH = os.path.join(MODEL_DIR, 'pmu_scaler.joblib')
 PMU_THRESHOLD_PATH = os.path.join(MODEL_DIR, 'pmu_threshold.joblib')
 
+# Saved artifacts of each model, in load_model() argument order.
+MODEL_ARTIFACTS = {
+    'scada': (SCADA_MODEL_PATH, SCADA_SCALER_PATH),
+    'pmu': (PMU_MODEL_PATH, PMU_SCALER_PATH, PMU_THRESHOLD_PATH),
+}
+MODEL_LABELS = {'scada': 'SCADA', 'pmu': 'PMU'}
+
+# Default location of the persistent verdict and alert journal.
+JOURNAL_DIR = os.path.join(ROOT_DIR, 'data', 'journal')
+
+# Recorded telemetry used for training when present (CSV or columnar directory).
+HISTORICAL_DATA_PATH = os.path.join(ROOT_DIR, 'data', 'historical_data.csv')
+
+# Number of simulated readings used when a model has to be trained from scratch.
+TRAINING_SAMPLES = 2000
+# The simulated training set is generated from this fixed recipe, so it is identical
+# on every machine and the recipe itself can stand in for the data in the cache key.
+TRAINING_DATA_RECIPE = {'source': 'simulator', 'samples': TRAINING_SAMPLES, 'seed': 0, 'start_timestamp': 1_700_000_000, 'high_anomaly_mode': False}
+
+# How often (in seconds) the loop reports pacing and, when instrumented, stage statistics.
+STATUS_REPORT_INTERVAL = 30.0
+
 class AegisCore:
     """
     The main backend engine for the AegisGRID platform.
     This class handles all simulation, analysis, and fusion logic.
     """
-    def __init__(self, high_anomaly_mode=False, update_callback=None):
+    def __init__(self, high_anomaly_mode=False, update_callback=None, pmu_backend='numpy', pacing='wallclock', tick_rate_hz=None, n_locations=None, instrument=False, report_interval=STATUS_REPORT_INTERVAL, executor='thread', executor_workers=None, adapt=False, journal_path=None, cascade=False, cascade_sample_interval=GATE_SAMPLE_INTERVAL, fleet=False, frames_per_tick=None, scenario_path=None, seed=None):
         self.high_anomaly_mode = high_anomaly_mode
+        self.n_locations = n_locations
+        # Fleet mode: a GridLoadGenerator reports many locations per tick (n_locations defaults to FLEET_LOCATIONS).
+        self.fleet = fleet or scenario_path is not None
+        self.frames_per_tick = frames_per_tick
+        self.scenario_path = scenario_path
+        self.seed = seed
         self.update_callback = update_callback or (lambda msg: print(msg))
+        self.pacer = TickPacer(pacing, tick_rate_hz)
+        self.report_interval = report_interval
+        self.executor_kind = executor
+        self.executor_options = {'n_workers': executor_workers} if executor == 'process' else {}
+        # Detection cascade: cheap per-location bounds decide which PMU windows the autoencoder scores.
+        if cascade:
+            self.executor_options['gate'] = {'sample_interval': cascade_sample_interval}
+        self.cascade_counters = CascadeCounters() if cascade else None
+        # Per-stage timers are only allocated (and only read on the hot path) when instrumented.
+        self.loop_stats = LoopStats() if instrument else None
+        # Online adaptation: periodic background refits, swapped into the loop.
+        self.adapt = adapt
+        self.adapter = None
+        # Every verdict of the live loop is journaled to disk when a path is given.
+        self.journal_path = journal_path
+        self.journal = None
+        # Wall-clock second of the live loop's current tick, which verdicts are stamped with. The
+        # simulated timestamps run ahead of the clock when pacing is not real-time.
+        self.tick_time = 0
 
         self.scada_analyzer = ScadaAnalyzer()
-        self.pmu_analyzer = PmuAnalyzer(timesteps=10)
+        self.pmu_analyzer = PmuAnalyzer(timesteps=10, backend=pmu_backend)
         self.fusion_center = FusionCenter()
+        self.registry = ModelRegistry(MODEL_DIR)
+        
+        # --- Background model loading and startup timing ---
+        self.models_ready = threading.Event()
+        self._model_thread = None
+        self._model_error = None
+        self._startup = {'created': time.perf_counter()}
+        self._training_frame = None
+        self.ingest_scorer = None
         
         os.makedirs(MODEL_DIR, exist_ok=True)
 
-    def _initialize_models(self):
-        """Loads or trains the AI models."""
-        self.update_callback("Initializing backend modules...")
+    def load_models_async(self):
+        """Starts loading (or training) the models on a background thread; safe to call repeatedly."""
+        if self._model_thread is None:
+            self._model_thread = threading.Thread(target=self._load_models_worker, name="aegis-model-loader", daemon=True)
+            self._model_thread.start()
+        return self._model_thread
+
+    def _load_models_worker(self):
+        try:
+            self._initialize_models()
+            self._startup['models_ready'] = time.perf_counter()
+        except Exception as e:
+            self._model_error = e
+            self.update_callback(f"Model initialization failed: {e}")
+        finally:
+            self.models_ready.set()
+
+    def wait_for_models(self, stop_event=None, poll_interval=0.1):
+        """Blocks until the models are loaded. Returns False if `stop_event` was set first."""
+        self.load_models_async()
+        while not self.models_ready.wait(poll_interval):
+            if stop_event is not None and stop_event.is_set():
+                return False
+        if self._model_error is not None:
+            raise self._model_error
+        return True
+
+    def startup_report(self):
+        """Seconds from engine creation to each startup milestone reached so far."""
+        t0 = self._startup['created']
+        return {stage: round(t - t0, 4) for stage, t in self._startup.items() if stage != 'created'}
+
+    def stats(self, histogram=False):
+        """Live loop statistics: stage latencies and counters (when instrumented) plus pacing."""
+        stats = {'instrumented': self.loop_stats is not None, 'pacing': self.pacer.report()}
+        if self.loop_stats is not None:
+            stats.update(self.loop_stats.snapshot(histogram))
+        if self.adapter is not None:
+            stats['adaptation'] = dict(self.adapter.stats)
+        if self.cascade_counters is not None:
+            stats['cascade'] = self.cascade_counters.snapshot()
+        return stats
+
+    def _training_data(self):
+        """Generates (once) the normal-mode dataset both models are trained on."""
+        if self._training_frame is None:
+            recipe = TRAINING_DATA_RECIPE
+            simulator = DataSimulator(high_anomaly_mode=recipe['high_anomaly_mode'], seed=recipe['seed'], start_timestamp=recipe['start_timestamp'])
+            self._training_frame = simulator.generate_batch(recipe['samples'], as_frame=True)
+        return self._training_frame
 
-        # --- LOAD OR TRAIN SCADA MODEL ---
-        if os.path.exists(SCADA_MODEL_PATH) and os.path.exists(SCADA_SCALER_PATH):
-            self.update_callback("Loading pre-trained SCADA model...")
-            self.scada_analyzer.load_model(SCADA_MODEL_PATH, SCADA_SCALER_PATH)
+    def _has_history(self, path=HISTORICAL_DATA_PATH):
+        return os.path.isdir(path) or (os.path.isfile(path) and os.path.getsize(path) > 0)
+
+    def _train_scada(self, history_path=None, chunksize=DEFAULT_CHUNKSIZE):
+        if history_path is not None:
+            self.scada_analyzer.train_stream(iter_telemetry_chunks(history_path, self.scada_analyzer.features, chunksize))
         else:
-            self.update_callback("No pre-trained SCADA model found. Training new model...")
-            training_simulator = DataSimulator(high_anomaly_mode=False)
-            training_data = [training_simulator.get_data_point() for _ in range(2000)]
-            scada_training_data = pd.DataFrame([d['scada'] for d in training_data])
-            self.scada_analyzer.train(scada_training_data)
-            self.update_callback("Saving new SCADA model...")
-            self.scada_analyzer.save_model(SCADA_MODEL_PATH, SCADA_SCALER_PATH)
-
-        # --- LOAD OR TRAIN PMU MODEL ---
-        if all(os.path.exists(p) for p in [PMU_MODEL_PATH, PMU_SCALER_PATH, PMU_THRESHOLD_PATH]):
-            self.update_callback("Loading pre-trained PMU model...")
-            self.pmu_analyzer.load_model(PMU_MODEL_PATH, PMU_SCALER_PATH, PMU_THRESHOLD_PATH)
+            self.scada_analyzer.train(self._training_data())
+
+    def _train_pmu(self, history_path=None, chunksize=DEFAULT_CHUNKSIZE, epochs=20):
+        if history_path is not None:
+            self.pmu_analyzer.train_stream(lambda: iter_telemetry_chunks(history_path, self.pmu_analyzer.features, chunksize), epochs=epochs)
         else:
-            self.update_callback("No pre-trained PMU model found. Training new model...")
-            training_simulator = DataSimulator(high_anomaly_mode=False)
-            training_data = [training_simulator.get_data_point() for _ in range(2000)]
-            pmu_training_data = pd.DataFrame([d['pmu'] for d in training_data])
-            self.pmu_analyzer.train(pmu_training_data)
-            self.update_callback("Saving new PMU model...")
-            self.pmu_analyzer.save_model(PMU_MODEL_PATH, PMU_SCALER_PATH, PMU_THRESHOLD_PATH)
+            self.pmu_analyzer.train(self._training_data(), epochs=epochs)
+
+    def _data_identity(self, history_path=None):
+        """
+        What the models are trained on, for the cache key: a content hash of recorded
+        telemetry (rehashed only when its files changed) or the simulator recipe.
+        """
+        if history_path is None:
+            return TRAINING_DATA_RECIPE
+        return {'source': 'history', 'sha256': self.registry.data_fingerprint(history_path)}
+
+    def _model_key(self, name, data, epochs=20):
+        analyzer = self.scada_analyzer if name == 'scada' else self.pmu_analyzer
+        config = analyzer.training_config() if name == 'scada' else analyzer.training_config(epochs=epochs)
+        return config, training_key(config, data)
+
+    def _load_verified(self, name, data):
+        """Loads model `name` if its artifacts are current and intact. Returns None on success, else why it is stale."""
+        analyzer = self.scada_analyzer if name == 'scada' else self.pmu_analyzer
+        paths = MODEL_ARTIFACTS[name]
+        # Artifacts saved before the registry existed are adopted once if they pass validation. Their
+        # training data is unknown, so they are registered as adopted rather than under `data`, and
+        # only stand in for simulator-trained models.
+        adopting = name not in self.registry.entries and all(os.path.isfile(p) for p in paths)
+        if adopting or self.registry.adopted(name):
+            if data != TRAINING_DATA_RECIPE:
+                return "adopted artifacts were not trained on the recorded telemetry"
+            data = ADOPTED_DATA
+        config, key = self._model_key(name, data)
+        if not adopting:
+            problem = self.registry.problem(name, key, paths)
+            if problem is not None:
+                return problem
+        try:
+            analyzer.load_model(*paths)
+            analyzer.validate()
+        except Exception as e:
+            return f"artifacts failed validation ({type(e).__name__}: {e})"
+        if adopting:
+            self.registry.record(name, key, paths, config, data)
+            self.update_callback(f"Registered the existing {MODEL_LABELS[name]} model artifacts as adopted (training data unknown).")
+        return None
+
+    def _train_models(self, names, history_path=None, chunksize=DEFAULT_CHUNKSIZE, epochs=20):
+        """Trains the given models concurrently on one shared dataset, then saves and registers them."""
+        trainers = {
+            'scada': lambda: self._train_scada(history_path, chunksize),
+            'pmu': lambda: self._train_pmu(history_path, chunksize, epochs),
+        }
+        if history_path is None:
+            self._training_data()  # Generate the shared dataset once, before the trainers start.
+        # Isolation Forest fitting and TensorFlow both release the GIL, so the two overlap well on threads.
+        with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="aegis-train") as pool:
+            futures = {name: pool.submit(trainers[name]) for name in names}
+        data = self._data_identity(history_path)
+        for name, future in futures.items():
+            future.result()
+            self.update_callback(f"Saving new {MODEL_LABELS[name]} model...")
+            if name == 'scada':
+                self.scada_analyzer.save_model(*MODEL_ARTIFACTS['scada'])
+            else:
+                self.pmu_analyzer.save_model(*MODEL_ARTIFACTS['pmu'])
+            config, key = self._model_key(name, data, epochs)
+            self.registry.record(name, key, MODEL_ARTIFACTS[name], config, data)
+
+    def train_from_history(self, path, chunksize=DEFAULT_CHUNKSIZE, epochs=20):
+        """Retrains both models by streaming recorded telemetry from `path` and saves them."""
+        self.update_callback(f"Training SCADA and PMU models from {path}...")
+        self._train_models(['scada', 'pmu'], path, chunksize, epochs)
+        self.update_callback("Saved models trained on recorded telemetry.")
+
+    def _initialize_models(self):
+        """Loads the models the registry vouches for and retrains only the stale ones."""
+        self.update_callback("Initializing backend modules...")
+
+        history_path = HISTORICAL_DATA_PATH if self._has_history() else None
+        data = self._data_identity(history_path)
+
+        stale = []
+        for step, name in enumerate(MODEL_ARTIFACTS, 1):
+            problem = self._load_verified(name, data)
+            if problem is None:
+                kind = "adopted" if self.registry.adopted(name) else "verified"
+                self.update_callback(f"Loaded {kind} {MODEL_LABELS[name]} model. [{step}/2]")
+            else:
+                self.update_callback(f"{MODEL_LABELS[name]} model must be retrained: {problem}. [{step}/2]")
+                stale.append(name)
+        if stale:
+            self.update_callback(f"Training new {' and '.join(MODEL_LABELS[name] for name in stale)} model{'s' if len(stale) > 1 else ''}...")
+            self._train_models(stale, history_path)
+
+    def _session_fusion_center(self):
+        """A fusion center with the live loop's settings but its own alert edges, for a replay or ingest session."""
+        fusion_center = FusionCenter(self.fusion_center.scada_weight, self.fusion_center.pmu_weight)
+        fusion_center.alert_threshold = self.fusion_center.alert_threshold
+        return fusion_center
+
+    def replay(self, path, batch_size=REPLAY_BATCH_SIZE):
+        """
+        Replays recorded telemetry (CSV or columnar directory) through the analyzers
+        and fusion center at full speed. Returns {'alerts': DataFrame, 'metrics': dict}.
+        """
+        self.wait_for_models()
+        self.update_callback(f"Replaying recorded telemetry from {path}...")
+        result = TelemetryReplay(self.scada_analyzer, self.pmu_analyzer, self._session_fusion_center(), batch_size).run(path)
+        metrics = result['metrics']
+        summary = f"Replay complete: {metrics['rows']} rows, {len(result['alerts'])} alerts, {metrics['rows_per_second']:.0f} rows/s."
+        if 'aegis' in metrics:
+            summary += f" Precision {metrics['aegis']['precision']:.2%}, recall {metrics['aegis']['recall']:.2%}."
+        self.update_callback(summary)
+        return result
+
+    async def ingest(self, server, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY):
+        """
+        Scores the frame batches arriving at a FrameIngestServer and yields one
+        DataFrame of fused alerts per batch, in the replay format. Scoring runs
+        on a worker thread so the sockets keep draining in the meantime.
+        Labelled (simulated) feeds are also scored in `self.ingest_scorer.metrics()`.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.wait_for_models)
+        self.update_callback("Initialization complete. Scoring ingested frames.")
+        self.ingest_scorer = TelemetryReplay(self.scada_analyzer, self.pmu_analyzer, self._session_fusion_center())
+        while True:
+            frames = await server.next_batch(max_batch, max_delay)
+            if frames is None:
+                break
+            yield await loop.run_in_executor(None, self.ingest_scorer.score_alerts, server.columns(frames))
+
+    def _open_journal(self):
+        """The live loop's journal writer, or None when journaling is off or another writer holds the journal."""
+        if not self.journal_path:
+            return None
+        try:
+            return AlertJournal(self.journal_path)
+        except JournalBusyError as e:
+            self.update_callback(f"Journaling disabled for this run: {e}")
+            return None
+
+    def query_alerts(self, location=None, start=None, end=None):
+        """Journaled alerts at `location` (all if None) between epoch seconds `start` and `end`, as a DataFrame."""
+        if self.journal is not None:
+            return self.journal.query(location, start, end)
+        journal = AlertJournal(self.journal_path or JOURNAL_DIR, read_only=True)
+        try:
+            return journal.query(location, start, end)
+        finally:
+            journal.close()
+
+    def _score_pmu(self, pmu_windows, locations, pmu_points):
+        """Pushes a tick's PMU samples into their location windows and scores all ready windows in one batch."""
+        return score_pmu(self.pmu_analyzer, pmu_windows, locations, pmu_points)
+
+    def _report_status(self):
+        self.update_callback(self.pacer.describe())
+        if self.loop_stats is not None:
+            self.update_callback(self.loop_stats.describe())
+        if self.cascade_counters is not None:
+            self.update_callback(self.cascade_counters.describe())
+
+    def _live_ticks(self):
+        """
+        Yields the live loop's ticks as (timestamp, locations, scada_points,
+        pmu_points, is_true_anomaly): one DataSimulator reading per tick, or in
+        fleet mode one GridLoadGenerator frame batch as columnar arrays.
+        """
+        if not self.fleet:
+            live_simulator = DataSimulator(high_anomaly_mode=self.high_anomaly_mode, seed=self.seed, n_locations=self.n_locations)
+            while True:
+                live_data = live_simulator.get_data_point()
+                yield live_data['timestamp'], [live_data['location']], [live_data['scada']], [live_data['pmu']], [live_data['is_true_anomaly']]
+        attacks = load_scenario(self.scenario_path) if self.scenario_path else ()
+        storm_probability = FLEET_HIGH_STORM_PROBABILITY if self.high_anomaly_mode else FLEET_STORM_PROBABILITY
+        generator = GridLoadGenerator(self.n_locations or FLEET_LOCATIONS, seed=self.seed, frames_per_tick=self.frames_per_tick,
+                                      storm_probability=storm_probability, attacks=attacks)
+        self.update_callback(f"Load generator: {generator.n_locations} locations, {generator.frames_per_tick} frames per tick, {len(attacks)} scripted attacks.")
+        while True:
+            frame = generator.next_tick()
+            yield generator.timestamp, frame['location'].tolist(), frame, frame, frame['is_true_anomaly']
 
     def run_simulation_generator(self, stop_event):
         """
         A generator that runs the simulation loop and yields status updates.
         """
-        self._initialize_models()
+        if not self.wait_for_models(stop_event):
+            self.update_callback("Simulation thread has stopped.")
+            return
         self.update_callback("Initialization complete. Starting real-time monitoring.")
         
-        live_simulator = DataSimulator(high_anomaly_mode=self.high_anomaly_mode)
-        pmu_history = deque(maxlen=self.pmu_analyzer.timesteps)
-        last_alert_status = False
-
-        while not stop_event.is_set():
-            live_data = live_simulator.get_data_point()
-            scada_result = self.scada_analyzer.analyze(live_data['scada'])
-            pmu_history.append(live_data['pmu'])
-            pmu_result = self.pmu_analyzer.analyze(list(pmu_history))
-            final_alert = self.fusion_center.fuse(scada_result, pmu_result)
-            
-            final_alert['location'] = live_data['location']
-            final_alert['is_new_alert'] = final_alert['aegis_alert'] and not last_alert_status
-            last_alert_status = final_alert['aegis_alert']
-            
-            yield final_alert # Yield the result dictionary
-            time.sleep(1)
+        live_ticks = self._live_ticks()
+        # The executor owns the per-location PMU windows and decides where each analyzer runs.
+        executor = make_executor(self.executor_kind, self.scada_analyzer, self.pmu_analyzer, **self.executor_options)
+        executor.start()
+        journal = self.journal = self._open_journal()
+        adapter = self.adapter = OnlineAdapter(self.scada_analyzer, self.pmu_analyzer, prepare_swap=executor.prepare_swap,
+                                               update_callback=self.update_callback) if self.adapt else None
+        self.pacer.start()
+        last_report = time.perf_counter()
+        loop_stats = self.loop_stats
+        cascade_counters = self.cascade_counters
+        executor.timed = loop_stats is not None
+        clock = time.perf_counter_ns
+
+        try:
+            while not stop_event.is_set():
+                if loop_stats: t0 = clock()
+                _, locations, scada_points, pmu_points, is_true_anomaly = next(live_ticks)
+                self.tick_time = int(time.time())
+                if loop_stats: t1 = clock()
+                scada_results, pmu_results = executor.analyze(locations, scada_points, pmu_points)
+                if loop_stats: t2 = clock()
+                # Fusion also flags per-location alert edges (is_new_alert).
+                if loop_stats:
+                    records, aegis_alert, is_new_alert = self.fusion_center.fuse_records(scada_results, pmu_results, locations, with_flags=True)
+                    loop_stats.record_tick(t0, t1, t2, clock(), executor.timings, aegis_alert, is_new_alert)
+                else:
+                    records = self.fusion_center.fuse_records(scada_results, pmu_results, locations)
+                if cascade_counters is not None:
+                    cascade_counters.record(pmu_results['stage'], is_true_anomaly)
+                if journal is not None:
+                    for record in records:
+                        journal.append(self.tick_time, record)
+                if adapter is not None:
+                    adapter.observe(locations, scada_points, pmu_points, [record.aegis_alert for record in records])
+                    adapted = adapter.poll()
+                    if adapted is not None:
+                        # Whole analyzers are replaced between ticks; a running tick never sees a mix.
+                        executor.swap(*adapted, adapter.swap_message)
+                        self.scada_analyzer, self.pmu_analyzer = adapted
+                
+                if 'first_verdict' not in self._startup:
+                    self._startup['first_verdict'] = time.perf_counter()
+                    report = self.startup_report()
+                    self.update_callback(f"Startup: models ready in {report['models_ready']:.2f}s, first verdict in {report['first_verdict']:.2f}s.")
+                
+                yield from records # One AlertRecord per reading of the tick
+                self.pacer.wait(stop_event)
+                if time.perf_counter() - last_report >= self.report_interval:
+                    last_report = time.perf_counter()
+                    self._report_status()
+        finally:
+            executor.close()
+            if journal is not None:
+                journal.close()
+                self.journal = None
         
+        self._report_status()
         self.update_callback("Simulation thread has stopped.")
 
-def run_cli_mode():
+def _parse_cli_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m aegis_core.main", description="Run the AegisGRID engine without the UI.")
+    parser.add_argument("--pacing", choices=TickPacer.MODES, default=None, help="Tick pacing policy (default: wallclock, or fixed when --rate is given).")
+    parser.add_argument("--rate", type=float, default=None, help="Target tick rate in Hz for --pacing fixed.")
+    parser.add_argument("--train-from", metavar="PATH", default=None, help="Retrain both models from recorded telemetry (CSV or columnar directory) before monitoring.")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk when streaming --train-from data.")
+    parser.add_argument("--executor", choices=('serial', 'thread', 'process'), default='thread', help="Where the analyzers run: back-to-back, on two threads, or sharded across processes.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --executor process (default: CPU count, max 8).")
+    parser.add_argument("--adapt", action="store_true", help="Adapt the models to drift while monitoring: periodic background refits on recent readings.")
+    parser.add_argument("--cascade", action="store_true", help="Run the PMU autoencoder only on windows a cheap first stage finds suspicious, plus a periodic sample.")
+    parser.add_argument("--cascade-sample", type=int, default=GATE_SAMPLE_INTERVAL, help="With --cascade, score every location's window at least once per this many of its samples.")
+    parser.add_argument("--journal", metavar="PATH", default=None, help="Record every verdict to an append-only journal directory.")
+    parser.add_argument("--alerts-at", metavar="LOCATION", default=None, help="Print the journaled alerts at LOCATION ('all' for every location) and exit.")
+    parser.add_argument("--hours", type=float, default=24.0, help="How far back --alerts-at looks.")
+    parser.add_argument("--stats", action="store_true", help="Instrument the loop and print per-stage latency statistics.")
+    parser.add_argument("--stats-interval", type=float, default=STATUS_REPORT_INTERVAL, help="Seconds between status reports.")
+    parser.add_argument("--ingest-tcp", metavar="PORT", type=int, default=None, help="Score binary frames received on this TCP port instead of running the simulator.")
+    parser.add_argument("--ingest-udp", metavar="PORT", type=int, default=None, help="Score binary frames received on this UDP port.")
+    parser.add_argument("--ingest-host", default="127.0.0.1", help="Address the ingest listeners bind to.")
+    parser.add_argument("--publishers", type=int, default=0, help="Local simulator feeds to start against the ingest listener.")
+    parser.add_argument("--frames-per-tick", type=int, default=None, help="Readings each local publisher sends per tick (default 1), or locations reporting per tick with --fleet (default all).")
+    parser.add_argument("--fleet", metavar="N", type=int, default=None, help="Drive the loop with a load generator of N independently stateful locations.")
+    parser.add_argument("--scenario", metavar="PATH", default=None, help="Scripted coordinated attacks (JSON) for the --fleet load generator.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the simulated telemetry, for reproducible runs.")
+    parser.add_argument("--daemon", action="store_true", help="Run headless and publish verdicts to subscribing consoles (python -m ui_desktop.main_ui --connect HOST:PORT).")
+    parser.add_argument("--daemon-host", default="127.0.0.1", help="Address the daemon listens on.")
+    parser.add_argument("--daemon-port", type=int, default=DEFAULT_DAEMON_PORT, help="Port the daemon listens on.")
+    parser.add_argument("--replay", metavar="PATH", default=None, help="Replay recorded telemetry at full speed, print precision/recall and exit.")
+    args = parser.parse_args(argv)
+    if args.pacing is None:
+        args.pacing = 'fixed' if args.rate else 'wallclock'
+    return args
+
+async def _run_ingest_cli(core, args):
+    server = FrameIngestServer()
+    feeds = []
+    if args.ingest_tcp is not None:
+        feeds.append(('tcp', await server.start_tcp(args.ingest_host, args.ingest_tcp)))
+    if args.ingest_udp is not None:
+        feeds.append(('udp', await server.start_udp(args.ingest_host, args.ingest_udp)))
+    for transport, port in feeds:
+        print(f"[{time.strftime('%H:%M:%S')}] [SETUP] Listening for {transport.upper()} frames on {args.ingest_host}:{port}")
+    publishers = []
+    for i in range(args.publishers):
+        transport, port = feeds[i % len(feeds)]
+        publisher = SimulatorPublisher(args.ingest_host, port, transport, rate_hz=args.rate or 1.0, frames_per_tick=args.frames_per_tick or 1,
+                                       n_locations=6, location_offset=6 * i, high_anomaly_mode=True)
+        publishers.append(asyncio.create_task(publisher.run()))
+    try:
+        async for alerts in core.ingest(server):
+            for status in alerts[alerts['is_new_alert']].itertuples():
+                print(f"\033[91mALERT! @ {status.location} | t={status.timestamp} | Confidence: {status.combined_confidence:.0%}\033[0m")
+    finally:
+        for task in publishers:
+            task.cancel()
+        await server.close()
+        metrics = core.ingest_scorer.metrics() if core.ingest_scorer is not None else {}
+        print(json.dumps({'ingest': server.stats, **metrics}, indent=2))
+
+async def _run_daemon_cli(core, args):
+    daemon = EngineDaemon(core, args.daemon_host, args.daemon_port)
+    port = await daemon.start()
+    print(f"[{time.strftime('%H:%M:%S')}] [SETUP] Publishing verdicts to subscribers on {args.daemon_host}:{port}")
+    daemon.start_engine(high_anomaly_mode=core.high_anomaly_mode)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await daemon.close()
+        print(json.dumps({'daemon': daemon.stats}, indent=2))
+
+def run_cli_mode(argv=None):
     """Function to run the core logic in a command-line interface for testing."""
+    args = _parse_cli_args(argv)
     print("--- [AegisGRID CLI Test Mode] ---")
     stop_event = threading.Event()
     
@@ -100,19 +498,51 @@ def run_cli_mode():
         if isinstance(message, str):
             print(f"[{time.strftime('%H:%M:%S')}] [SETUP] {message}")
 
-    core = AegisCore(high_anomaly_mode=True, update_callback=cli_callback)
+    core = AegisCore(high_anomaly_mode=True, update_callback=cli_callback, pacing=args.pacing, tick_rate_hz=args.rate, instrument=args.stats, report_interval=args.stats_interval, executor=args.executor, executor_workers=args.workers, adapt=args.adapt, journal_path=args.journal, cascade=args.cascade, cascade_sample_interval=args.cascade_sample,
+                      n_locations=args.fleet, fleet=args.fleet is not None, frames_per_tick=args.frames_per_tick, scenario_path=args.scenario, seed=args.seed)
+    if args.alerts_at:
+        alerts = core.query_alerts(None if args.alerts_at == 'all' else args.alerts_at, start=time.time() - args.hours * 3600)
+        for status in alerts.itertuples():
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(status.timestamp))} | {status.location} | {status.combined_confidence:.0%} | {status.reason}")
+        print(f"{len(alerts)} alerts in the last {args.hours:g}h.")
+        return
+    if args.train_from:
+        core.train_from_history(args.train_from, chunksize=args.chunksize)
+    if args.replay:
+        result = core.replay(args.replay)
+        for status in result['alerts'][result['alerts']['is_new_alert']].itertuples():
+            print(f"\033[91mALERT! @ {status.location} | t={status.timestamp} | Confidence: {status.combined_confidence:.0%}\033[0m")
+        print(json.dumps(result['metrics'], indent=2))
+        return
+    if args.daemon:
+        try:
+            asyncio.run(_run_daemon_cli(core, args))
+        except KeyboardInterrupt:
+            print("\n--- [Shutdown Signal Received] ---")
+        return
+    if args.ingest_tcp is not None or args.ingest_udp is not None:
+        try:
+            asyncio.run(_run_ingest_cli(core, args))
+        except KeyboardInterrupt:
+            print("\n--- [Shutdown Signal Received] ---")
+        return
     
     try:
         for status in core.run_simulation_generator(stop_event):
-            if status['aegis_alert']:
+            if core.fleet:
+                # Thousands of verdicts a tick: only new alerts are printed.
+                if status.is_new_alert:
+                    print(f"\033[91mALERT! @ {status.location} | Confidence: {status.combined_confidence:.0%}\033[0m")
+            elif status['aegis_alert']:
                 print(f"\033[91mALERT! @ {status['location']} | Confidence: {status['combined_confidence']:.0%}\033[0m")
             else:
                 print(f"\033[92mSystem Nominal | Confidence: {status['combined_confidence']:.0%}\033[0m")
     except KeyboardInterrupt:
         print("\n--- [Shutdown Signal Received] ---")
         stop_event.set()
+    if args.stats or args.cascade:
+        print(json.dumps(core.stats(histogram=args.stats), indent=2))
 
 if __name__ == "__main__":
     # This allows running `python -m aegis_core.main` for a CLI test
-    import threading
     run_cli_mode()
\ No newline at end of file
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import time
+
+MANIFEST_NAME = 'manifest.json'
+# Data identity of artifacts adopted from before the registry: their training data is unknown.
+ADOPTED_DATA = {'source': 'adopted'}
+
+def file_digest(path, block_size=1 << 20):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def data_fingerprint(path):
+    """Content hash of recorded telemetry: a CSV file or a columnar directory (every file, in name order)."""
+    if not os.path.isdir(path):
+        return file_digest(path)
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        digest.update(name.encode('utf-8'))
+        digest.update(file_digest(os.path.join(path, name)).encode('ascii'))
+    return digest.hexdigest()
+
+def file_signature(path):
+    """Cheap change detector for recorded telemetry: (name, size, mtime_ns) of the file or of every file of a directory."""
+    paths = [os.path.join(path, name) for name in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+    stats = [(os.path.basename(p), os.stat(p)) for p in paths]
+    return [[name, stat.st_size, stat.st_mtime_ns] for name, stat in stats]
+
+def training_key(config, data):
+    """
+    Cache key of a trained model: a hash of its training config and of the
+    data it is trained on (a fingerprint string or a generator recipe dict).
+    """
+    payload = json.dumps({'config': config, 'data': data}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ModelRegistry:
+    """
+    Tracks which saved artifacts belong to which training key in a JSON
+    manifest next to them, with the size and SHA-256 of every file.
+    An entry is only trusted when its key matches and every file is intact,
+    so a truncated, zero-byte or swapped artifact is retrained rather than loaded.
+    The manifest also remembers the content hash of recorded telemetry under
+    its file signature, so unchanged history is not hashed again.
+    """
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self.manifest_path = os.path.join(model_dir, MANIFEST_NAME)
+        manifest = self._read_manifest()
+        self.entries = manifest.get('models', {})
+        self.fingerprints = manifest.get('fingerprints', {})  # abspath -> {'signature': ..., 'sha256': ...}
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def _write_manifest(self):
+        # Write-then-rename, so a crash never leaves a half-written manifest behind.
+        manifest = {'models': self.entries}
+        if self.fingerprints:
+            manifest['fingerprints'] = self.fingerprints
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def data_fingerprint(self, path):
+        """data_fingerprint() of recorded telemetry, recomputed only when its file signature changed."""
+        key = os.path.abspath(path)
+        signature = file_signature(path)
+        cached = self.fingerprints.get(key)
+        if cached is not None and cached.get('signature') == signature:
+            return cached['sha256']
+        digest = data_fingerprint(path)
+        self.fingerprints[key] = {'signature': signature, 'sha256': digest}
+        self._write_manifest()
+        return digest
+
+    def problem(self, name, key, paths):
+        """Why the artifacts at `paths` cannot be used for `key`, or None if they check out."""
+        entry = self.entries.get(name)
+        if entry is None:
+            return "not in the model registry"
+        if entry.get('key') != key:
+            return "trained with a different config or dataset"
+        recorded = entry.get('files', {})
+        for path in paths:
+            info = recorded.get(os.path.basename(path))
+            if info is None:
+                return f"{os.path.basename(path)} is not recorded"
+            if not os.path.isfile(path):
+                return f"{os.path.basename(path)} is missing"
+            if os.path.getsize(path) != info['size']:
+                return f"{os.path.basename(path)} has the wrong size ({os.path.getsize(path)} bytes, expected {info['size']})"
+            if file_digest(path) != info['sha256']:
+                return f"{os.path.basename(path)} fails its checksum"
+        return None
+
+    def adopted(self, name):
+        """Whether model `name` is registered as adopted, i.e. checksummed but not keyed to its training data."""
+        return self.entries.get(name, {}).get('data') == ADOPTED_DATA
+
+    def record(self, name, key, paths, config=None, data=None):
+        """Registers freshly saved artifacts of model `name` under `key`."""
+        self.entries[name] = {
+            'key': key,
+            'config': config,
+            'data': data,
+            'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'files': {os.path.basename(path): {'size': os.path.getsize(path), 'sha256': file_digest(path)} for path in paths},
+        }
+        self._write_manifest()
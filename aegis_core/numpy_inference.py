@@ -0,0 +1,129 @@
+import json
+import numpy as np
+
+# Module-level functions (not lambdas) so engines can be pickled to worker processes.
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+def _linear(x):
+    return x
+
+ACTIVATIONS = {
+    'relu': _relu,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+    'linear': _linear,
+    None: _linear,
+}
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation for NumPy inference: {name}")
+    return ACTIVATIONS[name]
+
+class _Lstm:
+    """A Keras LSTM layer (gate order i, f, c, o) evaluated over a whole batch."""
+    def __init__(self, config, kernel, recurrent_kernel, bias=None):
+        self.units = config['units']
+        self.return_sequences = config.get('return_sequences', False)
+        self.activation = _activation(config.get('activation', 'tanh'))
+        self.recurrent_activation = _activation(config.get('recurrent_activation', 'sigmoid'))
+        self.kernel = np.asarray(kernel, dtype=np.float32)
+        self.recurrent_kernel = np.asarray(recurrent_kernel, dtype=np.float32)
+        self.bias = np.zeros(4 * self.units, dtype=np.float32) if bias is None else np.asarray(bias, dtype=np.float32)
+
+    def __call__(self, x):
+        batch, timesteps, _ = x.shape
+        u = self.units
+        # The input projection does not depend on the recurrence, so do it for all timesteps at once.
+        projected = x @ self.kernel + self.bias
+        h = np.zeros((batch, u), dtype=np.float32); c = np.zeros((batch, u), dtype=np.float32)
+        outputs = np.empty((batch, timesteps, u), dtype=np.float32) if self.return_sequences else None
+        for t in range(timesteps):
+            z = projected[:, t] + h @ self.recurrent_kernel
+            i = self.recurrent_activation(z[:, :u])
+            f = self.recurrent_activation(z[:, u:2 * u])
+            c = f * c + i * self.activation(z[:, 2 * u:3 * u])
+            h = self.recurrent_activation(z[:, 3 * u:]) * self.activation(c)
+            if outputs is not None:
+                outputs[:, t] = h
+        return outputs if outputs is not None else h
+
+class _Dense:
+    def __init__(self, config, kernel, bias=None):
+        self.activation = _activation(config.get('activation', 'linear'))
+        self.kernel = np.asarray(kernel, dtype=np.float32)
+        self.bias = None if bias is None else np.asarray(bias, dtype=np.float32)
+
+    def __call__(self, x):
+        y = x @ self.kernel
+        if self.bias is not None:
+            y += self.bias
+        return self.activation(y)
+
+class _Reshape:
+    def __init__(self, config):
+        self.target_shape = tuple(config['target_shape'])
+
+    def __call__(self, x):
+        return x.reshape((x.shape[0],) + self.target_shape)
+
+LAYER_TYPES = {'LSTM': _Lstm, 'Dense': _Dense, 'Reshape': _Reshape}
+SKIPPED_LAYER_TYPES = {'InputLayer', 'Dropout'}
+
+class NumpyAutoencoder:
+    """
+    A TensorFlow-free forward pass for the PMU LSTM autoencoder.
+    Supports the Sequential LSTM/Dense/Reshape stack built by PmuAnalyzer and
+    exposes a Keras-compatible `predict` so it can stand in for the model.
+    """
+    def __init__(self, layers):
+        self.layers = layers
+
+    @classmethod
+    def _from_layer_specs(cls, specs):
+        layers = []
+        for class_name, config, weights in specs:
+            if class_name in SKIPPED_LAYER_TYPES:
+                continue
+            if class_name not in LAYER_TYPES:
+                raise ValueError(f"Unsupported layer for NumPy inference: {class_name}")
+            layers.append(LAYER_TYPES[class_name](config, *weights))
+        return cls(layers)
+
+    @classmethod
+    def from_h5(cls, model_path):
+        """Reads the layer configs and weights straight from a Keras .h5 file."""
+        import h5py
+        with h5py.File(model_path, 'r') as f:
+            config = f.attrs['model_config']
+            config = json.loads(config.decode('utf-8') if isinstance(config, bytes) else config)
+            weight_groups = f['model_weights']
+            specs = []
+            for layer in config['config']['layers']:
+                name = layer['config']['name']
+                weights = []
+                if name in weight_groups:
+                    group = weight_groups[name]
+                    weight_names = [n.decode('utf-8') if isinstance(n, bytes) else n for n in group.attrs['weight_names']]
+                    weights = [group[n][()] for n in weight_names]
+                specs.append((layer['class_name'], layer['config'], weights))
+        return cls._from_layer_specs(specs)
+
+    @classmethod
+    def from_keras(cls, model):
+        """Copies the weights out of an in-memory Keras model."""
+        specs = [(type(layer).__name__, layer.get_config(), layer.get_weights()) for layer in model.layers]
+        return cls._from_layer_specs(specs)
+
+    def predict(self, x, verbose=0, batch_size=None):
+        """Runs the network on a batch of windows, shape (k, timesteps, n_features)."""
+        y = np.asarray(x, dtype=np.float32)
+        for layer in self.layers:
+            y = layer(y)
+        return y
+
+    __call__ = predict
@@ -0,0 +1,75 @@
+import time
+
+class TickPacer:
+    """
+    Paces the monitoring loop.
+    Modes:
+      - 'wallclock': one tick per simulated second (1 Hz), the original behaviour.
+      - 'fixed': `rate_hz` ticks per second.
+      - 'max': no sleeping, run as fast as the pipeline allows.
+    Deadlines are absolute, so time spent analysing a tick is subtracted from
+    the following sleep. If a tick overruns by more than a full period the
+    schedule is reset instead of bursting to catch up, so lag never accumulates.
+    """
+    MODES = ('wallclock', 'fixed', 'max')
+
+    def __init__(self, mode='wallclock', rate_hz=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown pacing mode: {mode}")
+        if mode == 'fixed' and not rate_hz:
+            raise ValueError("Pacing mode 'fixed' needs a positive rate_hz.")
+        self.mode = mode
+        self.target_hz = {'wallclock': 1.0, 'fixed': rate_hz, 'max': None}[mode]
+        self.period = 1.0 / self.target_hz if self.target_hz else 0.0
+        self.ticks = 0
+        self.late_ticks = 0
+        self.dropped_ticks = 0
+        self.started = None
+        self.next_deadline = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.next_deadline = self.started
+        self.ticks = 0; self.late_ticks = 0; self.dropped_ticks = 0
+
+    def wait(self, stop_event=None):
+        """Call once per finished tick; sleeps until the next tick is due."""
+        if self.started is None:
+            self.start()
+        self.ticks += 1
+        if not self.period:
+            return
+        self.next_deadline += self.period
+        delay = self.next_deadline - time.perf_counter()
+        if delay > 0:
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
+        else:
+            self.late_ticks += 1
+            if -delay > self.period:
+                # Whole periods missed while this tick overran are dropped, not replayed.
+                self.dropped_ticks += int(-delay // self.period)
+                self.next_deadline = time.perf_counter()
+
+    def achieved_hz(self):
+        if self.started is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started
+        return self.ticks / elapsed if elapsed > 0 else 0.0
+
+    def report(self):
+        return {
+            'mode': self.mode,
+            'target_hz': self.target_hz,
+            'achieved_hz': round(self.achieved_hz(), 2),
+            'ticks': self.ticks,
+            'late_ticks': self.late_ticks,
+            'dropped_ticks': self.dropped_ticks,
+        }
+
+    def describe(self):
+        report = self.report()
+        target = f"{report['target_hz']:g} Hz" if report['target_hz'] else "unthrottled"
+        return f"Pacing ({report['mode']}): achieved {report['achieved_hz']:.2f} Hz, target {target}, {report['late_ticks']} late / {report['dropped_ticks']} dropped ticks."
@@ -0,0 +1,64 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Recorded telemetry is stored either as CSV or as a "columnar directory":
+# one .npy file per numeric column (memory-mappable) plus locations.json,
+# which maps the integer `location_id` column back to location names.
+LOCATIONS_FILE = 'locations.json'
+DEFAULT_CHUNKSIZE = 100_000
+
+def write_columnar(path, batch):
+    """Writes a dict of equal-length columns (e.g. DataSimulator.generate_batch output) as a columnar directory."""
+    os.makedirs(path, exist_ok=True)
+    batch = dict(batch)
+    if 'location' in batch:
+        names, codes = np.unique(np.asarray(batch.pop('location'), dtype=str), return_inverse=True)
+        batch['location_id'] = codes.astype(np.int32)
+        with open(os.path.join(path, LOCATIONS_FILE), 'w') as f:
+            json.dump(names.tolist(), f)
+    for column, values in batch.items():
+        np.save(os.path.join(path, f"{column}.npy"), np.ascontiguousarray(values))
+
+def open_columnar(path, columns=None):
+    """
+    Opens a columnar directory as read-only memory-mapped arrays.
+    Returns (columns dict, location names or None).
+    """
+    available = sorted(f[:-4] for f in os.listdir(path) if f.endswith('.npy'))
+    wanted = available if columns is None else [c for c in columns if c in available]
+    arrays = {c: np.load(os.path.join(path, f"{c}.npy"), mmap_mode='r') for c in wanted}
+    names = None
+    locations_path = os.path.join(path, LOCATIONS_FILE)
+    if os.path.exists(locations_path):
+        with open(locations_path) as f:
+            names = json.load(f)
+    return arrays, names
+
+def iter_telemetry_chunks(path, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yields recorded telemetry as DataFrame chunks of at most `chunksize` rows.
+    `path` may be a CSV file or a columnar directory; only `columns` are read
+    (plus `location` when present, which is needed for per-location windows).
+    """
+    if os.path.isdir(path):
+        yield from _iter_columnar_chunks(path, columns, chunksize)
+        return
+    if os.path.getsize(path) == 0:
+        return
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = None if columns is None else [c for c in list(columns) + ['location'] if c in header]
+    yield from pd.read_csv(path, usecols=usecols, chunksize=chunksize)
+
+def _iter_columnar_chunks(path, columns, chunksize):
+    wanted = None if columns is None else list(columns) + ['location_id']
+    arrays, names = open_columnar(path, wanted)
+    if not arrays:
+        return
+    n = len(next(iter(arrays.values())))
+    for start in range(0, n, chunksize):
+        chunk = pd.DataFrame({c: a[start:start + chunksize] for c, a in arrays.items()})
+        if names is not None and 'location_id' in chunk:
+            chunk['location'] = pd.Categorical.from_codes(chunk.pop('location_id'), categories=names)
+        yield chunk
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+def window_view(samples, timesteps):
+    """
+    Zero-copy overlapping windows over (n, n_features) samples.
+    Returns a strided view of shape (n - timesteps + 1, timesteps, n_features).
+    """
+    samples = np.asarray(samples)
+    if len(samples) < timesteps:
+        return np.empty((0, timesteps) + samples.shape[1:], dtype=samples.dtype)
+    return sliding_window_view(samples, timesteps, axis=0).transpose(0, 2, 1)
+
+def windows_by_group(samples, keys, carry, timesteps):
+    """
+    Builds the full windows ending at each row of `samples`, per group key.
+    `carry` maps each key to its last `timesteps - 1` samples from earlier
+    blocks and is updated in place. Returns (row_indices, windows) where
+    windows[i] is the window that ends at row row_indices[i]; rows whose
+    group does not yet have `timesteps` samples are omitted.
+    """
+    if keys is None:
+        groups = [(None, np.arange(len(samples)))]
+    else:
+        codes, uniques = pd.factorize(keys)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+        groups = zip(uniques, np.split(order, bounds))
+    row_blocks = []; window_blocks = []
+    for key, rows in groups:
+        group_samples = samples[rows]
+        tail = carry.get(key)
+        if tail is not None:
+            group_samples = np.concatenate([tail, group_samples])
+        carry[key] = group_samples[len(group_samples) - (timesteps - 1):]
+        windows = window_view(group_samples, timesteps)
+        if len(windows):
+            # Window k ends at group sample k + timesteps - 1; the carried tail shifts that back into `rows`.
+            row_blocks.append(rows[timesteps - 1 - (0 if tail is None else len(tail)):])
+            window_blocks.append(windows)
+    if not window_blocks:
+        return np.empty(0, dtype=np.intp), np.empty((0, timesteps) + samples.shape[1:], dtype=samples.dtype)
+    if len(window_blocks) == 1:
+        return row_blocks[0], window_blocks[0]
+    return np.concatenate(row_blocks), np.concatenate(window_blocks)
+
+def iter_window_blocks(chunks, transform, features, timesteps, group_by='location'):
+    """
+    Turns a stream of telemetry DataFrames into blocks of scaled training windows.
+    Windows are built per `group_by` value when that column is present, and the
+    last `timesteps - 1` samples of every group are carried into the next chunk
+    so windows spanning a chunk boundary are not lost.
+    """
+    carry = {}
+    for chunk in chunks:
+        scaled = np.asarray(transform(chunk[features].to_numpy(dtype=np.float64)), dtype=np.float32)
+        keys = chunk[group_by].to_numpy() if group_by in chunk else None
+        _, windows = windows_by_group(scaled, keys, carry, timesteps)
+        if len(windows):
+            yield windows
+
+class ReservoirSampler:
+    """
+    Keeps a uniform random sample of at most `capacity` rows from a stream of blocks.
+    Every row gets a random priority and the `capacity` smallest are kept, which
+    is equivalent to sampling without replacement but works one block at a time.
+    """
+    def __init__(self, capacity, seed=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.rows = None
+        self.priorities = np.empty(0)
+        self.seen = 0
+
+    def add(self, block):
+        block = np.asarray(block)
+        self.seen += len(block)
+        priorities = self.rng.random(len(block))
+        if self.rows is None:
+            self.rows = block[:0]
+        rows = np.concatenate([self.rows, block])
+        priorities = np.concatenate([self.priorities, priorities])
+        if len(rows) > self.capacity:
+            keep = np.argpartition(priorities, self.capacity - 1)[:self.capacity]
+            rows, priorities = rows[keep], priorities[keep]
+        self.rows, self.priorities = rows, priorities
+
+    def sample(self):
+        return self.rows if self.rows is not None else np.empty((0,))
@@ -0,0 +1,74 @@
+import numpy as np
+
+class PmuWindowStore:
+    """
+    Per-location sliding windows of already-scaled PMU samples.
+    Every location owns one slot of a preallocated ring buffer, so pushing a
+    sample is a single row write and ready windows can be gathered for one
+    batched forward pass.
+    """
+    def __init__(self, timesteps=10, n_features=2, capacity=64):
+        self.timesteps = timesteps; self.n_features = n_features
+        self.buffer = np.zeros((capacity, timesteps, n_features), dtype=np.float32)
+        self.heads = np.zeros(capacity, dtype=np.intp)   # Next write position per slot
+        self.counts = np.zeros(capacity, dtype=np.intp)  # Samples held per slot (<= timesteps)
+        self.slots = {}
+        self.locations = []
+        self._dirty = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _slot(self, location):
+        slot = self.slots.get(location)
+        if slot is None:
+            slot = len(self.locations)
+            if slot == len(self.buffer):
+                self._grow()
+            self.slots[location] = slot
+            self.locations.append(location)
+        return slot
+
+    def _grow(self):
+        """Doubles the slot capacity, keeping existing windows in place."""
+        capacity = len(self.buffer) * 2
+        buffer = np.zeros((capacity, self.timesteps, self.n_features), dtype=self.buffer.dtype)
+        buffer[:len(self.buffer)] = self.buffer
+        self.buffer = buffer
+        self.heads = np.resize(self.heads, capacity); self.heads[len(self.locations):] = 0
+        self.counts = np.resize(self.counts, capacity); self.counts[len(self.locations):] = 0
+
+    def push(self, location, sample):
+        """Appends one scaled sample to the window of `location`."""
+        slot = self._slot(location)
+        head = self.heads[slot]
+        self.buffer[slot, head] = sample
+        self.heads[slot] = (head + 1) % self.timesteps
+        if self.counts[slot] < self.timesteps:
+            self.counts[slot] += 1
+        self._dirty[slot] = None
+
+    def push_many(self, locations, samples):
+        """Appends a block of scaled samples, one row per entry in `locations`."""
+        for location, sample in zip(locations, samples):
+            self.push(location, sample)
+
+    def windows(self, slots):
+        """Returns the windows of `slots` in chronological order, shape (k, timesteps, n_features)."""
+        slots = np.asarray(slots, dtype=np.intp)
+        order = (self.heads[slots, None] + np.arange(self.timesteps)) % self.timesteps
+        return self.buffer[slots[:, None], order]
+
+    def pop_ready(self):
+        """
+        Returns (locations, windows) for every full window that received a
+        sample since the last call, and clears the pending set.
+        """
+        slots = np.fromiter(self._dirty, dtype=np.intp, count=len(self._dirty))
+        self._dirty.clear()
+        slots = slots[self.counts[slots] == self.timesteps]
+        return [self.locations[s] for s in slots], self.windows(slots)
+
+    def reset(self):
+        self.heads[:] = 0; self.counts[:] = 0
+        self._dirty.clear()
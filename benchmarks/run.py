@@ -0,0 +1,211 @@
+"""
+AegisGRID benchmark suite.
+
+Measures per-stage latency (p50/p99) and throughput (points/s) for the
+analyzers, the fusion center, the data simulator and the full monitoring
+loop at several batch sizes and location counts. Runs offline against the
+models in saved_models/ and writes machine-readable JSON so results can be
+compared across commits:
+
+    python -m benchmarks.run                     # full run
+    python -m benchmarks.run --quick             # fewer repeats, for CI smoke runs
+    python -m benchmarks.run --compare OLD.json  # print p50/throughput deltas vs. a previous run
+
+The fleet stage drives the loop with the load generator at 1k-20k locations
+to show how tick latency and peak memory grow with fleet size.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import threading
+import time
+import numpy as np
+
+from aegis_core.main import AegisCore, ROOT_DIR
+from aegis_core.data_simulator import DataSimulator
+
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+BATCH_SIZES = (1, 16, 256, 4096)
+LOCATION_COUNTS = (6, 60, 600)
+FLEET_SIZES = (1_000, 5_000, 20_000)
+
+def _noop(message):
+    pass
+
+def measure(fn, repeats, points_per_call=1, warmup=3):
+    """Times `repeats` calls of `fn` and summarizes per-call latency and point throughput."""
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        started = time.perf_counter_ns()
+        fn()
+        samples[i] = time.perf_counter_ns() - started
+    return _summarize(samples, points_per_call)
+
+def _summarize(samples_ns, points_per_call):
+    total_s = samples_ns.sum() / 1e9
+    return {
+        'calls': int(len(samples_ns)),
+        'points_per_call': points_per_call,
+        'p50_us': round(float(np.percentile(samples_ns, 50)) / 1e3, 2),
+        'p99_us': round(float(np.percentile(samples_ns, 99)) / 1e3, 2),
+        'mean_us': round(float(samples_ns.mean()) / 1e3, 2),
+        'points_per_s': round(len(samples_ns) * points_per_call / total_s, 1) if total_s else 0.0,
+    }
+
+def _repeats(batch_size, quick):
+    budget = 2_000 if quick else 20_000
+    return max(20, min(1_000, budget // batch_size)) if batch_size > 1 else (200 if quick else 2_000)
+
+def bench_simulator(quick):
+    results = {}
+    simulator = DataSimulator(seed=0)
+    results['get_data_point'] = measure(simulator.get_data_point, _repeats(1, quick))
+    for batch_size in BATCH_SIZES[1:]:
+        results[f'generate_batch[{batch_size}]'] = measure(lambda: simulator.generate_batch(batch_size), _repeats(batch_size, quick), batch_size)
+    return results
+
+def bench_scada(core, quick):
+    results = {}
+    batch = DataSimulator(seed=1).generate_batch(max(BATCH_SIZES))
+    point = {f: float(batch[f][0]) for f in core.scada_analyzer.features}
+    results['analyze'] = measure(lambda: core.scada_analyzer.analyze(point), _repeats(1, quick))
+    for batch_size in BATCH_SIZES[1:]:
+        block = np.column_stack([batch[f][:batch_size] for f in core.scada_analyzer.features])
+        results[f'analyze_batch[{batch_size}]'] = measure(lambda: core.scada_analyzer.analyze_batch(block), _repeats(batch_size, quick), batch_size)
+    return results
+
+def bench_pmu(core, quick):
+    results = {}
+    analyzer = core.pmu_analyzer
+    batch = DataSimulator(seed=2).generate_batch(analyzer.timesteps)
+    sequence = [{f: float(batch[f][i]) for f in analyzer.features} for i in range(analyzer.timesteps)]
+    results['analyze'] = measure(lambda: analyzer.analyze(sequence), _repeats(1, quick))
+    window = analyzer.transform([[p[f] for f in analyzer.features] for p in sequence]).astype(np.float32)
+    for batch_size in BATCH_SIZES[1:]:
+        windows = np.repeat(window[np.newaxis], batch_size, axis=0)
+        results[f'analyze_windows[{batch_size}]'] = measure(lambda: analyzer.analyze_windows(windows), _repeats(batch_size, quick), batch_size)
+    return results
+
+def bench_fusion(core, quick):
+    results = {}
+    rng = np.random.default_rng(3)
+    scada = {'is_anomaly': True, 'confidence': 0.8}; pmu = {'is_anomaly': False, 'confidence': 0.3}
+    results['fuse'] = measure(lambda: core.fusion_center.fuse(scada, pmu), _repeats(1, quick))
+    # One live-loop tick: columnar analyzer results of a single location to an AlertRecord.
+    scada_tick = {'is_anomaly': np.array([True]), 'confidence': np.array([0.8])}; pmu_tick = {'is_anomaly': np.array([False]), 'confidence': np.array([0.3])}
+    results['fuse_records[1]'] = measure(lambda: core.fusion_center.fuse_records(scada_tick, pmu_tick, ['Feeder 1']), _repeats(1, quick))
+    for batch_size in BATCH_SIZES[1:]:
+        scada_block = {'is_anomaly': rng.random(batch_size) < 0.3, 'confidence': rng.random(batch_size)}
+        pmu_block = {'is_anomaly': rng.random(batch_size) < 0.3, 'confidence': rng.random(batch_size)}
+        results[f'fuse_batch[{batch_size}]'] = measure(lambda: core.fusion_center.fuse_batch(scada_block, pmu_block), _repeats(batch_size, quick), batch_size)
+    return results
+
+def bench_loop(quick):
+    """Per-tick latency of the unthrottled run_simulation_generator loop at several location counts, with and without the PMU cascade."""
+    results = {}
+    ticks = 300 if quick else 3_000
+    for n_locations, cascade in [(n, cascade) for cascade in (False, True) for n in LOCATION_COUNTS]:
+        core = AegisCore(update_callback=_noop, pacing='max', n_locations=n_locations, cascade=cascade)
+        core.wait_for_models()
+        stop_event = threading.Event()
+        generator = core.run_simulation_generator(stop_event)
+        next(generator)
+        samples = np.empty(ticks)
+        for i in range(ticks):
+            started = time.perf_counter_ns()
+            next(generator)
+            samples[i] = time.perf_counter_ns() - started
+        stop_event.set()
+        generator.close()
+        results[f'run_simulation_generator[locations={n_locations}{",cascade" if cascade else ""}]'] = _summarize(samples, 1)
+    return results
+
+def bench_fleet(quick):
+    """
+    Per-tick latency and peak memory of the loop driven by the load generator,
+    every location reporting every tick, at growing fleet sizes (smallest
+    first, so each peak RSS covers only that size and the ones before it).
+    """
+    results = {}
+    ticks = 20 if quick else 200
+    for n_locations in FLEET_SIZES[:2] if quick else FLEET_SIZES:
+        core = AegisCore(update_callback=_noop, pacing='max', n_locations=n_locations, fleet=True, seed=0, instrument=True)
+        core.wait_for_models()
+        stop_event = threading.Event()
+        generator = core.run_simulation_generator(stop_event)
+        for _ in range(ticks * n_locations):
+            next(generator)
+        stop_event.set()
+        generator.close()
+        tick = core.stats()['stages']['tick']
+        results[f'fleet[locations={n_locations}]'] = {
+            'calls': tick['count'], 'points_per_call': n_locations,
+            'p50_us': tick['p50_us'], 'p99_us': tick['p99_us'], 'mean_us': tick['mean_us'],
+            'points_per_s': round(n_locations / tick['mean_us'] * 1e6, 1),
+            'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run(quick=False):
+    core = AegisCore(update_callback=_noop)
+    core.wait_for_models()
+    stages = {
+        'data_simulator': bench_simulator(quick),
+        'scada_analyzer': bench_scada(core, quick),
+        'pmu_analyzer': bench_pmu(core, quick),
+        'fusion_center': bench_fusion(core, quick),
+        'pipeline': bench_loop(quick),
+        'fleet': bench_fleet(quick),
+    }
+    return {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'quick': quick,
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'processor': platform.processor(), 'cpus': os.cpu_count()},
+        'pmu_backend': core.pmu_analyzer.backend,
+        'stages': stages,
+    }
+
+def print_report(report, baseline=None):
+    print(f"AegisGRID benchmarks @ {report['commit']} ({'quick' if report['quick'] else 'full'})")
+    print(f"{'benchmark':<58}{'p50 us':>12}{'p99 us':>12}{'points/s':>14}" + ("   p50 / base" if baseline else ""))
+    for stage, cases in report['stages'].items():
+        for name, stats in cases.items():
+            line = f"{stage + '.' + name:<58}{stats['p50_us']:>12.2f}{stats['p99_us']:>12.2f}{stats['points_per_s']:>14.0f}"
+            base = (baseline or {}).get('stages', {}).get(stage, {}).get(name)
+            if base and base['p50_us']:
+                line += f"   {stats['p50_us'] / base['p50_us']:>10.2f}x"
+            print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmark AegisGRID stages and the full pipeline.")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats and ticks.")
+    parser.add_argument("--output", default=None, help="JSON output path (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", metavar="BASELINE", default=None, help="Previous results JSON to compare against.")
+    args = parser.parse_args(argv)
+
+    report = run(quick=args.quick)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import functools
+import threading
+
+import numpy as np
+
+from aegis_core import main
+from aegis_core.adaptation import OnlineAdapter, RecentReadings
+from aegis_core.data_simulator import DataSimulator
+from aegis_core.main import AegisCore
+
+
+def test_recent_readings_keep_the_last_capacity_rows_of_any_block():
+    recent = RecentReadings(capacity=8, n_columns=2)
+    recent.append(np.arange(10.0).reshape(5, 2), list('abcde'), [False] * 5)
+    recent.append(np.arange(10.0, 30.0).reshape(10, 2), list('fghijklmno'), [True] * 10)  # Wraps past the oldest.
+    rows, locations, alerts = recent.latest(8)
+    np.testing.assert_array_equal(rows[:, 0], np.arange(14.0, 30.0, 2))
+    assert ''.join(locations) == 'hijklmno' and alerts.all() and recent.total == 15
+
+
+def test_adapter_refits_in_background_and_postpones_during_alerts():
+    core = AegisCore(update_callback=lambda message: None)
+    core.wait_for_models()
+    scada, pmu = core.scada_analyzer, core.pmu_analyzer
+    adapter = OnlineAdapter(scada, pmu, refit_interval=200, min_refit_readings=300, pmu_epochs=1)
+    batch = DataSimulator(seed=3, n_locations=4, start_timestamp=1_700_000_000).generate_batch(400)
+    batch['voltage'] = batch['voltage'] + 5.0  # A slow drift the models were not trained on.
+    for i in range(400):
+        reading = {f: float(batch[f][i]) for f in scada.features + pmu.features}
+        adapter.observe([batch['location'][i]], [reading], [reading], [i < 4])
+        assert adapter.poll() is None  # Nothing is handed over before a refit is ready.
+    assert adapter.stats['readings'] == 400 and adapter.stats['alerts'] == 4
+
+    assert adapter.refitting or adapter._refitted is not None
+    adapter.join(120)
+    refitted = adapter.poll()
+    assert adapter.stats['refits'] == 1 and adapter.stats['failed_refits'] == 0
+    refitted_scada, refitted_pmu = refitted
+    assert refitted_scada.engine is not scada.engine and refitted_scada.scaler is not scada.scaler
+    refitted_scada.validate(); refitted_pmu.validate()
+    assert refitted_scada.analyze_batch(batch)['is_anomaly'].mean() < 0.5
+
+    # While many recent readings raise alerts (an attack), no refit starts.
+    for i in range(200):
+        adapter.observe(['Substation Alpha'], [reading], [reading], [True])
+        adapter.poll()
+    assert adapter.stats['postponed_refits'] == 1 and not adapter.refitting
+
+
+def _alert_rates(core, n_locations, done):
+    """Per-tick (SCADA flag, alert) rates of a fleet run, stopped after the first tick for which done(tick) holds."""
+    stop_event = threading.Event()
+    flags, alerts = [], []
+    for i, record in enumerate(core.run_simulation_generator(stop_event)):
+        flags.append(record.reason_code != 0); alerts.append(record.aegis_alert)
+        if (i + 1) % n_locations == 0 and done((i + 1) // n_locations):
+            stop_event.set()
+    return np.reshape(flags, (-1, n_locations)).mean(axis=1), np.reshape(alerts, (-1, n_locations)).mean(axis=1)
+
+
+def test_long_adaptive_run_keeps_the_false_positive_rate_of_the_fixed_models(monkeypatch):
+    monkeypatch.setattr(main, 'OnlineAdapter', functools.partial(OnlineAdapter, refit_interval=50, min_refit_readings=5_000, pmu_epochs=1))
+    options = dict(update_callback=lambda message: None, pacing='max', fleet=True, n_locations=200, seed=4)
+    adaptive = AegisCore(adapt=True, **options)
+    refit_ticks = []
+
+    def done(tick):
+        if not refit_ticks and adaptive.adapter.stats['refits']:
+            refit_ticks.append(tick)
+        return bool(refit_ticks) and tick >= refit_ticks[0] + 150
+    flags, alerts = _alert_rates(adaptive, 200, done)
+    base_flags, base_alerts = _alert_rates(AegisCore(**options), 200, lambda tick: tick >= len(flags))
+    after = slice(refit_ticks[0], None)
+    # Normal mode: the refitted models flag about as much as the shipped ones, and alerts stay rare.
+    assert flags[after].mean() < base_flags[after].mean() + 0.05
+    assert alerts[after].mean() < base_alerts[after].mean() + 0.01
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from aegis_core.analyzers import ScadaAnalyzer, PmuAnalyzer
+from aegis_core.data_simulator import DataSimulator
+from aegis_core.numpy_inference import NumpyAutoencoder
+from aegis_core.main import PMU_MODEL_PATH, PMU_SCALER_PATH, PMU_THRESHOLD_PATH
+from aegis_core.window_store import PmuWindowStore
+
+
+def _scada_frame(n=500):
+    simulator = DataSimulator(high_anomaly_mode=False)
+    return pd.DataFrame([simulator.get_data_point()['scada'] for _ in range(n)])
+
+
+def _trained_scada():
+    analyzer = ScadaAnalyzer()
+    analyzer.train(_scada_frame())
+    return analyzer
+
+
+def test_scada_analyze_batch_matches_sklearn():
+    analyzer = _trained_scada()
+    live = _scada_frame(200)
+    result = analyzer.analyze_batch(live)
+    X_scaled = analyzer.scaler.transform(live[analyzer.features])
+    expected_scores = analyzer.model.score_samples(X_scaled)
+    np.testing.assert_array_equal(result['is_anomaly'], analyzer.model.predict(X_scaled) == -1)
+    np.testing.assert_allclose(result['confidence'], -np.clip(expected_scores, -1, 0))
+
+
+def test_scada_analyze_is_wrapper_over_batch():
+    analyzer = _trained_scada()
+    live = _scada_frame(20)
+    batch = analyzer.analyze_batch(live[analyzer.features].to_numpy())
+    for i, row in enumerate(live.to_dict('records')):
+        single = analyzer.analyze(row)
+        assert single['is_anomaly'] == batch['is_anomaly'][i]
+        assert np.isclose(single['confidence'], batch['confidence'][i])
+
+
+def _saved_pmu(backend='numpy'):
+    analyzer = PmuAnalyzer(timesteps=10, backend=backend)
+    analyzer.load_model(PMU_MODEL_PATH, PMU_SCALER_PATH, PMU_THRESHOLD_PATH)
+    return analyzer
+
+
+def test_window_store_keeps_per_location_order():
+    store = PmuWindowStore(timesteps=3, n_features=1, capacity=1)
+    for i in range(5):
+        store.push('A', [i])
+    store.push('B', [10])
+    locations, windows = store.pop_ready()
+    assert locations == ['A']
+    np.testing.assert_array_equal(windows[0, :, 0], [2, 3, 4])
+    store.push_many(['B', 'B'], [[11], [12]])
+    locations, windows = store.pop_ready()
+    assert locations == ['B']
+    np.testing.assert_array_equal(windows[0, :, 0], [10, 11, 12])
+
+
+def test_pmu_analyze_windows_matches_single_analyze():
+    analyzer = _saved_pmu()
+    simulator = DataSimulator(high_anomaly_mode=True)
+    sequences = [[simulator.get_data_point()['pmu'] for _ in range(10)] for _ in range(4)]
+    windows = np.stack([analyzer.transform([[p[f] for f in analyzer.features] for p in seq]) for seq in sequences])
+    batch = analyzer.analyze_windows(windows)
+    for i, sequence in enumerate(sequences):
+        single = analyzer.analyze(sequence)
+        assert single['is_anomaly'] == batch['is_anomaly'][i]
+        assert np.isclose(single['confidence'], batch['confidence'][i], atol=1e-5)
+
+
+def test_numpy_backend_matches_keras_predict():
+    numpy_analyzer = _saved_pmu('numpy')
+    keras_analyzer = _saved_pmu('keras')
+    windows = np.random.default_rng(0).normal(0, 3, size=(64, 10, 2)).astype(np.float32)
+    expected = keras_analyzer.model.predict(windows, verbose=0)
+    np.testing.assert_allclose(numpy_analyzer.engine.predict(windows), expected, rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(NumpyAutoencoder.from_keras(keras_analyzer.model).predict(windows), expected, rtol=1e-4, atol=1e-5)
@@ -0,0 +1,37 @@
+import threading
+
+import numpy as np
+
+from aegis_core.cascade import PMU_SAMPLED, PMU_SCORED, PMU_SKIPPED, PmuGate
+from aegis_core.main import AegisCore
+
+
+def test_gate_scores_outliers_scada_flags_and_a_periodic_sample_only():
+    gate = PmuGate(hold=3, threshold=3.0, sample_interval=5)
+    rng = np.random.default_rng(0)
+    nominal = lambda: rng.normal(0.0, 0.5, (2, 2))
+    stages = [gate.select(['a', 'b'], nominal(), np.array([0, 1]))[0] for _ in range(12)]
+    # Nothing suspicious at 'a': one scheduled sample every fifth sample, the rest skipped.
+    assert stages == [PMU_SKIPPED] * 4 + [PMU_SAMPLED] + [PMU_SKIPPED] * 4 + [PMU_SAMPLED] + [PMU_SKIPPED] * 2
+
+    outlier = nominal(); outlier[0] = [8.0, 0.0]
+    assert gate.select(['a', 'b'], outlier, np.array([0, 1])).tolist() == [PMU_SCORED, PMU_SKIPPED]
+    # The outlier keeps 'a' suspicious for `hold` samples and did not widen its bounds.
+    assert [gate.select(['a', 'b'], nominal(), np.array([0]))[0] for _ in range(3)] == [PMU_SCORED] * 2 + [PMU_SKIPPED]
+    assert gate.var[gate.slots['a']].max() < 1.0
+
+    # A SCADA anomaly makes only its own tick suspicious; rows without a ready window get no stage.
+    stage = gate.select(['a', 'b'], nominal(), np.array([1]), scada_anomaly=np.array([False, True]))
+    assert stage.tolist() == [PMU_SCORED]
+
+
+def test_cascade_loop_skips_most_pmu_windows_without_missing_true_anomalies():
+    core = AegisCore(update_callback=lambda message: None, pacing='max', n_locations=3, cascade=True)
+    stop_event = threading.Event()
+    for i, _ in enumerate(core.run_simulation_generator(stop_event)):
+        if i == 599:
+            stop_event.set()
+    stats = core.stats()['cascade']
+    assert stats['windows'] > 550
+    assert stats['skip_rate'] > 0.5
+    assert stats['true_anomalies'] > 0 and stats['miss_rate'] < 0.05
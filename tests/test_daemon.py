@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from aegis_core.daemon import EngineDaemon
+from aegis_core.main import AegisCore
+from ui_desktop.daemon_client import DaemonSubscriber
+from ui_desktop.update_channel import UpdateChannel
+
+
+async def _wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.05)
+
+
+def test_one_engine_fans_out_snapshot_and_deltas():
+    core = AegisCore(update_callback=lambda message: None, pacing='fixed', tick_rate_hz=200, high_anomaly_mode=True)
+
+    async def scenario():
+        daemon = EngineDaemon(core, port=0, publish_interval=0.05)
+        port = await daemon.start()
+        first = DaemonSubscriber('127.0.0.1', port, UpdateChannel()).start()
+        daemon.start_engine()
+        await _wait_for(lambda: first.seq is not None and len(first.states) == 6)
+        # A console that joins later starts from a snapshot of every location.
+        late_channel = UpdateChannel()
+        late = DaemonSubscriber('127.0.0.1', port, late_channel).start()
+        await _wait_for(lambda: late.seq is not None)
+        assert len(late.states) == 6
+        joined_at = late.seq
+        await _wait_for(lambda: late.seq >= joined_at + 3)  # ...then follows the deltas.
+
+        first.send_control('stop')
+        await _wait_for(lambda: not daemon.broadcaster.engine['running'])
+        await asyncio.sleep(0.3)  # Let the last deltas arrive.
+        assert first.seq == late.seq == daemon.broadcaster.seq
+        assert first.states == late.states == daemon.broadcaster.states
+        first.close(); late.close()
+        await daemon.close()
+        return daemon, late_channel
+
+    daemon, late_channel = asyncio.run(scenario())
+    assert daemon.stats['snapshots'] == 2 and daemon.stats['deltas'] > 0
+    log_lines, alerts, states = late_channel.drain()
+    assert any("Simulation thread has stopped." in line for line in log_lines)
+    assert {state['location'] for state in states} == set(daemon.broadcaster.states)
+    assert all(alert['is_new_alert'] for alert in alerts)
+
+
+def test_resync_snapshot_does_not_replay_alerts_again():
+    channel = UpdateChannel()
+    subscriber = DaemonSubscriber('127.0.0.1', 0, channel)
+    alert = {'location': 'Industrial Park', 'aegis_alert': True, 'is_new_alert': True, 'reason': 'SCADA Anomaly'}
+    snapshot = {'type': 'snapshot', 'seq': 5, 'states': {'Industrial Park': alert}, 'alerts': [alert], 'log': ['started'], 'engine': {}}
+    subscriber._apply(snapshot)
+    log_lines, alerts, _ = channel.drain()
+    assert len(alerts) == 1 and 'started' in log_lines
+    subscriber._apply({**snapshot, 'seq': 9})  # Resync after the subscriber lagged behind.
+    log_lines, alerts, states = channel.drain()
+    assert alerts == [] and 'started' not in log_lines and len(states) == 1 and subscriber.seq == 9
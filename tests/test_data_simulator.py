@@ -0,0 +1,34 @@
+import numpy as np
+
+from aegis_core.data_simulator import DataSimulator
+
+
+def test_generate_batch_is_reproducible_with_seed():
+    first = DataSimulator(high_anomaly_mode=True, seed=7).generate_batch(1000, n_locations=50)
+    second = DataSimulator(high_anomaly_mode=True, seed=7).generate_batch(1000, n_locations=50)
+    for column in first:
+        np.testing.assert_array_equal(first[column], second[column])
+    assert set(first['location']) <= set(DataSimulator().location_names(50))
+
+
+def test_storm_rate_matches_scalar_generator():
+    batch = DataSimulator(high_anomaly_mode=True, seed=1).generate_batch(50000)
+    scalar = DataSimulator(high_anomaly_mode=True, seed=2)
+    labels = [scalar.get_data_point()['is_true_anomaly'] for _ in range(50000)]
+    assert abs(batch['is_true_anomaly'].mean() - np.mean(labels)) < 0.02
+
+
+def test_storm_state_carries_across_batches():
+    simulator = DataSimulator(high_anomaly_mode=True, seed=3)
+    labels = np.concatenate([simulator.generate_batch(3)['is_true_anomaly'] for _ in range(5000)])
+    edges = np.diff(np.concatenate(([0], labels.astype(int), [0])))
+    run_lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    # Storms last 1 + randint(5, 10) ticks; shorter runs only appear if batch boundaries cut them.
+    assert run_lengths[1:-1].min() >= 6
+
+
+def test_generate_batch_frame_has_training_columns():
+    frame = DataSimulator(seed=0).generate_batch(100, as_frame=True)
+    assert len(frame) == 100
+    assert {'voltage', 'current', 'frequency', 'breaker_status', 'phase_angle_A', 'magnitude_A', 'location'} <= set(frame.columns)
+    assert frame['timestamp'].is_monotonic_increasing
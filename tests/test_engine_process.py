@@ -0,0 +1,54 @@
+import os
+import time
+
+import numpy as np
+
+from aegis_core.engine_process import VERDICT_DTYPE, EngineProcess, VerdictRing
+
+
+def test_ring_hands_over_records_in_order_and_counts_overruns():
+    ring = VerdictRing(capacity=8)
+    reader = VerdictRing(name=ring.name)  # Attached like the other process would be.
+    for i in range(5):
+        ring.write((i, i % 3, 1, 0, 0, 0.5, 0))
+    np.testing.assert_array_equal(reader.read()['timestamp'], np.arange(5))
+    assert len(reader.read()) == 0
+    for i in range(5, 25):
+        ring.write((i, 0, 0, 0, 0, 0.0, 0))
+    records = reader.read()
+    assert records.dtype == VERDICT_DTYPE
+    # Only the last `capacity` survive, minus the oldest, whose slot the producer may be writing...
+    np.testing.assert_array_equal(records['timestamp'], np.arange(18, 25))
+    assert reader.lost == 13  # ...and the rest are counted.
+    reader.close(); ring.close()
+    assert not os.path.exists(f"/dev/shm/{ring.name.lstrip('/')}")
+
+
+def test_engine_process_streams_verdicts_through_shared_memory():
+    engine = EngineProcess(pacing='fixed', tick_rate_hz=200, high_anomaly_mode=True).start()
+    try:
+        log_lines, records = [], []
+
+        def collect(until, timeout=60):
+            deadline = time.monotonic() + timeout
+            while not until():
+                assert time.monotonic() < deadline and engine.alive, "timed out"
+                new_lines, new_records = engine.poll()
+                log_lines.extend(new_lines); records.extend(new_records)
+                time.sleep(0.05)
+
+        engine.start_simulation(high_anomaly_mode=True)
+        collect(lambda: len({record.location for record in records}) == 6 and any(r.is_new_alert for r in records))
+        engine.stop_simulation()
+        collect(lambda: any("Simulation thread has stopped." in line for line in log_lines))
+        assert engine.ring.lost == 0
+        assert all(0.0 <= record.combined_confidence <= 1.0 for record in records)
+        assert all(record.reason for record in records if record.aegis_alert)
+
+        # The controls can start the same engine again.
+        seen = len(records)
+        engine.start_simulation()
+        collect(lambda: len(records) > seen + 6)
+    finally:
+        engine.close()
+    assert not engine.alive and engine.ring is None
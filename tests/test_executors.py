@@ -0,0 +1,71 @@
+import copy
+
+import numpy as np
+
+from aegis_core.cascade import PMU_SKIPPED
+from aegis_core.data_simulator import DataSimulator
+from aegis_core.executors import make_executor
+from aegis_core.main import AegisCore
+
+
+def _ticks(n_ticks=15, per_tick=12):
+    batch = DataSimulator(high_anomaly_mode=True, seed=4, n_locations=20).generate_batch(n_ticks * per_tick)
+    scada_features = ['voltage', 'current', 'frequency', 'breaker_status']; pmu_features = ['phase_angle_A', 'magnitude_A']
+    for start in range(0, n_ticks * per_tick, per_tick):
+        rows = range(start, start + per_tick)
+        yield ([batch['location'][i] for i in rows],
+               [{f: float(batch[f][i]) for f in scada_features} for i in rows],
+               [{f: float(batch[f][i]) for f in pmu_features} for i in rows])
+
+
+def _run(kind, core, ticks, swap_at=None, swap_to=None, **options):
+    executor = make_executor(kind, core.scada_analyzer, core.pmu_analyzer, **options)
+    executor.start()
+    try:
+        results = []
+        for i, tick in enumerate(ticks):
+            if i == swap_at:
+                executor.swap(*swap_to, executor.prepare_swap(*swap_to))
+            results.append(executor.analyze(*tick))
+        return results
+    finally:
+        executor.close()
+
+
+def test_executors_agree_with_serial():
+    core = AegisCore(update_callback=lambda message: None)
+    core.wait_for_models()
+    # The simulator's clock feeds the SCADA current, so generate the ticks once and share them.
+    ticks = list(_ticks())
+    expected = _run('serial', core, ticks)
+    for kind, options in (('thread', {}), ('process', {'n_workers': 3})):
+        for (scada, pmu), (expected_scada, expected_pmu) in zip(_run(kind, core, ticks, **options), expected):
+            for results, expected_results in ((scada, expected_scada), (pmu, expected_pmu)):
+                np.testing.assert_array_equal(results['is_anomaly'], expected_results['is_anomaly'])
+                np.testing.assert_allclose(results['confidence'], expected_results['confidence'], rtol=1e-5)
+
+
+def test_gated_executors_agree_with_serial():
+    core = AegisCore(update_callback=lambda message: None)
+    core.wait_for_models()
+    ticks = list(_ticks(n_ticks=25))
+    expected = _run('serial', core, ticks, gate={'sample_interval': 4})
+    assert any((pmu['stage'] == PMU_SKIPPED).any() for _, pmu in expected)
+    for kind, options in (('thread', {}), ('process', {'n_workers': 3})):
+        for (_, pmu), (_, expected_pmu) in zip(_run(kind, core, ticks, gate={'sample_interval': 4}, **options), expected):
+            np.testing.assert_array_equal(pmu['stage'], expected_pmu['stage'])
+            np.testing.assert_array_equal(pmu['is_anomaly'], expected_pmu['is_anomaly'])
+
+
+def test_process_workers_install_prepared_swaps_between_ticks():
+    core = AegisCore(update_callback=lambda message: None)
+    core.wait_for_models()
+    ticks = list(_ticks())
+    shifted = copy.copy(core.scada_analyzer)
+    shifted.scaler = copy.copy(shifted.scaler); shifted.scaler.mean_ = shifted.scaler.mean_ + [8.0, 0.0, 0.0, 0.0]
+    swap = dict(swap_at=7, swap_to=(shifted, core.pmu_analyzer))
+    expected = _run('serial', core, ticks, **swap)
+    assert [scada['is_anomaly'].tolist() for scada, _ in expected] != [scada['is_anomaly'].tolist() for scada, _ in _run('serial', core, ticks)]
+    for (scada, _), (expected_scada, _) in zip(_run('process', core, ticks, n_workers=3, **swap), expected):
+        np.testing.assert_array_equal(scada['is_anomaly'], expected_scada['is_anomaly'])
+        np.testing.assert_allclose(scada['confidence'], expected_scada['confidence'], rtol=1e-5)
@@ -0,0 +1,39 @@
+import joblib
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+from aegis_core.analyzers import ScadaAnalyzer
+from aegis_core.forest_inference import FlatIsolationForest
+from aegis_core.main import SCADA_MODEL_PATH, SCADA_SCALER_PATH
+
+
+def _rows(n=3000, seed=0):
+    return np.random.default_rng(seed).normal(0, 2, (n, 4))
+
+
+def test_flat_forest_matches_saved_model_exactly():
+    forest = joblib.load(SCADA_MODEL_PATH)
+    flat = FlatIsolationForest.from_sklearn(forest)
+    X = _rows()
+    expected = forest.score_samples(X)
+    np.testing.assert_array_equal(flat.score_samples(X), expected)
+    np.testing.assert_array_equal([flat.score_row(x) for x in X[:200]], expected[:200])
+    np.testing.assert_array_equal(flat.predict_anomaly(X), forest.predict(X) == -1)
+
+
+def test_flat_forest_handles_feature_subsampling():
+    X = _rows(seed=1)
+    forest = IsolationForest(n_estimators=25, max_samples=64, max_features=0.5, contamination=0.1, random_state=3).fit(X[:1000])
+    flat = FlatIsolationForest.from_sklearn(forest)
+    np.testing.assert_array_equal(flat.score_samples(X), forest.score_samples(X))
+    np.testing.assert_array_equal(flat.predict_anomaly(X), forest.predict(X) == -1)
+
+
+def test_scada_single_point_path_matches_batch():
+    analyzer = ScadaAnalyzer()
+    analyzer.load_model(SCADA_MODEL_PATH, SCADA_SCALER_PATH)
+    X = analyzer.scaler.mean_ + _rows(300, seed=2) * analyzer.scaler.scale_
+    batch = analyzer.analyze_batch(X)
+    for i, row in enumerate(X):
+        single = analyzer.analyze(dict(zip(analyzer.features, row)))
+        assert single == {'is_anomaly': bool(batch['is_anomaly'][i]), 'confidence': float(batch['confidence'][i])}
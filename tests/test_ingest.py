@@ -0,0 +1,79 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from aegis_core.data_simulator import DataSimulator
+from aegis_core.ingest import (FLAG_TRUE_ANOMALY, FRAME_DTYPE, FrameIngestServer, SimulatorPublisher,
+                               decode_packet, encode_packet, frames_from_batch)
+from aegis_core.main import AegisCore
+
+
+def test_packets_round_trip_without_copying():
+    batch = DataSimulator(high_anomaly_mode=True, seed=2).generate_batch(50, n_locations=8)
+    frames = frames_from_batch(batch, location_offset=100)
+    packet = encode_packet(frames)
+    decoded = decode_packet(packet)
+    np.testing.assert_array_equal(decoded, frames)
+    assert np.shares_memory(decoded, np.frombuffer(packet, dtype=np.uint8))
+    np.testing.assert_array_equal(decoded['location_id'], batch['location_id'] + 100)
+    np.testing.assert_array_equal((decoded['flags'] & FLAG_TRUE_ANOMALY) != 0, batch['is_true_anomaly'])
+    np.testing.assert_allclose(decoded['voltage'], batch['voltage'], rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        decode_packet(b'XX' + packet[2:])
+    with pytest.raises(ValueError):
+        decode_packet(packet[:-1])
+
+
+def test_server_collects_tcp_and_udp_feeds():
+    async def scenario():
+        server = FrameIngestServer()
+        tcp_port = await server.start_tcp()
+        udp_port = await server.start_udp()
+        publishers = [
+            SimulatorPublisher(port=tcp_port, transport='tcp', rate_hz=None, frames_per_tick=40, n_locations=6, seed=1),
+            SimulatorPublisher(port=udp_port, transport='udp', rate_hz=None, frames_per_tick=40, n_locations=6, location_offset=6, seed=2),
+        ]
+        await asyncio.gather(*(publisher.run(n_ticks=5) for publisher in publishers))
+        received = []
+        while sum(map(len, received)) < 400:
+            received.append(await asyncio.wait_for(server.next_batch(max_frames=150), 5))
+        await server.close()
+        assert await server.next_batch() is None
+        return server, np.concatenate(received)
+
+    server, frames = asyncio.run(scenario())
+    assert frames.dtype == FRAME_DTYPE and len(frames) == 400
+    assert server.stats['frames'] == 400 and server.stats['bad_packets'] == 0
+    columns = server.columns(frames)
+    assert set(columns['location'][frames['location_id'] >= 6]) <= {f"Feeder {i:05d}" for i in range(6, 12)}
+    assert 'is_true_anomaly' in columns
+
+
+def test_core_scores_ingested_frames():
+    core = AegisCore(update_callback=lambda message: None)
+
+    async def scenario():
+        server = FrameIngestServer()
+        port = await server.start_tcp()
+        publisher = SimulatorPublisher(port=port, rate_hz=None, frames_per_tick=100, n_locations=4, seed=5, high_anomaly_mode=True)
+        alert_blocks = []
+
+        async def consume():
+            async for alerts in core.ingest(server):
+                alert_blocks.append(alerts)
+
+        consumer = asyncio.create_task(consume())
+        await publisher.run(n_ticks=6)
+        while core.ingest_scorer is None or core.ingest_scorer.rows < 600:
+            await asyncio.sleep(0.05)
+        await server.close()
+        await consumer
+        return alert_blocks
+
+    alert_blocks = asyncio.run(scenario())
+    metrics = core.ingest_scorer.metrics()
+    assert metrics['rows'] == 600
+    assert sum(len(block) for block in alert_blocks) == metrics['aegis']['true_positives'] + metrics['aegis']['false_positives']
+    assert metrics['aegis']['recall'] > 0.5
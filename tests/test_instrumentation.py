@@ -0,0 +1,49 @@
+import threading
+
+from aegis_core.instrumentation import LatencyRecorder, LoopStats
+from aegis_core.main import AegisCore
+
+
+def test_latency_recorder_keeps_a_rolling_window():
+    recorder = LatencyRecorder(capacity=100)
+    for i in range(1000):
+        recorder.record(i * 1000)
+    summary = recorder.summary(histogram=True)
+    assert summary['count'] == 1000
+    assert summary['max_us'] == 999
+    # Only the last 100 samples (900..999 us) are in the window.
+    assert 900 <= summary['p50_us'] <= 999
+    assert sum(summary['histogram'].values()) == 100
+
+
+def test_instrumented_loop_exposes_stage_stats():
+    core = AegisCore(update_callback=lambda message: None, pacing='max', instrument=True)
+    stop_event = threading.Event()
+    for i, _ in enumerate(core.run_simulation_generator(stop_event)):
+        if i == 49:
+            stop_event.set()
+    stats = core.stats()
+    assert stats['instrumented'] and stats['counters']['ticks'] == 50
+    assert set(stats['stages']) == set(LoopStats.STAGES)
+    assert stats['stages']['tick']['p50_us'] >= stats['stages']['fusion']['p50_us']
+    assert stats['pacing']['ticks'] == 50
+
+
+def test_alert_counters_match_the_fused_records_of_large_ticks():
+    core = AegisCore(update_callback=lambda message: None, pacing='max', instrument=True, high_anomaly_mode=True, fleet=True, n_locations=300, seed=2)
+    stop_event = threading.Event()
+    records = []
+    for record in core.run_simulation_generator(stop_event):
+        records.append(record)
+        if len(records) == 300 * 20:
+            stop_event.set()
+    counters = core.stats()['counters']
+    assert counters['ticks'] == 20
+    assert counters['alerts'] == sum(record.aegis_alert for record in records) > 0
+    assert counters['new_alerts'] == sum(record.aegis_alert and record.is_new_alert for record in records) > 0
+
+
+def test_uninstrumented_loop_reports_pacing_only():
+    core = AegisCore(update_callback=lambda message: None, pacing='max')
+    assert core.loop_stats is None
+    assert core.stats() == {'instrumented': False, 'pacing': core.pacer.report()}
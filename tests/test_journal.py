@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from aegis_core.fusion_center import AlertRecord
+from aegis_core.journal import INDEX_FILE, AlertJournal, JournalBusyError
+from aegis_core.main import AegisCore
+
+
+def _verdicts(n, seed=0):
+    rng = np.random.default_rng(seed)
+    locations = [f"Site {i}" for i in range(5)]
+    for i in range(n):
+        alert = bool(rng.random() < 0.2)
+        yield 1_700_000_000 + 60 * i, AlertRecord(locations[rng.integers(5)], alert, round(float(rng.random()), 2), int(rng.integers(4)), alert, False, alert)
+
+
+def test_journal_queries_survive_reopen_and_a_lost_index(tmp_path):
+    path = str(tmp_path / 'journal')
+    verdicts = list(_verdicts(1000))
+    journal = AlertJournal(path, segment_records=128, flush_interval=0)
+    for timestamp, record in verdicts[:900]:
+        journal.append(timestamp, record)
+    journal.flush()
+    for timestamp, record in verdicts[900:]:
+        journal.append(timestamp, record)
+    start, end = verdicts[100][0], verdicts[950][0]
+    expected = [t for t, r in verdicts if r.location == 'Site 2' and r.aegis_alert and start <= t < end]
+    # Unflushed records are already visible to queries.
+    assert journal.query('Site 2', start, end)['timestamp'].tolist() == expected
+    journal.close()
+
+    reopened = AlertJournal(path, flush_interval=0)
+    assert len(reopened) == 1000 and reopened.segment_records == 128
+    alerts = reopened.query('Site 2', start, end)
+    assert alerts['timestamp'].tolist() == expected
+    assert (alerts['location'] == 'Site 2').all() and alerts['is_new_alert'].all()
+    assert len(reopened.query()) == sum(r.aegis_alert for _, r in verdicts)
+    assert len(reopened.query('Nowhere')) == 0
+    reopened.close()
+
+    os.remove(os.path.join(path, INDEX_FILE))
+    rebuilt = AlertJournal(path, flush_interval=0)
+    assert rebuilt.query('Site 2', start, end)['timestamp'].tolist() == expected
+    np.testing.assert_array_equal(rebuilt.records(10, 20)['timestamp'], [t for t, _ in verdicts[10:20]])
+    rebuilt.close()
+
+
+def test_new_location_names_are_saved_once_per_flush(tmp_path):
+    path = str(tmp_path / 'journal')
+    journal = AlertJournal(path, flush_interval=0)
+    for i in range(2000):
+        journal.append(1_700_000_000, AlertRecord(f"Feeder {i}", False, 0.1, 0, False, False, False))
+    assert not os.path.exists(os.path.join(path, 'locations.json'))  # Nothing written per new name...
+    journal.flush()                                                    # ...only once, before the commit.
+    journal.close()
+    reopened = AlertJournal(path, flush_interval=0)
+    assert reopened.location_names == [f"Feeder {i}" for i in range(2000)]
+    reopened.close()
+
+
+def test_live_loop_journals_every_verdict(tmp_path):
+    core = AegisCore(update_callback=lambda message: None, pacing='max', high_anomaly_mode=True, journal_path=str(tmp_path / 'journal'))
+    started = int(time.time())
+    stop_event = threading.Event()
+    statuses = []
+    for status in core.run_simulation_generator(stop_event):
+        statuses.append(status)
+        if len(statuses) == 300:
+            stop_event.set()
+    alerts = core.query_alerts()
+    assert len(alerts) == sum(status.aegis_alert for status in statuses) > 0
+    assert alerts['location'].tolist() == [status.location for status in statuses if status.aegis_alert]
+    # Stamped with the wall clock, not the simulated time that runs ahead at full speed.
+    assert started <= alerts['timestamp'].min() and alerts['timestamp'].max() <= time.time()
+    assert alerts['is_new_alert'].sum() == sum(status.is_new_alert for status in statuses)
+
+
+def test_only_one_writer_may_open_a_journal(tmp_path):
+    path = str(tmp_path / 'journal')
+    writer = AlertJournal(path, flush_interval=0)
+    with pytest.raises(JournalBusyError):
+        AlertJournal(path, flush_interval=0)
+    messages = []
+    core = AegisCore(update_callback=messages.append, pacing='max', journal_path=path)
+    stop_event = threading.Event()
+    for i, _ in enumerate(core.run_simulation_generator(stop_event)):
+        if i == 20:
+            stop_event.set()
+    # The loop runs on without a journal rather than overwriting the other writer's records.
+    assert any("Journaling disabled" in message for message in messages) and len(writer) == 0
+    writer.close()
+    AlertJournal(path, flush_interval=0).close()  # Closing released the lock.
+
+
+def test_read_only_queries_leave_a_live_writer_alone(tmp_path):
+    path = str(tmp_path / 'journal')
+    assert len(AlertJournal(path, read_only=True).query()) == 0 and not os.path.exists(path)  # Nothing created.
+    verdicts = list(_verdicts(300))
+    writer = AlertJournal(path, segment_records=128, flush_interval=0)
+    for timestamp, record in verdicts[:200]:
+        writer.append(timestamp, record)
+    writer.flush()
+    for timestamp, record in verdicts[200:]:
+        writer.append(timestamp, record)  # Not committed yet
+    sidecar = open(os.path.join(path, INDEX_FILE), 'rb').read()
+    files = sorted(os.listdir(path))
+    reader = AlertJournal(path, read_only=True)
+    assert len(reader) == 200 and len(reader.query()) == sum(r.aegis_alert for _, r in verdicts[:200])
+    reader.close()
+    assert open(os.path.join(path, INDEX_FILE), 'rb').read() == sidecar and sorted(os.listdir(path)) == files
+    writer.close()
+    assert len(AlertJournal(path, read_only=True).query()) == sum(r.aegis_alert for _, r in verdicts)
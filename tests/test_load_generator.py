@@ -0,0 +1,74 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from aegis_core.load_generator import GridLoadGenerator, ScriptedAttack, load_scenario
+from aegis_core.main import AegisCore
+
+
+def test_fleet_is_reproducible_and_storms_per_location():
+    frames = [list(GridLoadGenerator(2000, seed=5, start_timestamp=0, storm_probability=0.01).ticks(40)) for _ in range(2)]
+    for first, second in zip(*frames):
+        for column in first:
+            np.testing.assert_array_equal(first[column], second[column])
+    labels = np.stack([frame['is_true_anomaly'] for frame in frames[0]])  # (ticks, locations)
+    assert 0 < labels.mean() < 0.2
+    # Locations storm independently: many storm at some point, never all at once.
+    assert labels.any(axis=0).mean() > 0.2 and labels.mean(axis=1).max() < 0.5
+    edges = np.diff(np.vstack((np.zeros((1, 2000)), labels, np.zeros((1, 2000)))).astype(int), axis=0)
+    starts, ends = np.nonzero(edges.T == 1), np.nonzero(edges.T == -1)
+    lengths = ends[1] - starts[1]
+    complete = (starts[1] > 0) & (ends[1] < 40)
+    # Storms last 1 + randint(5, 10) ticks; back-to-back storms only make runs longer.
+    assert lengths[complete].min() >= 6
+
+    generator = GridLoadGenerator(10, seed=1)
+    generator.next_tick()
+    assert len(list(generator.ticks(5))) == 5 and generator.tick == 6  # Counted from the current tick.
+
+    sampled = GridLoadGenerator(100, seed=1, frames_per_tick=30).next_tick()
+    assert len(sampled['location']) == 30 and len(set(sampled['location'])) == 30
+    assert (np.diff(sampled['location_id']) > 0).all() and len(set(sampled['timestamp'])) == 1
+
+
+def test_scenario_attacks_hit_their_targets_and_streams(tmp_path):
+    path = tmp_path / 'scenario.json'
+    path.write_text(json.dumps({'attacks': [
+        {'name': 'injection', 'start': 2, 'duration': 3, 'fraction': 0.1, 'streams': ['pmu']},
+        {'start': 4, 'duration': 2, 'locations': ['Industrial Park']},
+    ]}))
+    generator = GridLoadGenerator(200, seed=2, storm_probability=0.0, attacks=load_scenario(path))
+    frames = list(generator.ticks(7))
+    anomalous = [set(frame['location'][frame['is_true_anomaly']]) for frame in frames]
+    assert anomalous[0] == anomalous[1] == anomalous[6] == set()
+    assert len(anomalous[2]) == 20 and anomalous[2] == anomalous[3]
+    assert anomalous[4] == anomalous[2] | {'Industrial Park'} and anomalous[5] == {'Industrial Park'}
+    # The injection only touches PMU readings; the named substation gets both.
+    injected = frames[3]['is_true_anomaly']
+    assert (frames[3]['phase_angle_A'][injected] > 15.9).all()
+    assert (np.abs(frames[3]['voltage'][injected] - 230.0) < 12).all()
+    park = frames[5]['location'] == 'Industrial Park'
+    assert frames[5]['voltage'][park][0] > 244 and frames[5]['magnitude_A'][park][0] < 0.96
+
+    with pytest.raises(ValueError):
+        ScriptedAttack(start=0, duration=5, count=3, fraction=0.1)
+    with pytest.raises(ValueError):
+        GridLoadGenerator(10, attacks=[ScriptedAttack(start=0, duration=5, locations=['Nowhere'])])
+    path.write_text(json.dumps({'attacks': [{'start': 0, 'duration': 1, 'count': 2, 'target': 'x'}]}))
+    with pytest.raises(ValueError):
+        load_scenario(path)
+
+
+def test_fleet_mode_drives_the_loop_with_frame_batches():
+    core = AegisCore(update_callback=lambda message: None, pacing='max', fleet=True, n_locations=50, frames_per_tick=20, seed=1, instrument=True)
+    stop_event = threading.Event()
+    records = []
+    for record in core.run_simulation_generator(stop_event):
+        records.append(record)
+        if len(records) == 20 * 30:
+            stop_event.set()
+    assert core.stats()['counters']['ticks'] == 30
+    assert all(len({record.location for record in records[i:i + 20]}) == 20 for i in range(0, len(records), 20))
+    assert len({record.location for record in records}) == 50
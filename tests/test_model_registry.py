@@ -0,0 +1,75 @@
+import os
+import shutil
+
+import aegis_core.main as aegis_main
+import aegis_core.model_registry as model_registry
+from aegis_core.main import AegisCore
+from aegis_core.model_registry import ADOPTED_DATA, ModelRegistry, training_key
+
+
+def _artifacts(tmp_path):
+    paths = [tmp_path / 'model.bin', tmp_path / 'threshold.joblib']
+    paths[0].write_bytes(b'weights' * 100)
+    paths[1].write_bytes(b'0.25')
+    return [str(path) for path in paths]
+
+
+def test_registry_rejects_stale_or_damaged_artifacts(tmp_path):
+    paths = _artifacts(tmp_path)
+    key = training_key({'epochs': 20}, {'seed': 0})
+    ModelRegistry(str(tmp_path)).record('pmu', key, paths)
+
+    registry = ModelRegistry(str(tmp_path))  # Re-read from the manifest on disk
+    assert registry.problem('pmu', key, paths) is None
+    assert registry.problem('scada', key, paths) is not None
+    assert registry.problem('pmu', training_key({'epochs': 21}, {'seed': 0}), paths) is not None
+
+    open(paths[1], 'wb').close()
+    assert 'size' in registry.problem('pmu', key, paths)
+    with open(paths[1], 'wb') as f:
+        f.write(b'0.99')
+    assert 'checksum' in registry.problem('pmu', key, paths)
+
+
+def test_history_is_rehashed_only_when_its_files_change(tmp_path, monkeypatch):
+    history = tmp_path / 'history'
+    history.mkdir()
+    (history / 'voltage.npy').write_bytes(b'a' * 1000)
+    hashed = []
+    monkeypatch.setattr(model_registry, 'data_fingerprint', lambda path: hashed.append(path) or model_registry.file_digest(history / 'voltage.npy'))
+    first = ModelRegistry(str(tmp_path)).data_fingerprint(str(history))
+    assert ModelRegistry(str(tmp_path)).data_fingerprint(str(history)) == first and len(hashed) == 1  # Cached in the manifest.
+    (history / 'voltage.npy').write_bytes(b'b' * 1001)
+    assert ModelRegistry(str(tmp_path)).data_fingerprint(str(history)) != first and len(hashed) == 2
+
+
+def test_only_stale_models_are_retrained(tmp_path, monkeypatch):
+    model_dir = tmp_path / 'models'
+    shutil.copytree(aegis_main.MODEL_DIR, model_dir, ignore=shutil.ignore_patterns('manifest.json'))
+    artifacts = {name: tuple(str(model_dir / os.path.basename(path)) for path in paths) for name, paths in aegis_main.MODEL_ARTIFACTS.items()}
+    monkeypatch.setattr(aegis_main, 'MODEL_ARTIFACTS', artifacts)
+    monkeypatch.setattr(aegis_main, 'HISTORICAL_DATA_PATH', str(tmp_path / 'no-history.csv'))
+
+    def load(corrupt=None):
+        core = AegisCore(update_callback=lambda message: None)
+        core.registry = ModelRegistry(str(model_dir))
+        retrained = []
+        core._train_models = lambda names, *args, **kwargs: retrained.extend(names)
+        core.wait_for_models()
+        return core, retrained
+
+    # Unregistered artifacts that pass validation are adopted, then verified by checksum.
+    assert load()[1] == []
+    core, retrained = load()
+    assert retrained == [] and core.registry.adopted('scada') and core.registry.adopted('pmu')
+    assert core.registry.entries['scada']['data'] == ADOPTED_DATA  # Not claimed to come from the training recipe.
+    open(artifacts['pmu'][2], 'wb').close()  # A zero-byte threshold must not be loaded
+    core, retrained = load()
+    assert retrained == ['pmu']
+    core.scada_analyzer.validate()
+
+
+def test_simulated_training_data_is_reproducible():
+    first = AegisCore(update_callback=lambda message: None)._training_data()
+    second = AegisCore(update_callback=lambda message: None)._training_data()
+    assert first.equals(second)
@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+from aegis_core.pacing import TickPacer
+
+
+def test_fixed_rate_compensates_for_work_time():
+    pacer = TickPacer('fixed', rate_hz=100)
+    pacer.start()
+    for _ in range(30):
+        time.sleep(0.004)  # Simulated analysis time, well inside the 10 ms period
+        pacer.wait()
+    assert pacer.report()['achieved_hz'] == pytest.approx(100, rel=0.1)
+
+
+def test_overrun_does_not_accumulate_lag():
+    pacer = TickPacer('fixed', rate_hz=100)
+    pacer.start()
+    time.sleep(0.1)  # One tick that overruns by ten periods
+    pacer.wait()
+    started = time.perf_counter()
+    pacer.wait()
+    assert time.perf_counter() - started >= 0.005
+    assert pacer.late_ticks == 1
+
+
+def test_max_mode_never_sleeps_and_requires_no_rate():
+    pacer = TickPacer('max')
+    started = time.perf_counter()
+    for _ in range(1000):
+        pacer.wait()
+    assert time.perf_counter() - started < 0.1
+    with pytest.raises(ValueError):
+        TickPacer('fixed')
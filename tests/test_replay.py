@@ -0,0 +1,42 @@
+import numpy as np
+
+from aegis_core.data_simulator import DataSimulator
+from aegis_core.main import AegisCore
+from aegis_core.replay import TelemetryReplay, detection_metrics
+from aegis_core.telemetry import write_columnar
+from aegis_core.window_store import PmuWindowStore
+
+
+def _loaded_core():
+    core = AegisCore(update_callback=lambda message: None)
+    core.wait_for_models()
+    return core
+
+
+def test_replay_matches_live_loop_verdicts(tmp_path):
+    core = _loaded_core()
+    batch = DataSimulator(high_anomaly_mode=True, seed=11).generate_batch(400, n_locations=4)
+    write_columnar(tmp_path / 'recording', batch)
+    result = TelemetryReplay(core.scada_analyzer, core.pmu_analyzer, core.fusion_center, batch_size=64).run(str(tmp_path / 'recording'))
+
+    pmu_windows = PmuWindowStore(core.pmu_analyzer.timesteps, core.pmu_analyzer.n_features)
+    expected_alerts = []
+    for i in range(400):
+        location = batch['location'][i]
+        scada = core.scada_analyzer.analyze({f: batch[f][i] for f in core.scada_analyzer.features})
+        pmu = core._score_pmu(pmu_windows, [location], [{f: batch[f][i] for f in core.pmu_analyzer.features}])
+        if core.fusion_center.fuse(scada, {key: values[0] for key, values in pmu.items()})['aegis_alert']:
+            expected_alerts.append(batch['timestamp'][i])
+    np.testing.assert_array_equal(result['alerts']['timestamp'], expected_alerts)
+    assert result['metrics']['rows'] == 400
+    assert result['metrics']['aegis'] == detection_metrics(np.isin(batch['timestamp'], expected_alerts), batch['is_true_anomaly'])
+
+
+def test_replay_keeps_its_hands_off_the_live_alert_edges(tmp_path):
+    core = _loaded_core()
+    write_columnar(tmp_path / 'recording', DataSimulator(high_anomaly_mode=True, seed=12).generate_batch(200, n_locations=4))
+    alarm = {'is_anomaly': True, 'confidence': 1.0}
+    assert core.fusion_center.fuse(alarm, alarm, 'Substation Alpha').is_new_alert
+    assert len(core.replay(str(tmp_path / 'recording'))['alerts']) > 0
+    # The live loop's ongoing alert is still an ongoing one, not reported as new again.
+    assert not core.fusion_center.fuse(alarm, alarm, 'Substation Alpha').is_new_alert
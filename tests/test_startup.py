@@ -0,0 +1,33 @@
+import importlib.util
+import subprocess
+import sys
+import threading
+
+from aegis_core.main import AegisCore
+
+
+def test_importing_the_engine_and_console_leaves_the_ml_stack_unloaded():
+    modules = ['aegis_core.main', 'ui_desktop.update_channel', 'ui_desktop.daemon_client', 'ui_desktop.components.dashboard']
+    if importlib.util.find_spec('PIL') is not None:
+        modules.append('ui_desktop.main_ui')
+    code = f"import sys\nfor name in {modules!r}: __import__(name)\nprint(sorted(m for m in ('tensorflow', 'keras', 'sklearn') if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]'
+
+
+def test_models_load_in_the_background_and_startup_is_reported():
+    messages = []
+    core = AegisCore(update_callback=messages.append, pacing='max')
+    thread = core.load_models_async()
+    assert core.load_models_async() is thread  # Started once, however often it is asked.
+    assert core.wait_for_models()
+    assert "Initializing backend modules..." in messages
+    assert any(message.startswith("Loaded") and "[2/2]" in message for message in messages)
+    assert set(core.startup_report()) == {'models_ready'}
+
+    stop_event = threading.Event()
+    for _ in core.run_simulation_generator(stop_event):
+        stop_event.set()
+    report = core.startup_report()
+    assert 0 < report['models_ready'] <= report['first_verdict']
+    assert any(message.startswith("Startup: models ready in") for message in messages)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from aegis_core.analyzers import ScadaAnalyzer, PmuAnalyzer
+from aegis_core.data_simulator import DataSimulator
+from aegis_core.telemetry import iter_telemetry_chunks, write_columnar
+from aegis_core.training import ReservoirSampler, iter_window_blocks, window_view
+
+
+def test_window_view_matches_copied_windows():
+    samples = np.arange(24, dtype=float).reshape(12, 2)
+    windows = window_view(samples, 4)
+    assert np.shares_memory(windows, samples)
+    expected = np.array([samples[i:i + 4] for i in range(len(samples) - 3)])
+    np.testing.assert_array_equal(windows, expected)
+
+
+def test_window_blocks_span_chunk_boundaries_per_location():
+    frame = DataSimulator(seed=0).generate_batch(200, n_locations=3, as_frame=True)
+    features = ['phase_angle_A', 'magnitude_A']
+    chunks = [frame.iloc[i:i + 37] for i in range(0, len(frame), 37)]
+    streamed = np.concatenate(list(iter_window_blocks(chunks, lambda x: x, features, 5)))
+    expected = np.concatenate([window_view(group[features].to_numpy(), 5) for _, group in frame.groupby('location', observed=True)])
+    assert len(streamed) == len(expected)
+    np.testing.assert_allclose(np.sort(streamed.reshape(len(streamed), -1), axis=0), np.sort(expected.reshape(len(expected), -1), axis=0), rtol=1e-6)
+
+
+def test_reservoir_is_bounded_and_uniform():
+    reservoir = ReservoirSampler(1000, seed=0)
+    for start in range(0, 100_000, 7_000):
+        reservoir.add(np.arange(start, min(start + 7_000, 100_000)))
+    sample = reservoir.sample()
+    assert len(sample) == 1000 and len(np.unique(sample)) == 1000
+    assert abs(sample.mean() - 50_000) < 3_000
+
+
+def test_train_from_csv_and_columnar_chunks(tmp_path):
+    batch = DataSimulator(seed=1).generate_batch(3000, n_locations=4)
+    csv_path = tmp_path / 'history.csv'
+    pd.DataFrame(batch).to_csv(csv_path, index=False)
+    write_columnar(tmp_path / 'history', batch)
+
+    scada = ScadaAnalyzer()
+    scada.train_stream(iter_telemetry_chunks(str(csv_path), scada.features, chunksize=500), max_samples=800)
+    assert scada.analyze_batch(batch)['is_anomaly'].shape == (3000,)
+    np.testing.assert_allclose(scada.scaler.mean_, pd.DataFrame(batch)[scada.features].mean(), rtol=1e-6)
+
+    pmu = PmuAnalyzer(timesteps=10)
+    pmu.train_stream(lambda: iter_telemetry_chunks(str(tmp_path / 'history'), pmu.features, chunksize=500), epochs=1)
+    assert pmu.reconstruction_threshold > 0
+    assert list(iter_telemetry_chunks(str(tmp_path / 'history'), pmu.features, chunksize=500))[0]['location'].dtype == 'category'
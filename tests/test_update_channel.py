@@ -0,0 +1,26 @@
+from ui_desktop.update_channel import UpdateChannel
+
+
+def _status(location, tick, new_alert=False):
+    return {'location': location, 'tick': tick, 'aegis_alert': new_alert, 'is_new_alert': new_alert}
+
+
+def test_states_coalesce_per_location_and_alerts_are_kept():
+    channel = UpdateChannel(max_log_lines=10)
+    for tick in range(1000):
+        channel.put(_status(f"L{tick % 3}", tick, new_alert=tick % 100 == 0))
+    log_lines, alerts, states = channel.drain()
+    assert log_lines == []
+    assert [a['tick'] for a in alerts] == list(range(0, 1000, 100))
+    assert [s['tick'] for s in states] == [997, 998, 999]
+    assert channel.coalesced == 997
+    assert channel.drain() == ([], [], [])
+
+
+def test_log_lines_are_bounded():
+    channel = UpdateChannel(max_log_lines=10)
+    for i in range(25):
+        channel.put(f"line {i}")
+    log_lines, _, _ = channel.drain()
+    assert log_lines == [f"line {i}" for i in range(15, 25)]
+    assert channel.dropped_log_lines == 15
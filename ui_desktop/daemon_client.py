@@ -0,0 +1,83 @@
+import json
+import socket
+import threading
+
+class DaemonSubscriber:
+    """
+    Thin client of an engine daemon (python -m aegis_core.main --daemon).
+    Mirrors the daemon's snapshot + deltas into `states` and feeds an
+    UpdateChannel exactly as a local engine would: log lines, new alerts
+    (never dropped) and the latest status per location.
+    """
+    def __init__(self, host, port, channel, connect_timeout=5.0):
+        self.host = host; self.port = port
+        self.channel = channel
+        self.connect_timeout = connect_timeout
+        self.states = {}
+        self.seq = None
+        self.engine = {}
+        self.connected = threading.Event()
+        self._socket = None
+        self._send_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        self._socket.settimeout(None)
+        self._thread = threading.Thread(target=self._read_loop, name="aegis-subscriber", daemon=True)
+        self._thread.start()
+        return self
+
+    def _read_loop(self):
+        try:
+            with self._socket.makefile('r', encoding='utf-8') as stream:
+                for line in stream:
+                    self._apply(json.loads(line))
+        except (OSError, ValueError) as e:
+            self.channel.put(f"Lost connection to the engine daemon: {e}")
+            return
+        self.channel.put("The engine daemon closed the connection.")
+
+    def _apply(self, message):
+        replay = True
+        if message['type'] == 'snapshot':
+            self.states = dict(message['states'])
+            # A snapshot's recent alerts and log lines are history: shown once on connecting,
+            # not again when the daemon resyncs this subscriber after it fell behind.
+            replay = self.seq is None
+            if replay:
+                self.channel.put(f"Connected to the engine daemon at {self.host}:{self.port}.")
+            self.connected.set()
+        elif message['type'] == 'delta':
+            if self.seq is None or message['seq'] != self.seq + 1:
+                return  # Only possible before the first snapshot; the daemon resyncs gaps with a snapshot.
+            self.states.update(message['states'])
+        self.seq = message['seq']
+        self.engine = message['engine']
+        if replay:
+            for line in message['log']:
+                self.channel.put(line)
+            for alert in message['alerts']:
+                self.channel.put(alert)
+        for status in message['states'].values():
+            # Alerts were queued above; states only refresh the dashboard.
+            self.channel.put({**status, 'is_new_alert': False})
+
+    def send_control(self, action, **options):
+        """Asks the daemon to 'start' or 'stop' its engine."""
+        data = (json.dumps({'type': 'control', 'action': action, **options}) + '\n').encode('utf-8')
+        try:
+            with self._send_lock:
+                self._socket.sendall(data)
+        except OSError as e:
+            self.channel.put(f"Could not reach the engine daemon: {e}")
+
+    def close(self):
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
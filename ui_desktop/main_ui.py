@@ -1,34 +1,51 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
+import argparse
 import threading
-import queue
 import time
 import os
 import sys
 from PIL import ImageTk, Image
 
 try:
-    # --- CHANGE: Import the new AegisCore class ---
-    from aegis_core.main import AegisCore
+    # AegisCore (and its ML stack) is imported on a background thread, see _create_engine.
     from ui_desktop.components.dashboard import Dashboard 
+    from ui_desktop.update_channel import UpdateChannel
+    from ui_desktop.daemon_client import DaemonSubscriber
 except ImportError as e:
     print(f"--- ImportError --- \nError: {e}")
     sys.exit(1)
 
+# The event log keeps at most this many lines; older lines are trimmed from the top.
+MAX_LOG_LINES = 500
+# Milliseconds to wait for resize events to settle before redrawing the background gradient.
+GRADIENT_DEBOUNCE_MS = 80
+
 class AegisApp(tk.Tk):
-    def __init__(self):
+    """
+    The operator console. By default it runs its own AegisCore; given
+    `daemon_address` (host, port) it is a thin subscriber of a shared engine
+    daemon instead, and its controls start and stop that engine. With
+    `engine_process` the engine runs in a child process and its verdicts
+    arrive through shared memory, so inference never competes with Tk.
+    """
+    def __init__(self, daemon_address=None, engine_process=False):
         super().__init__()
         self.title("AegisGRID Predictive Security Platform v2.3")
         self.geometry("800x650") 
         
         self.gradient = tk.Canvas(self, highlightthickness=0)
         self.gradient.pack(fill="both", expand=True)
+        self._gradient_size = None
+        self._resize_job = None
         self.draw_gradient("#1a202c", "#2d3748")
         self.bind("<Configure>", self.on_resize)
 
         self.simulation_thread = None
+        self.core_engine = None
+        self._engine_lock = threading.Lock()
         self.stop_event = threading.Event()
-        self.update_queue = queue.Queue()
+        self.update_channel = UpdateChannel(max_log_lines=MAX_LOG_LINES)
         self.high_anomaly_var = tk.BooleanVar()
 
         self._configure_styles()
@@ -36,10 +53,25 @@ class AegisApp(tk.Tk):
         
         self.after(100, self.process_queue)
         self._update_time()
+        self.subscriber = None
+        self.engine_process = None
+        if daemon_address is not None:
+            try:
+                self.subscriber = DaemonSubscriber(*daemon_address, self.update_channel).start()
+            except OSError as e:
+                self._log_message(f"Could not connect to the engine daemon at {daemon_address[0]}:{daemon_address[1]}: {e}", "ERROR")
+        elif engine_process:
+            from aegis_core.engine_process import EngineProcess
+            # The child starts loading its models right away, like _preload_engine.
+            self.engine_process = EngineProcess(journal=True).start()
+        else:
+            # Warm up the backend while the operator looks at the window.
+            threading.Thread(target=self._preload_engine, daemon=True).start()
 
     def draw_gradient(self, color1, color2):
         self.gradient.delete("gradient")
         width = self.winfo_width(); height = self.winfo_height()
+        self._gradient_size = (width, height)
         r1, g1, b1 = self.winfo_rgb(color1); r2, g2, b2 = self.winfo_rgb(color2)
         r_ratio, g_ratio, b_ratio = (r2 - r1) / height, (g2 - g1) / height, (b2 - b1) / height
         for i in range(height):
@@ -48,7 +80,18 @@ class AegisApp(tk.Tk):
             self.gradient.create_line(0, i, width, i, tags=("gradient",), fill=color)
 
     def on_resize(self, event):
-        self.draw_gradient("#1a202c", "#2d3748")
+        # <Configure> on the root also fires for every child widget; only window resizes matter,
+        # and a drag produces a burst of them, so redraw once the size has settled.
+        if event.widget is not self:
+            return
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(GRADIENT_DEBOUNCE_MS, self._redraw_gradient)
+
+    def _redraw_gradient(self):
+        self._resize_job = None
+        if (self.winfo_width(), self.winfo_height()) != self._gradient_size:
+            self.draw_gradient("#1a202c", "#2d3748")
 
     def _configure_styles(self):
         self.style = ttk.Style(self)
@@ -116,25 +159,51 @@ class AegisApp(tk.Tk):
         self.after(1000, self._update_time)
 
     def _log_message(self, message, level="INFO"):
+        self._append_log([f"[{time.strftime('%H:%M:%S')}] [{level}] {message}\n"])
+
+    def _append_log(self, entries):
+        """Inserts log entries in one call and trims the widget to MAX_LOG_LINES."""
         self.log_text.configure(state="normal")
-        log_entry = f"[{time.strftime('%H:%M:%S')}] [{level}] {message}\n"
-        self.log_text.insert(tk.END, log_entry)
+        self.log_text.insert(tk.END, "".join(entries))
+        excess = int(self.log_text.index("end-1c").split(".")[0]) - MAX_LOG_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         self.log_text.configure(state="disabled")
         self.log_text.see(tk.END)
 
     def start_simulation(self):
-        self.stop_event.clear()
         self.start_button.configure(state="disabled")
         self.stop_button.configure(state="normal")
         self.anomaly_check.configure(state="disabled")
         high_anomaly_mode = self.high_anomaly_var.get()
         log_mode = "High Anomaly" if high_anomaly_mode else "Normal"
+        if self.subscriber is not None:
+            self._log_message(f"Asking the engine daemon to start in {log_mode} mode...")
+            self.subscriber.send_control('start', high_anomaly_mode=high_anomaly_mode)
+            return
+        if self.engine_process is not None:
+            self._log_message(f"Starting the engine process in {log_mode} mode...")
+            self.engine_process.start_simulation(high_anomaly_mode)
+            return
         self._log_message(f"Starting simulation thread in {log_mode} mode...")
-        self.simulation_thread = threading.Thread(target=self.run_backend_simulation, args=(high_anomaly_mode,), daemon=True)
+        # Each run gets its own stop event, so a quick restart cannot un-stop the previous worker,
+        # and the new worker waits for that one to finish before it drives the shared engine.
+        previous = self.simulation_thread
+        self.stop_event = threading.Event()
+        self.simulation_thread = threading.Thread(target=self.run_backend_simulation, args=(high_anomaly_mode, self.stop_event, previous), daemon=True)
         self.simulation_thread.start()
 
     def stop_simulation(self):
-        if self.simulation_thread and self.simulation_thread.is_alive():
+        if self.subscriber is not None or self.engine_process is not None:
+            if self.subscriber is not None:
+                self.subscriber.send_control('stop')
+            else:
+                self.engine_process.stop_simulation()
+            self._log_message(f"Stop signal sent to the engine {'daemon' if self.subscriber is not None else 'process'}.", "WARN")
+            self.start_button.configure(state="normal")
+            self.stop_button.configure(state="disabled")
+            self.anomaly_check.configure(state="normal")
+        elif self.simulation_thread and self.simulation_thread.is_alive():
             self.stop_event.set()
             self._log_message("Stop signal sent to simulation thread.", "WARN")
             self.start_button.configure(state="normal")
@@ -142,45 +211,84 @@ class AegisApp(tk.Tk):
             self.anomaly_check.configure(state="normal")
             
     def process_queue(self):
+        # One bounded drain per frame: the work done here does not grow with the backend tick rate.
         try:
-            while not self.update_queue.empty():
-                message = self.update_queue.get_nowait()
-                if isinstance(message, str):
-                    self._log_message(message)
-                elif isinstance(message, dict):
-                    self._update_ui(message)
+            if self.engine_process is not None:
+                log_lines, records = self.engine_process.poll()
+                for message in log_lines + records:
+                    self.update_channel.put(message)
+            log_lines, alerts, states = self.update_channel.drain()
+            timestamp = time.strftime('%H:%M:%S')
+            entries = [f"[{timestamp}] [INFO] {line}\n" for line in log_lines]
+            entries += [f"[{timestamp}] [CRITICAL] ALERT @ {alert['location']}: {alert['reason']}\n" for alert in alerts]
+            if entries:
+                self._append_log(entries)
+            if states:
+                # A frame's states cover many locations; an alerting one wins over the last normal one.
+                alerting = [state for state in states if state['aegis_alert']]
+                self.dashboard.update_display(alerting[-1] if alerting else states[-1])
         finally:
             self.after(100, self.process_queue)
 
-    def _update_ui(self, data):
-        self.dashboard.update_display(data)
-        if data.get('is_new_alert', False):
-            self._log_message(f"ALERT @ {data['location']}: {data['reason']}", "CRITICAL")
-
     def on_closing(self):
-        self.stop_simulation()
+        if self.subscriber is not None:
+            # The shared engine keeps running for the other consoles.
+            self.subscriber.close()
+        elif self.engine_process is not None:
+            self.engine_process.close()
+        else:
+            self.stop_simulation()
         self.destroy()
 
-    def run_backend_simulation(self, high_anomaly_mode):
+    def _create_engine(self):
+        """Imports the backend and starts loading its models in the background (once)."""
+        with self._engine_lock:
+            if self.core_engine is None:
+                from aegis_core.main import AegisCore, JOURNAL_DIR
+
+                # The callback function will put messages from the core onto the UI's queue
+                def ui_callback(message):
+                    self.update_channel.put(message)
+
+                # Verdicts and alerts are journaled, so they outlive the session.
+                self.core_engine = AegisCore(update_callback=ui_callback, journal_path=JOURNAL_DIR)
+                self.core_engine.load_models_async()
+            return self.core_engine
+
+    def _preload_engine(self):
+        try:
+            self._create_engine()
+        except Exception as e:
+            self.update_channel.put(f"Backend Error: {e}")
+
+    def run_backend_simulation(self, high_anomaly_mode, stop_event, previous=None):
         """
-        This method now simply creates and runs the AegisCore engine.
+        This method runs the shared AegisCore engine, whose models may already be loaded,
+        once the `previous` run's worker thread (if any) has exited.
         """
         try:
-            # The callback function will put messages from the core onto the UI's queue
-            def ui_callback(message):
-                self.update_queue.put(message)
-
-            core_engine = AegisCore(high_anomaly_mode=high_anomaly_mode, update_callback=ui_callback)
+            if previous is not None:
+                previous.join()
+            core_engine = self._create_engine()
+            core_engine.high_anomaly_mode = high_anomaly_mode
             
             # The UI thread now consumes the generator from the core engine
-            for status_update in core_engine.run_simulation_generator(self.stop_event):
-                self.update_queue.put(status_update)
+            for status_update in core_engine.run_simulation_generator(stop_event):
+                self.update_channel.put(status_update)
 
         except Exception as e:
             import traceback
-            self.update_queue.put(f"Backend Error: {e}\n{traceback.format_exc()}")
+            self.update_channel.put(f"Backend Error: {e}\n{traceback.format_exc()}")
+
+def _parse_address(value):
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
 
 if __name__ == "__main__":
-    app = AegisApp()
+    parser = argparse.ArgumentParser(description="AegisGRID operator console.")
+    parser.add_argument("--connect", metavar="HOST:PORT", type=_parse_address, default=None, help="Subscribe to a running engine daemon instead of starting a local engine.")
+    parser.add_argument("--engine-process", action="store_true", help="Run the engine in a separate process that hands verdicts over through shared memory.")
+    args = parser.parse_args()
+    app = AegisApp(daemon_address=args.connect, engine_process=args.engine_process)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict, deque
+
+class UpdateChannel:
+    """
+    Bounded, thread-safe channel between the backend thread and the Tk loop.
+    - Status records (AlertRecords or dicts) are coalesced to the latest state per location, so a
+      backend running faster than the UI never builds up a backlog.
+    - Alert transitions (`is_new_alert`) are queued separately and never dropped.
+    - Log lines are kept in a ring of `max_log_lines`; the oldest are dropped
+      (and counted) if the UI falls behind.
+    """
+    def __init__(self, max_log_lines=500):
+        self._lock = threading.Lock()
+        self._states = OrderedDict()
+        self._alerts = deque()
+        self._log_lines = deque(maxlen=max_log_lines)
+        self.coalesced = 0
+        self.dropped_log_lines = 0
+
+    def put(self, message):
+        with self._lock:
+            if isinstance(message, str):
+                if len(self._log_lines) == self._log_lines.maxlen:
+                    self.dropped_log_lines += 1
+                self._log_lines.append(message)
+            else:
+                if message.get('is_new_alert', False):
+                    self._alerts.append(message)
+                location = message.get('location')
+                if location in self._states:
+                    self.coalesced += 1
+                    del self._states[location]
+                self._states[location] = message
+
+    def drain(self):
+        """Returns (log_lines, alerts, states) accumulated since the last call; states are oldest-first, one per location."""
+        with self._lock:
+            log_lines = list(self._log_lines); self._log_lines.clear()
+            alerts = list(self._alerts); self._alerts.clear()
+            states = list(self._states.values()); self._states.clear()
+        return log_lines, alerts, states